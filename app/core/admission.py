@@ -0,0 +1,175 @@
+"""
+Control de admisión para los endpoints caros: token buckets por ruta y por cliente más un
+límite de concurrencia por ruta.
+
+Una petición que no cabe se rechaza al momento con 429 y ``Retry-After`` (nunca se encola):
+así unos pocos clientes con /diagnose o /sync no acaparan el worker y las rutas baratas
+mantienen su latencia. Las rutas sin política (ADMISSION_POLICIES) pasan sin coste.
+
+ADMISSION_CONTROL=off desactiva el middleware. El cliente es la IP de la conexión; detrás
+de un proxy que añade X-Forwarded-For (Render, ver render.yaml) ADMISSION_TRUST_FORWARDED=true
+usa la última IP de esa cabecera, la que pone el proxy (las anteriores las puede inventar el
+cliente). Sin ese proxy la cabecera entera es del cliente: cambiándola en cada petición
+tendría un bucket nuevo cada vez, por eso no se confía en ella por defecto.
+"""
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from app.core.metrics import REGISTRY
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_CONTROL", "on").lower() not in ("0", "off", "false", "no")
+TRUST_FORWARDED = os.getenv("ADMISSION_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+MAX_CLIENTS = int(os.getenv("ADMISSION_MAX_CLIENTS", "10000"))
+
+ADMISSION_REQUESTS = REGISTRY.counter(
+    "admission_requests_total",
+    "Peticiones a rutas con control de admisión por resultado (admitted, route_rate, client_rate, concurrency)",
+    ("route", "result"),
+)
+ADMISSION_IN_FLIGHT = REGISTRY.gauge("admission_in_flight", "Peticiones admitidas en curso por ruta", ("route",))
+
+
+class AdmissionPolicy(NamedTuple):
+    rate: float  # tokens/s de la ruta (todos los clientes)
+    burst: float
+    client_rate: float  # tokens/s por cliente
+    client_burst: float
+    max_concurrency: int
+
+
+# Rutas caras: /sync y /download-catalog llaman a RAWG y reconstruyen índices, /diagnose
+# evalúa reglas sobre el catálogo entero y /auth/login paga bcrypt
+ADMISSION_POLICIES: Dict[str, AdmissionPolicy] = {
+    "/expert-system/sync": AdmissionPolicy(rate=1 / 60, burst=2, client_rate=1 / 60, client_burst=1, max_concurrency=1),
+    "/expert-system/download-catalog": AdmissionPolicy(rate=1 / 60, burst=2, client_rate=1 / 60, client_burst=1, max_concurrency=1),
+    "/expert-system/diagnose": AdmissionPolicy(rate=20, burst=40, client_rate=5, client_burst=10, max_concurrency=4),
+    "/auth/login": AdmissionPolicy(rate=50, burst=100, client_rate=2, client_burst=10, max_concurrency=32),
+}
+
+
+class TokenBucket:
+    """Bucket con recarga continua; ``take`` devuelve 0 si admite o los segundos hasta el próximo token."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def give_back(self) -> None:
+        # La petición se rechazó en un paso posterior: no consume cupo
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class _RouteLimiter:
+    def __init__(self, route: str, policy: AdmissionPolicy) -> None:
+        self.route = route
+        self.policy = policy
+        self.bucket = TokenBucket(policy.rate, policy.burst)
+        self.clients: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.in_flight = 0
+
+    def _client_bucket(self, client: str, now: float) -> TokenBucket:
+        bucket = self.clients.get(client)
+        if bucket is None:
+            # Con el mismo ``now`` que la petición: un instante posterior restaría tokens al
+            # recargar y con client_burst=1 la primera petición del cliente ya no cabría
+            bucket = self.clients[client] = TokenBucket(self.policy.client_rate, self.policy.client_burst, now)
+            if len(self.clients) > MAX_CLIENTS:
+                # LRU: el cliente menos reciente suele tener ya el bucket lleno (equivale a uno nuevo)
+                self.clients.popitem(last=False)
+        else:
+            self.clients.move_to_end(client)
+        return bucket
+
+    def admit(self, client: str) -> Tuple[Optional[str], float]:
+        """(None, 0) si entra; si no (motivo, segundos de espera sugeridos)."""
+        now = time.monotonic()
+        if self.in_flight >= self.policy.max_concurrency:
+            return "concurrency", 1.0
+        client_bucket = self._client_bucket(client, now)
+        wait = client_bucket.take(now)
+        if wait:
+            return "client_rate", wait
+        wait = self.bucket.take(now)
+        if wait:
+            client_bucket.give_back()
+            return "route_rate", wait
+        self.in_flight += 1
+        return None, 0.0
+
+
+class AdmissionControlMiddleware:
+    """Middleware ASGI puro; se monta dentro de CORS para que los 429 lleven sus cabeceras."""
+
+    def __init__(self, app, policies: Optional[Dict[str, AdmissionPolicy]] = None) -> None:
+        self.app = app
+        self.limiters = {route: _RouteLimiter(route, policy) for route, policy in (policies or ADMISSION_POLICIES).items()}
+
+    @staticmethod
+    def _client(scope) -> str:
+        if TRUST_FORWARDED:
+            for name, value in scope.get("headers", ()):
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").rsplit(",", 1)[-1].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope, receive, send) -> None:
+        limiter = self.limiters.get(scope.get("path", "").rstrip("/") or "/") if scope["type"] == "http" else None
+        if limiter is None or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        # Sin await entre comprobar y reservar: en el event loop es atómico y no hace falta lock
+        reason, wait = limiter.admit(self._client(scope))
+        if reason is not None:
+            ADMISSION_REQUESTS.inc(route=limiter.route, result=reason)
+            await _reject(send, reason, wait)
+            return
+
+        ADMISSION_REQUESTS.inc(route=limiter.route, result="admitted")
+        ADMISSION_IN_FLIGHT.set(limiter.in_flight, route=limiter.route)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.in_flight -= 1
+            ADMISSION_IN_FLIGHT.set(limiter.in_flight, route=limiter.route)
+
+
+_DETAILS = {
+    "concurrency": "Demasiadas peticiones en curso para este recurso, intenta de nuevo en unos segundos",
+    "client_rate": "Demasiadas peticiones, intenta de nuevo más tarde",
+    "route_rate": "Servicio saturado, intenta de nuevo más tarde",
+}
+
+
+async def _reject(send, reason: str, wait: float) -> None:
+    body = json.dumps({"detail": _DETAILS[reason]}, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", str(max(1, math.ceil(wait))).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,142 @@
+"""
+Caché en proceso de token JWT -> contexto de usuario para verify_jwt_auth.
+
+Una entrada vive hasta el ``exp`` del token (acotado por AUTH_CACHE_MAX_TTL_SECONDS para
+que los cambios hechos por otros workers converjan). Se invalida al confirmar (commit)
+cambios ORM en User, Credentials o UserRole del usuario; los UPDATE masivos con
+``query.update()`` no disparan eventos ORM y no invalidan.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.metrics import REGISTRY
+from app.modules.auth.models.credentials import Credentials
+from app.modules.auth.models.user import User
+from app.modules.auth.models.user_role import UserRole
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "auth_user_cache_requests_total",
+    "Consultas al caché de contexto de usuario por resultado (hit, miss, expired)",
+    ("result",),
+)
+CACHE_INVALIDATIONS = REGISTRY.counter(
+    "auth_user_cache_invalidations_total",
+    "Entradas del caché de contexto de usuario invalidadas por cambios en la base de datos",
+)
+CACHE_ENTRIES = REGISTRY.gauge("auth_user_cache_entries", "Entradas en el caché de contexto de usuario")
+
+_PENDING_KEY = "auth_cache_invalidate"
+
+
+class UserContextCache:
+    """LRU acotado token -> (expiración, id_user, contexto)."""
+
+    def __init__(self, max_entries: int = 10000, max_ttl: float = 300.0) -> None:
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        # Sube con cada invalidación: una carga que empezó antes no se guarda
+        self.generation = 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                result = "miss"
+            elif entry[0] <= time.time():
+                self._remove(token)
+                result = "expired"
+            else:
+                self._entries.move_to_end(token)
+                CACHE_REQUESTS.inc(result="hit")
+                return dict(entry[2])
+        CACHE_REQUESTS.inc(result=result)
+        return None
+
+    def put(self, token: str, exp: Optional[float], context: Dict[str, Any], generation: Optional[int] = None) -> None:
+        expires_at = time.time() + self.max_ttl
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        user_id = int(context["id_user"])
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                # Un commit invalidó usuarios mientras se leía este contexto: puede estar obsoleto
+                return
+            self._remove(token)
+            self._entries[token] = (expires_at, user_id, dict(context))
+            self._tokens_by_user.setdefault(user_id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            CACHE_ENTRIES.set(len(self._entries))
+
+    def discard(self, token: str) -> None:
+        with self._lock:
+            self._remove(token)
+            CACHE_ENTRIES.set(len(self._entries))
+
+    def invalidate_users(self, user_ids: Set[int]) -> None:
+        removed = 0
+        with self._lock:
+            self.generation += 1
+            for user_id in user_ids:
+                for token in list(self._tokens_by_user.get(user_id, ())):
+                    self._remove(token)
+                    removed += 1
+            CACHE_ENTRIES.set(len(self._entries))
+        if removed:
+            CACHE_INVALIDATIONS.inc(removed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._tokens_by_user.clear()
+            CACHE_ENTRIES.set(0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry[1])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry[1]]
+
+
+USER_CONTEXT_CACHE = UserContextCache(
+    max_entries=int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000")),
+    max_ttl=float(os.getenv("AUTH_CACHE_MAX_TTL_SECONDS", "300")),
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    pending: Set[int] = session.info.setdefault(_PENDING_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (User, Credentials, UserRole)) and obj.id_user is not None:
+            pending.add(obj.id_user)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    # Solo tras el commit: invalidar antes permitiría re-cachear datos aún no confirmados
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        USER_CONTEXT_CACHE.invalidate_users(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
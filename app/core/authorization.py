@@ -0,0 +1,135 @@
+"""
+Mapa de roles y permisos en proceso para las comprobaciones de autorización.
+
+Los permisos de cada rol son política del código (ROLE_PERMISSIONS, por nombre de rol); los
+nombres de rol salen de la tabla ``role`` y los roles de cada usuario de ``user_role``. Los
+dos se cargan al primer uso y se sirven desde memoria: una comprobación con el caché
+caliente no consulta la base.
+
+Invalidación versionada: cada commit ORM que toca ``user_role`` (o ``role``) sube
+``version`` y descarta las entradas afectadas; una carga que empezó antes de ese commit no
+se guarda. Otros workers convergen al vencer AUTHZ_CACHE_TTL_SECONDS.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import REGISTRY
+from app.modules.auth.models.role import Role
+from app.modules.auth.models.user_role import UserRole
+
+# Permisos por nombre de rol (los ids dependen del orden de siembra, los nombres no)
+ROLE_PERMISSIONS: Dict[str, FrozenSet[str]] = {
+    "usuario": frozenset(),
+    "admin": frozenset({"users:import", "profiler:use", "metrics:read"}),
+}
+
+AUTHZ_REQUESTS = REGISTRY.counter(
+    "authz_cache_requests_total", "Consultas al caché de roles por usuario por resultado (hit, miss)", ("result",)
+)
+AUTHZ_VERSION = REGISTRY.gauge("authz_cache_version", "Versión del mapa de roles (sube al asignar roles)")
+
+_PENDING_KEY = "authz_invalidate"
+_ALL_USERS = -1
+
+
+class Grants(NamedTuple):
+    role_ids: FrozenSet[int]
+    permissions: FrozenSet[str]
+
+
+class AuthorizationCache:
+    """LRU acotado id_user -> (expiración, Grants) más el mapa id_role -> nombre."""
+
+    def __init__(self, max_entries: int = 50000, ttl: float = 300.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self._role_names: Optional[Dict[int, str]] = None
+        self._entries: "OrderedDict[int, Tuple[float, Grants]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, user_id: int) -> Optional[Grants]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                return entry[1]
+        return None
+
+    async def grants(self, user_id: int, session_factory: async_sessionmaker = AsyncSessionLocal) -> Grants:
+        """Roles y permisos del usuario; abre sesión y consulta solo si no están en caché."""
+        grants = self._cached(user_id)
+        if grants is not None:
+            AUTHZ_REQUESTS.inc(result="hit")
+            return grants
+        AUTHZ_REQUESTS.inc(result="miss")
+        version = self.version
+        # Primario, no réplica: una asignación de rol recién confirmada tiene que verse ya
+        async with session_factory() as db:
+            role_names = self._role_names
+            if role_names is None:
+                role_names = dict((await db.execute(select(Role.id_role, Role.name))).all())
+            role_ids = frozenset((await db.scalars(select(UserRole.id_role).where(UserRole.id_user == user_id))).all())
+        permissions = frozenset().union(*(ROLE_PERMISSIONS.get(role_names.get(id_role, ""), ()) for id_role in role_ids))
+        grants = Grants(role_ids, permissions)
+        with self._lock:
+            # Un commit de roles durante la carga la deja obsoleta: se usa para esta petición, no se guarda
+            if version == self.version:
+                self._role_names = role_names
+                self._entries[user_id] = (time.monotonic() + self.ttl, grants)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return grants
+
+    def invalidate(self, user_ids: Set[int]) -> None:
+        with self._lock:
+            self.version += 1
+            if _ALL_USERS in user_ids:
+                self._role_names = None
+                self._entries.clear()
+            else:
+                for user_id in user_ids:
+                    self._entries.pop(user_id, None)
+            AUTHZ_VERSION.set(self.version)
+
+    def clear(self) -> None:
+        self.invalidate({_ALL_USERS})
+
+
+AUTHZ_CACHE = AuthorizationCache(
+    max_entries=int(os.getenv("AUTHZ_CACHE_MAX_ENTRIES", "50000")),
+    ttl=float(os.getenv("AUTHZ_CACHE_TTL_SECONDS", "300")),
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_role_changes(session: Session, flush_context) -> None:
+    changed: Set[int] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, UserRole) and obj.id_user is not None:
+            changed.add(obj.id_user)
+        elif isinstance(obj, Role):
+            changed.add(_ALL_USERS)
+    if changed:
+        session.info.setdefault(_PENDING_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_role_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        AUTHZ_CACHE.invalidate(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_role_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -1,7 +1,12 @@
+import logging
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 
+logger = logging.getLogger(__name__)
+
 DB_USER = os.environ.get("DB_USER")
 DB_PASSWORD = os.environ.get("DB_PASSWORD")
 DB_HOST = os.environ.get("DB_HOST")
@@ -14,21 +19,81 @@ if not DATABASE_URL:
     # Fallback para desarrollo local
     DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(DATABASE_URL)
+
+def _pool_options(url) -> dict:
+    """Opciones del pool desde el entorno (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE, DB_POOL_PRE_PING). SQLite usa su propio pool y solo recibe pre-ping."""
+    options = {"pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")}
+    if url.get_backend_name() != "sqlite":
+        options.update(
+            pool_size=int(os.environ.get("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.environ.get("DB_POOL_TIMEOUT", "30")),
+            # Render/PgBouncer cortan conexiones inactivas; reciclarlas antes evita errores al reutilizarlas
+            pool_recycle=int(os.environ.get("DB_POOL_RECYCLE", "1800")),
+        )
+    return options
+
+
+def _async_url(url):
+    """Misma base con driver async: asyncpg para Postgres, aiosqlite para SQLite (desarrollo,
+    en requirements-dev.txt)."""
+    connect_args = {}
+    backend = url.get_backend_name()
+    if backend in ("postgresql", "postgres"):
+        query = dict(url.query)
+        # asyncpg no entiende sslmode (libpq); se traduce a su parámetro ssl
+        sslmode = query.pop("sslmode", None)
+        if sslmode and sslmode != "disable":
+            connect_args["ssl"] = sslmode
+        url = url.set(drivername="postgresql+asyncpg", query=query)
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url, connect_args
+
+
+def _normalize_url(raw: str):
+    return make_url(raw.replace("postgres://", "postgresql://", 1))
+
+
+def create_async_session_factory(raw_url: str) -> async_sessionmaker:
+    """Motor async (con pool configurado) y su fábrica de sesiones para una URL de base de datos."""
+    url, connect_args = _async_url(_normalize_url(raw_url))
+    async_engine = create_async_engine(url, connect_args=connect_args, **_pool_options(url))
+    return async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+_url = _normalize_url(DATABASE_URL)
+
+# Motor síncrono: migraciones (tablas/roles) y scripts
+engine = create_engine(_url, **_pool_options(_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Motor async del primario: sesiones de los handlers (dependencia get_db); las lecturas
+# pueden ir a réplicas (app/core/read_replicas.py)
+AsyncSessionLocal = create_async_session_factory(DATABASE_URL)
+async_engine = AsyncSessionLocal.kw["bind"]
+
 Base = declarative_base()
 
+# Roles por defecto, en este orden: los ids (usuario=1, admin=2) dependen de él
+DEFAULT_ROLES = [
+    {"name": "usuario", "description": "Rol de usuario estándar"},
+    {"name": "admin", "description": "Rol de administrador del sistema"},
+]
+
 def create_tables():
     """Crear todas las tablas en la base de datos"""
     from app.modules.auth.models.user import User
     from app.modules.auth.models.role import Role
     from app.modules.auth.models.user_role import UserRole
     from app.modules.auth.models.credentials import Credentials
+    from app.modules.auth.models.revoked_token import RevokedToken
 
-    print("Creando tablas...")
-    print(f"Tablas a crear: {list(Base.metadata.tables.keys())}")
+    logger.info("Creando tablas...")
+    logger.debug("Tablas a crear: %s", list(Base.metadata.tables.keys()))
     Base.metadata.create_all(bind=engine)
-    print("✅ Tablas creadas exitosamente")
+    logger.info("Tablas creadas exitosamente")
 
 def initialize_default_roles():
     """Inicializar roles por defecto (usuario y admin)"""
@@ -40,30 +105,24 @@ def initialize_default_roles():
         existing_roles = db.query(Role).all()
         existing_role_names = [role.name for role in existing_roles]
         
-        # Definir roles por defecto
-        default_roles = [
-            {"name": "usuario", "description": "Rol de usuario estándar"},
-            {"name": "admin", "description": "Rol de administrador del sistema"}
-        ]
-        
         # Crear roles que no existen
-        for role_data in default_roles:
+        for role_data in DEFAULT_ROLES:
             if role_data["name"] not in existing_role_names:
                 new_role = Role(
                     name=role_data["name"],
                     description=role_data["description"]
                 )
                 db.add(new_role)
-                print(f"✅ Rol '{role_data['name']}' creado exitosamente")
+                logger.info("Rol '%s' creado exitosamente", role_data['name'])
             else:
-                print(f"ℹ️  Rol '{role_data['name']}' ya existe")
+                logger.debug("Rol '%s' ya existe", role_data['name'])
         
         db.commit()
-        print("✅ Inicialización de roles completada")
+        logger.info("Inicialización de roles completada")
         
     except Exception as e:
         db.rollback()
-        print(f"❌ Error al inicializar roles: {e}")
+        logger.exception("Error al inicializar roles: %s", e)
         raise e
     finally:
         db.close()
\ No newline at end of file
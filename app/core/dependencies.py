@@ -1,41 +1,66 @@
 """
 Dependencias para autenticación y autorización
 """
-from fastapi import Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
-from app.core.security import get_user_from_token
+import hmac
+import logging
+import os
+from jose import jwt
+from fastapi import Depends, HTTPException, status, Request, Response
+from app.core.database import AsyncSessionLocal
+from app.core.read_replicas import open_read_session, track_writes
+from app.core.auth_cache import USER_CONTEXT_CACHE
+from app.core.authorization import AUTHZ_CACHE
+from app.core.security import verify_token
+from app.core.token_revocation import TOKEN_REVOCATIONS
 from app.modules.auth.services.user_service import UserService
 
-def get_db():
-    """Dependencia para obtener la sesión de base de datos"""
-    db = SessionLocal()
-    try:
+logger = logging.getLogger(__name__)
+
+# Ids de rol según el orden de DEFAULT_ROLES (usuario, admin)
+ADMIN_ROLE_ID = 2
+
+async def get_db(response: Response):
+    """Dependencia para obtener la sesión (async) de base de datos en el primario"""
+    async with AsyncSessionLocal() as db:
+        # Tras escribir, las lecturas de este cliente se quedan un momento en el primario
+        track_writes(db, response)
+        yield db
+
+async def get_read_db(request: Request):
+    """Dependencia para consultas de solo lectura: réplica si hay, primario si no o tras escribir"""
+    async with await open_read_session(request) as db:
         yield db
-    finally:
-        db.close()
 
-def verify_jwt_auth(request: Request, db: Session = Depends(get_db)):
+async def _reject_revoked(token: str, claims: dict) -> None:
+    # Filtro de Bloom en memoria: solo los positivos consultan la tabla de revocados
+    if await TOKEN_REVOCATIONS.is_revoked(claims.get("jti"), claims.get("exp")):
+        USER_CONTEXT_CACHE.discard(token)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revocado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+async def verify_jwt_auth(request: Request):
     """
     Dependencia para verificar JWT y obtener el usuario actual autenticado desde cookies HttpOnly o header Authorization
+
+    La sesión (en el primario) solo se abre si el contexto no está en caché: con caché caliente la
+    autenticación no toma conexión del pool.
     """
     try:
-        # Debug logging
-        print(f"🔍 JWT AUTH: Checking authentication")
-        print(f"🔍 JWT AUTH: Available cookies: {dict(request.cookies)}")
-        print(f"🔍 JWT AUTH: Authorization header: {request.headers.get('Authorization', 'None')}")
-
         # Obtener token desde cookie HttpOnly o header Authorization
         token = request.cookies.get("auth_token")
-        print(f"🔍 JWT AUTH: Token from cookies: {'Found' if token else 'Not found'}")
+        source = "cookie" if token else None
 
         # Si no hay token en cookies, intentar obtenerlo del header Authorization
         if not token:
             auth_header = request.headers.get("Authorization")
             if auth_header and auth_header.startswith("Bearer "):
                 token = auth_header.split(" ")[1]
-                print(f"🔍 JWT AUTH: Token from header: Found")
-        
+                source = "header"
+        logger.debug("Autenticación JWT", extra={"source": source})
+
         if not token:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -43,42 +68,92 @@ def verify_jwt_auth(request: Request, db: Session = Depends(get_db)):
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        email = get_user_from_token(token)
-        user_service = UserService(db)
-        
-        # Buscar credenciales por email
-        from app.modules.auth.models.credentials import Credentials
-        credentials = db.query(Credentials).filter(Credentials.email == email).first()
-        if not credentials:
+        # Camino común: token ya validado y contexto en caché, sin tocar la base de datos
+        user_info = USER_CONTEXT_CACHE.get(token)
+        if user_info is not None:
+            # El token ya se verificó al cachearlo: sus claims se leen sin volver a firmar
+            claims = jwt.get_unverified_claims(token)
+            await _reject_revoked(token, claims)
+            return user_info
+
+        payload = verify_token(token)
+        await _reject_revoked(token, payload)
+        email = payload.get("sub")
+        if email is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token inválido"
+            )
+
+        # Obtener información completa del usuario sin verificar contraseña. Primario, no
+        # réplica: lo leído se cachea y una réplica atrasada volvería a llenar el caché con
+        # datos anteriores al commit que lo acaba de invalidar
+        generation = USER_CONTEXT_CACHE.generation
+        try:
+            async with AsyncSessionLocal() as db:
+                user_info = await UserService(db).get_user_info_by_email(email)
+        except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Usuario no encontrado"
             )
-        
-        # Obtener información completa del usuario sin verificar contraseña
-        user_info = user_service.get_user_info_by_email(email)
-        
+
+        USER_CONTEXT_CACHE.put(token, payload.get("exp"), user_info, generation)
         return user_info
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error al obtener usuario actual: {e}")
+        logger.warning("Error al obtener usuario actual: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido"
         )
 
+def _forbidden() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="No tienes permisos para acceder a este recurso"
+    )
+
 def require_role(required_role: int):
     """
-    Dependencia para verificar que el usuario tenga un rol específico
+    Dependencia para verificar que el usuario tenga un rol específico (cualquiera de sus roles)
     """
-    def role_checker(current_user: dict = Depends(get_current_user)):
-        if current_user.get("id_role") != required_role:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permisos para acceder a este recurso"
-            )
+    async def role_checker(current_user: dict = Depends(verify_jwt_auth)):
+        grants = await AUTHZ_CACHE.grants(current_user["id_user"])
+        if required_role not in grants.role_ids:
+            raise _forbidden()
         return current_user
-    
+
     return role_checker
+
+def require_permission(permission: str):
+    """
+    Dependencia para verificar un permiso (ROLE_PERMISSIONS en app/core/authorization.py)
+    """
+    async def permission_checker(current_user: dict = Depends(verify_jwt_auth)):
+        grants = await AUTHZ_CACHE.grants(current_user["id_user"])
+        if permission not in grants.permissions:
+            raise _forbidden()
+        return current_user
+
+    return permission_checker
+
+
+# Dependencia para endpoints de administración
+require_admin = require_role(ADMIN_ROLE_ID)
+
+async def require_metrics_access(request: Request):
+    """
+    Dependencia de /metrics: token de scraping (METRICS_TOKEN como Bearer) o permiso metrics:read
+    """
+    # Prometheus no inicia sesión: se le configura un token estático (bearer_token)
+    token = os.getenv("METRICS_TOKEN")
+    if token and hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return None
+    current_user = await verify_jwt_auth(request)
+    grants = await AUTHZ_CACHE.grants(current_user["id_user"])
+    if "metrics:read" not in grants.permissions:
+        raise _forbidden()
+    return current_user
@@ -0,0 +1,89 @@
+"""
+Caché HTTP condicional: ETag derivado de la versión de los datos + la consulta normalizada,
+``Cache-Control`` por ruta y respuesta 304 ante ``If-None-Match`` sin ejecutar la consulta.
+
+Las versiones del catálogo salen de CatalogStore.version() (hash del contenido), así que
+todas las instancias generan el mismo ETag para la misma respuesta y un CDN puede revalidar
+contra cualquiera de ellas. Las respuestas calculadas (búsqueda) suman además
+``code_version``: un despliegue que cambia filtros o proyección no sigue respondiendo 304.
+"""
+import functools
+import hashlib
+import os
+from typing import Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.core.metrics import REGISTRY
+
+# Políticas por ruta. Las lecturas GET del catálogo admiten cachés compartidas y servir la
+# copia vencida mientras revalidan; la descarga (lleva api_key en la URL) solo en el navegador
+# y revalidando siempre. Solo rutas GET: RFC 9110 no admite 304 para otros métodos.
+CACHE_POLICIES = {
+    "search": "public, max-age=60, stale-while-revalidate=300",
+    "catalog_size": "public, max-age=60, stale-while-revalidate=300",
+    "game": "public, max-age=300, stale-while-revalidate=600",
+    "download": "private, no-cache",
+}
+
+# Versión desplegada (Render expone el commit); se suma al hash de los archivos en code_version
+DEPLOY_VERSION = os.getenv("APP_VERSION") or os.getenv("RENDER_GIT_COMMIT", "")
+
+CONDITIONAL_REQUESTS = REGISTRY.counter(
+    "http_conditional_requests_total",
+    "Peticiones a rutas con ETag por resultado (not_modified, modified, unconditional)",
+    ("route", "result"),
+)
+
+
+def normalized_query(request: Request, exclude: Iterable[str] = ()) -> str:
+    """Query string canónica: parámetros ordenados, sin vacíos ni los excluidos."""
+    skip = set(exclude)
+    items: Tuple[Tuple[str, str], ...] = tuple(sorted(
+        (key, value) for key, value in request.query_params.multi_items() if value != "" and key not in skip
+    ))
+    return "&".join(f"{key}={value}" for key, value in items)
+
+
+@functools.lru_cache(maxsize=None)
+def code_version(*paths: str) -> str:
+    """Hash de los archivos que producen una respuesta (módulos, reglas) + DEPLOY_VERSION.
+
+    Se calcula una vez por proceso: refleja el código y las reglas cargados al arrancar.
+    """
+    digest = hashlib.blake2b(DEPLOY_VERSION.encode("utf-8"), digest_size=8)
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(b"\x00" + f.read())
+    return digest.hexdigest()
+
+
+def make_etag(version: str, *parts: str) -> str:
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(version.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\x00" + part.encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Comparación débil de If-None-Match (lista, ``*`` y prefijo W/)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+def conditional(request: Request, response: Optional[Response], route: str, etag: str) -> Optional[Response]:
+    """Fija ETag/Cache-Control en ``response``; devuelve un 304 si el cliente ya tiene esa versión."""
+    cache_control = CACHE_POLICIES[route]
+    if etag_matches(request, etag):
+        CONDITIONAL_REQUESTS.inc(route=route, result="not_modified")
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    result = "modified" if request.headers.get("if-none-match") else "unconditional"
+    CONDITIONAL_REQUESTS.inc(route=route, result=result)
+    if response is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = cache_control
+    return None
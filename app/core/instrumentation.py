@@ -0,0 +1,150 @@
+"""
+Instrumentación por petición: histogramas de latencia por ruta, peticiones en curso,
+tamaño de respuesta y cabecera Server-Timing con el desglose por fases.
+
+Los servicios marcan sus fases con ``timing_phase("filter")`` / ``timing_phase("rank")``
+(y ``load`` cuando se reconstruyen hechos o índices); fuera de una petición (scripts,
+benchmarks) las marcas no hacen nada.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from app.core.metrics import REGISTRY
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Latencia de las peticiones HTTP hasta el inicio de la respuesta",
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight",
+    "Peticiones HTTP en curso",
+    ("method",),
+)
+RESPONSE_SIZE = REGISTRY.histogram(
+    "http_response_size_bytes",
+    "Tamaño del cuerpo de las respuestas HTTP",
+    ("method", "route"),
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+PHASE_SECONDS = REGISTRY.histogram(
+    "http_request_phase_seconds",
+    "Tiempo por fase (parse, load, filter, rank, serialize) de las peticiones HTTP",
+    ("route", "phase"),
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestTiming:
+    """Acumula las fases marcadas durante una petición (en segundos, orden de aparición)."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.first_mark: Optional[float] = None
+        self.last_mark: Optional[float] = None
+
+    def add(self, name: str, began: float, ended: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + (ended - began)
+        if self.first_mark is None:
+            self.first_mark = began
+        self.last_mark = ended
+
+    def breakdown(self, responded: float) -> List[tuple]:
+        """Fases para Server-Timing. parse = hasta la primera marca; serialize = desde la última."""
+        if self.first_mark is None:
+            return [("app", responded - self.started)]
+        parts = [("parse", self.first_mark - self.started)]
+        parts.extend(self.phases.items())
+        parts.append(("serialize", responded - self.last_mark))
+        return parts
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def record_phase(name: str, began: float) -> None:
+    """Registra una fase iniciada en ``began`` (time.perf_counter()) y terminada ahora."""
+    timing = _current.get()
+    if timing is not None:
+        timing.add(name, began, time.perf_counter())
+
+
+@contextmanager
+def timing_phase(name: str) -> Iterator[None]:
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, began, time.perf_counter())
+
+
+def _server_timing_header(parts: List[tuple], total: float) -> bytes:
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in parts]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries).encode("latin-1")
+
+
+class InstrumentationMiddleware:
+    """Middleware ASGI puro (sin BaseHTTPMiddleware) para no bufferizar respuestas en streaming."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self._route_paths: Dict[object, str] = {}
+
+    def _route_label(self, scope) -> str:
+        # La etiqueta es la plantilla de la ruta (/games/{game_id}/similar), no la URL concreta
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            router = scope.get("router")
+            for route in getattr(router, "routes", ()):
+                if getattr(route, "endpoint", None) is endpoint:
+                    path = route.path
+                    break
+            path = self._route_paths[endpoint] = path or UNMATCHED_ROUTE
+        return path
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        timing = RequestTiming()
+        token = _current.set(timing)
+        state = {"status": 500, "responded": None, "bytes": 0}
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                responded = time.perf_counter()
+                state["status"] = message["status"]
+                state["responded"] = responded
+                header = _server_timing_header(timing.breakdown(responded), responded - timing.started)
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header)]
+            elif message["type"] == "http.response.body":
+                state["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(method=method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec(method=method)
+            _current.reset(token)
+            route = self._route_label(scope)
+            responded = state["responded"] or time.perf_counter()
+            REQUEST_LATENCY.observe(responded - timing.started, method=method, route=route, status=str(state["status"]))
+            RESPONSE_SIZE.observe(state["bytes"], method=method, route=route)
+            for phase, seconds in timing.breakdown(responded):
+                PHASE_SECONDS.observe(seconds, route=route, phase=phase)
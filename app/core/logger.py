@@ -0,0 +1,165 @@
+"""
+Logging estructurado y no bloqueante para la aplicación.
+
+Todos los loggers ``app.*`` escriben a una cola (QueueHandler); un hilo (QueueListener)
+formatea y escribe en stdout, así las peticiones no esperan la E/S de la consola.
+
+Variables de entorno:
+    LOG_LEVEL     nivel del logger "app" (DEBUG, INFO, WARNING...). Por defecto INFO.
+    LOG_FORMAT    "json" (por defecto) o "text".
+    LOG_SAMPLING  muestreo por logger para niveles < WARNING, p.ej.
+                  "app.core.dependencies=0.01,app.modules.auth=0.1".
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+APP_LOGGER = "app"
+
+_SECRET_KEYS = re.compile(r"pass(word)?|token|secret|authorization|cookie|api_key|credential", re.IGNORECASE)
+_SECRET_PATTERNS = (
+    # Bearer <token> en cabeceras
+    (re.compile(r"(Bearer\s+)[A-Za-z0-9\-_.=]+", re.IGNORECASE), r"\1[REDACTED]"),
+    # JWT sueltos (header.payload.firma en base64url)
+    (re.compile(r"eyJ[A-Za-z0-9\-_]+\.[A-Za-z0-9\-_]+\.[A-Za-z0-9\-_]*"), "[REDACTED]"),
+    # password='...', "password": "...", token=... en reprs de DTOs y dicts
+    (
+        re.compile(r"""((?:password|passwd|token|secret|api_key|auth_token)['"]?\s*[:=]\s*['"]?)[^'",\s}]+""", re.IGNORECASE),
+        r"\1[REDACTED]",
+    ),
+)
+
+# Atributos estándar de LogRecord; el resto viene de ``extra=`` y se emite como campo
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+def redact(text: str) -> str:
+    for pattern, replacement in _SECRET_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _extra_fields(record: logging.LogRecord) -> Dict[str, object]:
+    return {key: value for key, value in vars(record).items() if key not in _RESERVED}
+
+
+class RedactingFilter(logging.Filter):
+    """Oculta secretos en el mensaje ya interpolado y en los campos extra."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.msg = redact(record.getMessage())
+        record.args = None
+        for key in _extra_fields(record):
+            if _SECRET_KEYS.search(key):
+                setattr(record, key, "[REDACTED]")
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Deja pasar una fracción de los registros < WARNING según el prefijo del logger."""
+
+    def __init__(self, rates: Dict[str, float]) -> None:
+        super().__init__()
+        # Los prefijos más largos primero para que gane la regla más específica
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+        self._cache: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._cache.get(name)
+        if rate is None:
+            rate = 1.0
+            for prefix, value in self.rates:
+                if name == prefix or name.startswith(prefix + "."):
+                    rate = value
+                    break
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        # QueueHandler ya incorporó la traza de excepción (si la hay) en el mensaje
+        payload.update(_extra_fields(record))
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extra = _extra_fields(record)
+        if extra:
+            line += " " + " ".join(f"{key}={value}" for key, value in extra.items())
+        return line
+
+
+def _parse_sampling(spec: str) -> Dict[str, float]:
+    rates: Dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if not name.strip() or not value.strip():
+            continue
+        try:
+            rates[name.strip()] = min(1.0, max(0.0, float(value)))
+        except ValueError:
+            continue
+    return rates
+
+
+def configure_logging() -> None:
+    """Configura el logger "app" una sola vez (idempotente)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(TextFormatter() if os.getenv("LOG_FORMAT", "json").lower() == "text" else JsonFormatter())
+    # La redacción corre en el hilo del listener, fuera del camino de la petición
+    stream.addFilter(RedactingFilter())
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    sampling = _parse_sampling(os.getenv("LOG_SAMPLING", ""))
+    if sampling:
+        queue_handler.addFilter(SamplingFilter(sampling))
+
+    logger = logging.getLogger(APP_LOGGER)
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.handlers[:] = [queue_handler]
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Vacía la cola y detiene el hilo del listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,6 +1,11 @@
+import logging
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.admission import ADMISSION_ENABLED, AdmissionControlMiddleware
+from app.core.instrumentation import InstrumentationMiddleware
 import os
 
+logger = logging.getLogger(__name__)
+
 def configure_middleware(app):
     origins = [
         "http://localhost:3000",
@@ -17,7 +22,11 @@ def configure_middleware(app):
         origins.append(frontend_url)
 
     # Para debugging, imprimir los origins configurados
-    print(f"🌐 CORS Origins configurados: {origins}")
+    logger.info("CORS Origins configurados: %s", origins)
+
+    # Dentro de CORS: los 429 de admisión llevan las cabeceras CORS y el frontend ve Retry-After
+    if ADMISSION_ENABLED:
+        app.add_middleware(AdmissionControlMiddleware)
 
     app.add_middleware(
         CORSMiddleware,
@@ -25,4 +34,8 @@ def configure_middleware(app):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Server-Timing", "X-Next-Cursor", "Retry-After"],
     )
+
+    # Se añade al final para que sea la capa más externa y mida también CORS
+    app.add_middleware(InstrumentationMiddleware)
@@ -0,0 +1,214 @@
+"""
+Migraciones versionadas del esquema. Se ejecutan en el despliegue (preDeployCommand),
+no en cada arranque de la app: ``upgrade`` es el bootstrap completo (tablas, índices y
+roles por defecto) y los workers arrancan sin tocar el esquema.
+
+    python -m app.core.migrations upgrade            # crea tablas faltantes y aplica pendientes
+    python -m app.core.migrations status
+    python -m app.core.migrations explain [--no-seqscan]   # planes de las consultas calientes
+
+Cada migración corre dentro de la misma transacción que registra su versión en
+``schema_migrations``; en Postgres un advisory lock evita que dos despliegues migren a la vez.
+"""
+import argparse
+import logging
+import sys
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+# Clave arbitraria y fija para pg_advisory_xact_lock
+_LOCK_KEY = 720_038
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def _create_index(conn: Connection, name: str, table: str, columns: str) -> None:
+    conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" ({columns})'))
+
+
+def _0001_auth_lookup_indexes(conn: Connection) -> None:
+    # Credentials por usuario (loader de usuarios, registro) y join/filtro de roles
+    _create_index(conn, "ix_credentials_id_user", "credentials", "id_user")
+    _create_index(conn, "ix_user_role_id_user", "user_role", "id_user, id_role")
+    _create_index(conn, "ix_user_role_id_role", "user_role", "id_role, id_user")
+    # Comprobación de username existente en cada registro
+    _create_index(conn, "ix_user_username", "user", "username")
+
+
+def _0002_user_search_trgm(conn: Connection) -> None:
+    from app.modules.auth.services.user_search import create_search_index
+
+    create_search_index(conn)
+
+
+def _0003_unique_username(conn: Connection) -> None:
+    # El registro confía en la restricción (sin consulta previa): no puede haber duplicados
+    duplicates = conn.execute(text(
+        'SELECT username, COUNT(*) FROM "user" GROUP BY username HAVING COUNT(*) > 1 LIMIT 10'
+    )).fetchall()
+    if duplicates:
+        listed = ", ".join(f"{username} ({count})" for username, count in duplicates)
+        raise RuntimeError(f"Usernames duplicados, resolverlos antes de migrar: {listed}")
+    conn.execute(text("DROP INDEX IF EXISTS ix_user_username"))
+    conn.execute(text('CREATE UNIQUE INDEX ix_user_username ON "user" (username)'))
+
+
+def _0004_default_roles(conn: Connection) -> None:
+    # Antes se sembraban en cada arranque de worker; bases existentes ya los tienen
+    from app.core.database import DEFAULT_ROLES
+    from app.modules.auth.models.role import Role
+
+    existing = set(conn.scalars(select(Role.name)))
+    missing = [role for role in DEFAULT_ROLES if role["name"] not in existing]
+    if missing:
+        conn.execute(Role.__table__.insert(), missing)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "auth_lookup_indexes", _0001_auth_lookup_indexes),
+    Migration(2, "user_search_trgm", _0002_user_search_trgm),
+    Migration(3, "unique_username", _0003_unique_username),
+    Migration(4, "default_roles", _0004_default_roles),
+]
+
+
+def applied_versions(conn: Connection) -> List[int]:
+    _metadata.create_all(conn)
+    return [row[0] for row in conn.execute(select(schema_migrations.c.version).order_by(schema_migrations.c.version))]
+
+
+def _import_models() -> None:
+    # Registra todos los modelos en Base.metadata y en el registro del ORM
+    from app.modules.auth.models import credentials, revoked_token, role, user, user_role  # noqa: F401
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> List[int]:
+    """Aplica las migraciones pendientes hasta ``target`` (todas por defecto). Devuelve las aplicadas."""
+    from app.core.database import Base
+
+    _import_models()
+    applied: List[int] = []
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+        Base.metadata.create_all(conn)
+        done = set(applied_versions(conn))
+        for migration in MIGRATIONS:
+            if migration.version in done or (target is not None and migration.version > target):
+                continue
+            logger.info("Aplicando migración %04d_%s", migration.version, migration.name)
+            migration.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=migration.version, name=migration.name, applied_at=datetime.utcnow(),
+            ))
+            applied.append(migration.version)
+    return applied
+
+
+def status(engine: Engine) -> List[Tuple[int, str, bool]]:
+    with engine.begin() as conn:
+        done = set(applied_versions(conn))
+    return [(m.version, m.name, m.version in done) for m in MIGRATIONS]
+
+
+def _hot_queries() -> List[Tuple[str, object]]:
+    _import_models()
+    from app.modules.auth.models.credentials import Credentials
+    from app.modules.auth.models.user import User
+    from app.modules.auth.models.user_role import UserRole
+    from app.modules.auth.services.user_loader import UserLoader
+    from app.modules.auth.services.user_search import apply_search
+
+    loader = UserLoader(None)
+    patients = loader.select().where(UserRole.id_role == 1, User.id_status == True)  # noqa: E712
+    return [
+        ("credentials por email (login)", select(Credentials).where(Credentials.email == "user@example.com")),
+        ("credentials por id_user", select(Credentials).where(Credentials.id_user == 1)),
+        ("user_role por id_user", select(UserRole).where(UserRole.id_user == 1)),
+        ("username existente (registro)", select(User.id_user).where(User.username == "someone")),
+        ("usuario por id (loader)", loader.select().where(User.id_user == 1)),
+        ("pacientes (loader + rol)", patients.limit(100)),
+        ("búsqueda de pacientes (trigram)", apply_search(patients, "garcia", ranked=True)),
+    ]
+
+
+def explain(engine: Engine, no_seqscan: bool = False) -> List[Tuple[str, List[str]]]:
+    """EXPLAIN de las consultas calientes. ``no_seqscan`` desalienta los seq scan en Postgres
+    (útil con tablas pequeñas, donde el planner los prefiere aunque el índice exista)."""
+    # Antes de conectar: importar user_search registra ``similarity`` en las conexiones SQLite
+    queries = _hot_queries()
+    plans: List[Tuple[str, List[str]]] = []
+    with engine.connect() as conn:
+        postgres = conn.dialect.name == "postgresql"
+        if postgres and no_seqscan:
+            conn.execute(text("SET enable_seqscan = off"))
+        for name, stmt in queries:
+            sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+            prefix = "EXPLAIN" if postgres else "EXPLAIN QUERY PLAN"
+            rows = conn.execute(text(f"{prefix} {sql}")).fetchall()
+            plans.append((name, [str(row[0]) if postgres else str(row[-1]) for row in rows]))
+    return plans
+
+
+def _is_full_scan(line: str) -> bool:
+    # Postgres: "Seq Scan on ..."; SQLite: "SCAN <tabla>" (sin "USING ... INDEX")
+    stripped = line.strip().lstrip("->").strip()
+    return stripped.startswith("Seq Scan") or (stripped.startswith("SCAN ") and "INDEX" not in stripped)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Migraciones del esquema")
+    sub = parser.add_subparsers(dest="command", required=True)
+    up = sub.add_parser("upgrade", help="Aplica migraciones pendientes")
+    up.add_argument("--target", type=int, default=None)
+    sub.add_parser("status", help="Lista migraciones y si están aplicadas")
+    ex = sub.add_parser("explain", help="Muestra los planes de las consultas calientes")
+    ex.add_argument("--no-seqscan", action="store_true")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    from app.core.logger import configure_logging
+
+    configure_logging()
+    from app.core.database import engine
+
+    if args.command == "upgrade":
+        applied = upgrade(engine, args.target)
+        print(f"Migraciones aplicadas: {applied or 'ninguna (esquema al día)'}")
+    elif args.command == "status":
+        for version, name, done in status(engine):
+            print(f"{version:04d}_{name:<28} {'aplicada' if done else 'PENDIENTE'}")
+    else:
+        full_scans = 0
+        for name, plan in explain(engine, args.no_seqscan):
+            print(f"== {name}")
+            for line in plan:
+                flag = "  <-- scan completo" if _is_full_scan(line) else ""
+                full_scans += bool(flag)
+                print(f"   {line}{flag}")
+        print(f"\nScans completos: {full_scans}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""
+Hashing de contraseñas fuera del event loop, con coste calibrable y rehash transparente.
+
+bcrypt es CPU puro (cientos de ms con 12 rondas): ``PASSWORD_HASHER`` lo ejecuta en un pool
+de procesos (PASSWORD_HASH_WORKERS, 0 = pool de hilos) y rechaza con 503 cuando hay más de
+PASSWORD_HASH_MAX_PENDING operaciones en espera, en vez de acumular logins indefinidamente.
+El coste lo fija PASSWORD_HASH_ROUNDS; para elegirlo según la latencia objetivo del hardware:
+
+    python -m app.core.password_hasher calibrate --target-ms 250
+
+Los hashes por debajo de la política (menos rondas o ``sha256:`` heredados) se rehashean
+en el siguiente login correcto (``needs_rehash``).
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+BCRYPT_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "12"))
+WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(2, os.cpu_count() or 1))))
+MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+# Importaciones masivas: coste mínimo de bcrypt (50k filas con 2 workers: ~2 h con 12 rondas,
+# ~30 s con 4) que el rehash del primer login (``needs_rehash``) sube a la política, y lotes
+# pequeños para que los logins no esperen detrás de un lote entero
+IMPORT_ROUNDS = min(BCRYPT_ROUNDS, int(os.getenv("PASSWORD_IMPORT_HASH_ROUNDS", "4")))
+HASH_BATCH_SIZE = int(os.getenv("PASSWORD_HASH_BATCH_SIZE", "16"))
+
+# Contexto para hashing de contraseñas; min_rounds marca como desactualizados los hashes más débiles
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS, bcrypt__min_rounds=BCRYPT_ROUNDS
+)
+
+HASH_QUEUE_SECONDS = REGISTRY.histogram(
+    "password_hash_queue_seconds",
+    "Espera de las operaciones de contraseña hasta que un worker las toma",
+    ("operation",),
+)
+HASH_SECONDS = REGISTRY.histogram(
+    "password_hash_duration_seconds",
+    "Duración de las operaciones de contraseña en el worker",
+    ("operation",),
+)
+HASH_PENDING = REGISTRY.gauge("password_hash_pending", "Operaciones de contraseña en cola o en curso")
+HASH_REJECTED = REGISTRY.counter(
+    "password_hash_rejected_total", "Operaciones de contraseña rechazadas por cola llena", ("operation",)
+)
+REHASHED = REGISTRY.counter(
+    "password_rehash_total", "Hashes actualizados a la política vigente tras un login", ("scheme",)
+)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verificar una contraseña en texto plano contra su hash
+    """
+    # Si es un hash SHA256 (fallback), verificar directamente
+    if hashed_password.startswith("sha256:"):
+        expected_hash = hashlib.sha256(plain_password.encode('utf-8')).hexdigest()
+        return f"sha256:{expected_hash}" == hashed_password
+
+    # Si es bcrypt, usar pwd_context
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    except Exception as e:
+        logger.warning("Error verificando contraseña: %s", e)
+        return False
+
+
+def get_password_hash(password: str, rounds: Optional[int] = None) -> str:
+    """
+    Generar hash de una contraseña (con ``rounds`` distinto de la política si se indica)
+    """
+    # Asegurar que la contraseña sea string
+    if isinstance(password, bytes):
+        password = password.decode('utf-8')
+
+    # Limpiar la contraseña de caracteres problemáticos
+    password = password.strip()
+
+    # Verificar que no esté vacía
+    if not password:
+        raise ValueError("Password cannot be empty")
+
+    # Truncar si es necesario (aunque no debería serlo con contraseñas normales)
+    if len(password.encode('utf-8')) > 72:
+        logger.warning("Contraseña de más de 72 bytes, se trunca")
+        password = password[:72]
+
+    try:
+        # Intentar con bcrypt primero
+        if rounds is not None and rounds != BCRYPT_ROUNDS:
+            return pwd_context.handler("bcrypt").using(rounds=rounds).hash(password)
+        return pwd_context.hash(password)
+    except Exception as e:
+        logger.error("Error con bcrypt, se usa SHA256 de respaldo: %s", e)
+        # Fallback a hashlib si bcrypt falla
+        hashed = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        return f"sha256:{hashed}"
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True si el hash no cumple la política actual (sha256 heredado o menos rondas)."""
+    if hashed_password.startswith("sha256:"):
+        return True
+    try:
+        return pwd_context.needs_update(hashed_password)
+    except ValueError:
+        return False
+
+
+def _hash_batch(passwords: List[str], rounds: Optional[int]) -> List[str]:
+    return [get_password_hash(password, rounds) for password in passwords]
+
+
+def _saturated() -> Exception:
+    # fastapi se importa aquí: los workers del pool (spawn) importan este módulo y no lo necesitan
+    from fastapi import HTTPException, status
+
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servicio saturado, intenta de nuevo en unos segundos",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _timed(func: Callable[..., Any], *args: Any) -> Tuple[float, float, Any]:
+    # Corre en el worker: devuelve cuándo empezó y terminó para separar espera y cómputo
+    started = time.time()
+    result = func(*args)
+    return started, time.time(), result
+
+
+class PasswordHasher:
+    """Ejecuta hash/verify en un pool acotado y mide espera en cola y duración."""
+
+    def __init__(self, workers: int = WORKERS, max_pending: int = MAX_PENDING) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _pool(self) -> Optional[Executor]:
+        # workers == 0: None -> pool de hilos por defecto del loop
+        if self._executor is None and self.workers > 0:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: el proceso padre tiene hilos (logging, profiler) y fork los copiaría a medias
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    async def _run(self, operation: str, func: Callable[..., Any], *args: Any, shed: bool = True) -> Any:
+        with self._lock:
+            if shed and self._pending >= self.max_pending:
+                HASH_REJECTED.inc(operation=operation)
+                raise _saturated()
+            self._pending += 1
+            HASH_PENDING.set(self._pending)
+        submitted = time.time()
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                started, finished, result = await loop.run_in_executor(self._pool(), _timed, func, *args)
+            except BrokenProcessPool:
+                # Un worker murió: esta operación va al pool de hilos y el pool se recrea en la siguiente
+                logger.error("Pool de hashing roto, se recrea; operación en el pool de hilos")
+                self._discard_pool()
+                started, finished, result = await loop.run_in_executor(None, _timed, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                HASH_PENDING.set(self._pending)
+        HASH_QUEUE_SECONDS.observe(max(0.0, started - submitted), operation=operation)
+        HASH_SECONDS.observe(finished - started, operation=operation)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: List[str], rounds: Optional[int] = IMPORT_ROUNDS) -> List[str]:
+        """Hashes en el mismo orden, repartidos en lotes entre los workers (uno en curso por worker)."""
+        batches = [passwords[i:i + HASH_BATCH_SIZE] for i in range(0, len(passwords), HASH_BATCH_SIZE)]
+        hashed: List[str] = []
+        window = max(1, self.workers)
+        for start in range(0, len(batches), window):
+            # Sin rechazo por cola llena: la ventana ya acota lo que la importación tiene en vuelo
+            results = await asyncio.gather(*(
+                self._run("hash_batch", _hash_batch, batch, rounds, shed=False)
+                for batch in batches[start:start + window]
+            ))
+            for result in results:
+                hashed.extend(result)
+        return hashed
+
+    async def warm_up(self) -> None:
+        """Arranca los procesos del pool para que el primer login no pague el spawn."""
+        executor = self._pool()
+        if executor is None:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(executor, needs_rehash, "") for _ in range(self.workers)))
+        except BrokenProcessPool as e:
+            logger.warning("No se pudo arrancar el pool de hashing: %s", e)
+            self._discard_pool()
+
+    def _discard_pool(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        self._discard_pool()
+
+
+PASSWORD_HASHER = PasswordHasher()
+
+
+def calibrate(target_ms: float, min_rounds: int = 10, max_rounds: int = 16, samples: int = 3) -> int:
+    """Mayor número de rondas cuyo hash (mediana de ``samples``) no supera ``target_ms``."""
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+        timings = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            context.hash("calibration-password")
+            timings.append((time.perf_counter() - started) * 1000)
+        median = statistics.median(timings)
+        print(f"rondas={rounds:<3} mediana={median:8.1f}ms", file=sys.stderr)
+        if median > target_ms:
+            break
+        chosen = rounds
+    return chosen
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Utilidades de hashing de contraseñas")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cal = sub.add_parser("calibrate", help="Elige PASSWORD_HASH_ROUNDS para una latencia objetivo")
+    cal.add_argument("--target-ms", type=float, default=250.0)
+    cal.add_argument("--min-rounds", type=int, default=10)
+    cal.add_argument("--max-rounds", type=int, default=16)
+    cal.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rounds = calibrate(args.target_ms, args.min_rounds, args.max_rounds, args.samples)
+    print(f"PASSWORD_HASH_ROUNDS={rounds}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Profiler por muestreo para analizar rutas calientes en vivo.
+
+Un hilo toma ``sys._current_frames()`` cada ``interval`` segundos mientras haya sesiones
+activas y se queda con las pilas que pasan por el endpoint perfilado. Sin sesiones no
+hay hilo ni hooks: el coste con el profiler desactivado es cero.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Any, Dict, List, Optional
+
+MAX_SECONDS = 300.0
+MIN_INTERVAL = 0.001
+MAX_STACKS = 5000
+
+
+class ProfileSession:
+    def __init__(self, route: str, method: str, code: CodeType, seconds: float, interval: float) -> None:
+        self.route = route
+        self.method = method
+        self.code = code
+        self.interval = interval
+        self.started_at = time.time()
+        self.deadline = time.monotonic() + seconds
+        self.stopped_at: Optional[float] = None
+        self.samples = 0
+        self.ticks = 0
+        self.dropped = 0
+        self.stacks: Counter = Counter()
+
+    @property
+    def active(self) -> bool:
+        return self.stopped_at is None
+
+    def record(self, stack: str) -> None:
+        self.samples += 1
+        if stack in self.stacks or len(self.stacks) < MAX_STACKS:
+            self.stacks[stack] += 1
+        else:
+            self.dropped += 1
+
+    def collapsed(self) -> str:
+        """Formato "frame;frame;frame N" compatible con flamegraph.pl / speedscope."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def summary(self, top: int = 0) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "route": self.route,
+            "method": self.method,
+            "active": self.active,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "interval_ms": round(self.interval * 1000, 3),
+            "ticks": self.ticks,
+            "samples": self.samples,
+            "distinct_stacks": len(self.stacks),
+            "dropped_samples": self.dropped,
+        }
+        if top:
+            total = self.samples or 1
+            data["top_stacks"] = [
+                {"stack": stack.split(";"), "samples": count, "ratio": round(count / total, 4)}
+                for stack, count in self.stacks.most_common(top)
+            ]
+            self_time: Counter = Counter()
+            for stack, count in self.stacks.items():
+                self_time[stack.rsplit(";", 1)[-1]] += count
+            data["top_frames"] = [
+                {"frame": frame, "samples": count, "ratio": round(count / total, 4)}
+                for frame, count in self_time.most_common(top)
+            ]
+        return data
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}"
+
+
+class SamplingProfiler:
+    """Sesiones de muestreo por ruta con ventana acotada."""
+
+    def __init__(self) -> None:
+        self._sessions: Dict[str, ProfileSession] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+
+    def start(self, route: str, method: str, code: CodeType, seconds: float, interval: float) -> ProfileSession:
+        session = ProfileSession(route, method, code, min(seconds, MAX_SECONDS), max(interval, MIN_INTERVAL))
+        with self._lock:
+            previous = self._sessions.get(route)
+            if previous is not None and previous.active:
+                previous.stopped_at = time.time()
+            self._sessions[route] = session
+            if self._thread is None or not self._thread.is_alive():
+                self._wakeup.clear()
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+        return session
+
+    def stop(self, route: str) -> Optional[ProfileSession]:
+        with self._lock:
+            session = self._sessions.get(route)
+            if session is not None and session.active:
+                session.stopped_at = time.time()
+        self._wakeup.set()
+        return session
+
+    def get(self, route: str) -> Optional[ProfileSession]:
+        return self._sessions.get(route)
+
+    def sessions(self) -> List[ProfileSession]:
+        with self._lock:
+            return list(self._sessions.values())
+
+    def _active_sessions(self) -> List[ProfileSession]:
+        now = time.monotonic()
+        with self._lock:
+            for session in self._sessions.values():
+                if session.active and now >= session.deadline:
+                    session.stopped_at = time.time()
+            return [s for s in self._sessions.values() if s.active]
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while True:
+            active = self._active_sessions()
+            if not active:
+                with self._lock:
+                    # Re-chequeo bajo lock: start() pudo añadir una sesión sin lanzar otro hilo
+                    if not any(s.active for s in self._sessions.values()):
+                        self._thread = None
+                        return
+                continue
+            by_code = {s.code: s for s in active}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self._sample(frame, by_code)
+            for session in active:
+                session.ticks += 1
+            self._wakeup.wait(min(s.interval for s in active))
+            self._wakeup.clear()
+
+    @staticmethod
+    def _sample(frame: Optional[FrameType], by_code: Dict[CodeType, ProfileSession]) -> None:
+        # Pila de la hoja a la raíz; se corta en el frame del endpoint perfilado
+        labels: List[str] = []
+        while frame is not None:
+            labels.append(_frame_label(frame))
+            session = by_code.get(frame.f_code)
+            if session is not None:
+                session.record(";".join(reversed(labels)))
+                return
+            frame = frame.f_back
+
+
+PROFILER = SamplingProfiler()
@@ -0,0 +1,159 @@
+"""
+Enrutado de sesiones de solo lectura a réplicas con lectura de las propias escrituras.
+
+DATABASE_REPLICA_URLS (lista separada por comas) define las réplicas; sin ella todas las
+lecturas van al primario. Las réplicas se reparten en round-robin y una que no acepta
+conexiones queda fuera REPLICA_RETRY_SECONDS, leyendo mientras tanto del primario.
+
+Tras un commit con cambios en una sesión del primario ligada a la petición, la respuesta
+lleva la cookie ``db_primary_until``: mientras no expire (DB_READ_YOUR_WRITES_SECONDS,
+~ el retraso máximo de replicación), las lecturas de ese cliente van al primario.
+
+Para probarlo en local basta con dos Postgres (con o sin replicación entre ellos):
+
+    DATABASE_URL=postgresql://.../primary DATABASE_REPLICA_URLS=postgresql://.../replica
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.database import AsyncSessionLocal, create_async_session_factory
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+STICKY_COOKIE = "db_primary_until"
+STICKY_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+
+# Claves en Session.info
+_RESPONSE_KEY = "sticky_response"
+_WROTE_KEY = "wrote"
+
+READ_ROUTING = REGISTRY.counter(
+    "db_read_sessions_total",
+    "Sesiones de lectura por destino (replica, primary) y motivo",
+    ("target", "reason"),
+)
+
+
+class _Replica:
+    def __init__(self, url: str) -> None:
+        self.session_factory: async_sessionmaker = create_async_session_factory(url)
+        self.down_until = 0.0
+        self.name = self.session_factory.kw["bind"].url.render_as_string(hide_password=True)
+
+
+class ReplicaRouter:
+    """Elige la fábrica de sesiones para cada lectura: réplica sana o primario."""
+
+    def __init__(self, urls: List[str], primary: async_sessionmaker) -> None:
+        self.primary = primary
+        self.replicas = [_Replica(url) for url in urls]
+        self._cycle = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+        self._lock = threading.Lock()
+
+    def _candidates(self) -> List[_Replica]:
+        if not self.replicas:
+            return []
+        with self._lock:
+            start = next(self._cycle)
+        now = time.monotonic()
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.down_until <= now]
+
+    async def open(self, prefer_primary: bool = False) -> AsyncSession:
+        """Sesión de lectura ya conectada; el llamador la cierra."""
+        if prefer_primary:
+            READ_ROUTING.inc(target="primary", reason="sticky")
+            return self.primary()
+        if not self.replicas:
+            READ_ROUTING.inc(target="primary", reason="no_replicas")
+            return self.primary()
+        for replica in self._candidates():
+            session = replica.session_factory()
+            try:
+                # Conectar ya: así un fallo de la réplica se detecta aquí y no a mitad de la consulta
+                await session.connection()
+            except (DBAPIError, OSError) as e:
+                await session.close()
+                replica.down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+                logger.warning("Réplica %s no disponible, se excluye %.0fs: %s", replica.name, REPLICA_RETRY_SECONDS, e)
+                continue
+            READ_ROUTING.inc(target="replica", reason="read")
+            return session
+        READ_ROUTING.inc(target="primary", reason="fallback")
+        return self.primary()
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.session_factory.kw["bind"].dispose()
+
+
+REPLICA_ROUTER = ReplicaRouter(
+    [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()],
+    AsyncSessionLocal,
+)
+
+
+def is_sticky(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+async def open_read_session(request: Request) -> AsyncSession:
+    return await REPLICA_ROUTER.open(prefer_primary=is_sticky(request))
+
+
+def track_writes(session: AsyncSession, response: Response) -> None:
+    """Liga la sesión del primario a la respuesta para fijar la cookie tras un commit con cambios."""
+    session.info[_RESPONSE_KEY] = response
+
+
+def mark_written(session: AsyncSession) -> None:
+    """Marca la transacción como escritura para fijar la cookie en su commit.
+
+    Las sentencias Core (``insert()``/``update()`` ejecutadas directamente) no pasan por el
+    flush ORM, así que ``_mark_write`` no las ve: llamar antes del commit.
+    """
+    session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_write(session: Session, flush_context) -> None:
+    if session.new or session.dirty or session.deleted:
+        session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _set_sticky_cookie(session: Session) -> None:
+    if not session.info.pop(_WROTE_KEY, False):
+        return
+    # Una vez por petición aunque el handler haga varios commits
+    response: Optional[Response] = session.info.pop(_RESPONSE_KEY, None)
+    if response is not None:
+        # Mismos atributos que la cookie de sesión (frontend en otro origen)
+        response.set_cookie(
+            key=STICKY_COOKIE,
+            value=f"{time.time() + STICKY_SECONDS:.3f}",
+            max_age=max(1, int(STICKY_SECONDS + 0.999)),
+            httponly=True,
+            secure=True,
+            samesite="none",
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_write(session: Session) -> None:
+    session.info.pop(_WROTE_KEY, None)
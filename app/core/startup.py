@@ -0,0 +1,135 @@
+"""
+Arranque del worker: fases cronometradas y sin trabajo de despliegue.
+
+El esquema y los roles por defecto los prepara ``python -m app.core.migrations upgrade``
+(preDeployCommand / servicio ``migrate``), una vez por despliegue; el worker solo importa,
+registra routers y empieza a servir. En desarrollo sin ese paso, BOOTSTRAP_ON_STARTUP=1
+ejecuta las migraciones al arrancar, como hacía antes cada worker.
+
+Cada fase queda en el gauge ``app_startup_phase_seconds{phase}`` y en el log de arranque.
+Para ver el desglose en local sin levantar uvicorn:
+
+    python -m app.core.startup
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Dict, Iterator, Optional, Set
+
+from app.core.metrics import REGISTRY
+
+# Antes que cualquier otro import de la app: app.main importa este módulo primero
+_PROCESS_STARTED = time.perf_counter()
+
+logger = logging.getLogger(__name__)
+
+STARTUP_PHASE_SECONDS = REGISTRY.gauge(
+    "app_startup_phase_seconds", "Duración de cada fase del arranque del worker", ("phase",)
+)
+STARTUP_SECONDS = REGISTRY.gauge("app_startup_seconds", "Desde el import de la app hasta aceptar peticiones")
+
+
+class StartupTimer:
+    """Desglose del arranque por fases; las de segundo plano se registran al terminar."""
+
+    def __init__(self, started: float) -> None:
+        self.started = started
+        self.phases: Dict[str, float] = {}
+        self.total: Optional[float] = None
+        self._last = started
+        self._background: Set["asyncio.Task[None]"] = set()
+
+    def _record(self, name: str, seconds: float) -> None:
+        self.phases[name] = seconds
+        STARTUP_PHASE_SECONDS.set(seconds, phase=name)
+
+    def checkpoint(self, name: str) -> None:
+        """Cierra la fase ``name``: el tiempo desde el checkpoint anterior."""
+        now = time.perf_counter()
+        self._record(name, now - self._last)
+        self._last = now
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._last = time.perf_counter()
+            self._record(name, self._last - started)
+
+    def background(self, name: str, work: Awaitable[None]) -> None:
+        """Lanza ``work`` sin retrasar el arranque; su duración se registra como fase al terminar."""
+
+        async def run() -> None:
+            started = time.perf_counter()
+            try:
+                await work
+            except Exception:
+                logger.exception("Fase de arranque en segundo plano '%s' falló", name)
+            else:
+                self._record(name, time.perf_counter() - started)
+                logger.info("Arranque: %s en %.3fs (segundo plano)", name, self.phases[name])
+
+        task = asyncio.get_running_loop().create_task(run())
+        # Referencia fuerte hasta que termine: el loop solo guarda referencias débiles
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def ready(self) -> None:
+        self.total = time.perf_counter() - self.started
+        STARTUP_SECONDS.set(self.total)
+        breakdown = " ".join(f"{name}={seconds:.3f}s" for name, seconds in self.phases.items())
+        logger.info(
+            "Worker listo en %.3fs: %s", self.total, breakdown,
+            extra={"startup_seconds": round(self.total, 4),
+                   "startup_phases": {name: round(seconds, 4) for name, seconds in self.phases.items()}},
+        )
+
+    async def cancel_background(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+
+
+STARTUP = StartupTimer(_PROCESS_STARTED)
+
+
+def bootstrap_on_startup() -> bool:
+    # Se lee al arrancar, no al importar: app.main importa este módulo antes de cargar .env
+    return os.getenv("BOOTSTRAP_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+
+
+def bootstrap() -> None:
+    """Esquema y roles por defecto (lo mismo que ``python -m app.core.migrations upgrade``)."""
+    from app.core.database import engine
+    from app.core.migrations import upgrade
+
+    applied = upgrade(engine)
+    logger.info("Bootstrap al arrancar: migraciones aplicadas %s", applied or "ninguna")
+
+
+def main() -> int:
+    """Importa la app y ejecuta sus eventos de arranque/parada, imprimiendo el desglose."""
+    from app.main import app
+    # Como __main__ este módulo es otra instancia: el temporizador es el que usó app.main
+    from app.core.startup import STARTUP as timer
+
+    async def cycle() -> None:
+        await app.router.startup()
+        # Esperar las fases de segundo plano para incluirlas en el desglose
+        await asyncio.gather(*timer._background)
+        await app.router.shutdown()
+
+    asyncio.run(cycle())
+    for name, seconds in timer.phases.items():
+        print(f"{name:<24} {seconds * 1000:8.1f} ms")
+    print(f"{'listo':<24} {timer.total * 1000:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Lista de revocación de tokens JWT (por ``jti``) con un filtro de Bloom delante.
+
+Logout guarda el ``jti`` y su ``exp`` en la tabla ``revoked_token`` y lo añade al filtro
+local. Cada petición autenticada consulta primero el filtro en memoria: si dice "no está"
+(la inmensa mayoría de tokens) no hay consulta; si dice "puede estar" se confirma contra la
+tabla (revocaciones reales y falsos positivos, ~REVOCATION_BLOOM_ERROR_RATE).
+
+Un filtro de Bloom no admite borrados: hay un filtro por franja de expiración
+(REVOCATION_BUCKET_SECONDS) y las franjas ya vencidas se descartan enteras, igual que la
+purga periódica borra de la tabla las filas con ``expires_at`` pasado.
+
+Las revocaciones de otros workers llegan con la sincronización incremental cada
+REVOCATION_SYNC_SECONDS; hasta la primera carga completa todo token se comprueba en la tabla.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import REGISTRY
+from app.modules.auth.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.01"))
+BUCKET_SECONDS = int(os.getenv("REVOCATION_BUCKET_SECONDS", "900"))
+SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "2"))
+PURGE_SECONDS = float(os.getenv("REVOCATION_PURGE_SECONDS", "600"))
+# Los ids se asignan al insertar pero se ven al confirmar: transacciones concurrentes pueden
+# hacer visible un id menor después de uno mayor, así que cada sincronización relee este margen
+_SYNC_OVERLAP = 100
+
+REVOCATION_CHECKS = REGISTRY.counter(
+    "token_revocation_checks_total",
+    "Comprobaciones de revocación por resultado (bloom_negative, revoked, false_positive, unsynced)",
+    ("result",),
+)
+REVOCATIONS = REGISTRY.counter("token_revocations_total", "Tokens revocados en este worker")
+BLOOM_ENTRIES = REGISTRY.gauge("token_revocation_bloom_entries", "jti cargados en los filtros de Bloom vigentes")
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre un bytearray con doble hashing (blake2b)."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenRevocationList:
+    """Filtros de Bloom por franja de ``exp`` + tabla ``revoked_token`` como fuente de verdad."""
+
+    def __init__(self, session_factory: async_sessionmaker = AsyncSessionLocal) -> None:
+        self.session_factory = session_factory
+        self._buckets: Dict[int, BloomFilter] = {}
+        self._last_id = 0
+        self._synced = False
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def _remember(self, jti: str, exp: float) -> None:
+        bucket = int(exp) // BUCKET_SECONDS
+        with self._lock:
+            bloom = self._buckets.get(bucket)
+            if bloom is None:
+                bloom = self._buckets[bucket] = BloomFilter(BLOOM_CAPACITY, BLOOM_ERROR_RATE)
+            # La sincronización vuelve a traer los revocados por este worker: no contarlos dos veces
+            if jti not in bloom:
+                bloom.add(jti)
+
+    def _evict_expired(self) -> None:
+        # Una franja cuyo final ya pasó solo contiene tokens que jwt.decode rechaza por exp
+        current = int(time.time()) // BUCKET_SECONDS
+        with self._lock:
+            for bucket in [bucket for bucket in self._buckets if bucket < current]:
+                del self._buckets[bucket]
+            BLOOM_ENTRIES.set(sum(bloom.count for bloom in self._buckets.values()))
+
+    async def is_revoked(self, jti: Optional[str], exp: Optional[float]) -> bool:
+        if not jti or exp is None:
+            # Tokens emitidos antes de incluir jti: no se pueden revocar uno a uno
+            return False
+        if self._synced:
+            bloom = self._buckets.get(int(exp) // BUCKET_SECONDS)
+            if bloom is None or jti not in bloom:
+                REVOCATION_CHECKS.inc(result="bloom_negative")
+                return False
+        async with self.session_factory() as db:
+            revoked = await db.scalar(select(RevokedToken.id_revoked_token).where(RevokedToken.jti == jti)) is not None
+        REVOCATION_CHECKS.inc(result="revoked" if revoked else ("false_positive" if self._synced else "unsynced"))
+        return revoked
+
+    async def revoke(self, jti: Optional[str], exp: Optional[float]) -> None:
+        if not jti or exp is None or exp <= time.time():
+            return
+        async with self.session_factory() as db:
+            db.add(RevokedToken(jti=jti, expires_at=datetime.utcfromtimestamp(exp), revoked_at=datetime.utcnow()))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Ya revocado (doble logout o dos workers a la vez)
+                await db.rollback()
+        self._remember(jti, exp)
+        REVOCATIONS.inc()
+
+    async def sync(self) -> None:
+        """Carga los jti revocados desde la última sincronización y purga lo vencido."""
+        async with self.session_factory() as db:
+            rows = (await db.execute(
+                select(RevokedToken.id_revoked_token, RevokedToken.jti, RevokedToken.expires_at)
+                .where(RevokedToken.id_revoked_token > self._last_id - _SYNC_OVERLAP, RevokedToken.expires_at > datetime.utcnow())
+                .order_by(RevokedToken.id_revoked_token)
+            )).all()
+            for id_revoked_token, jti, expires_at in rows:
+                self._remember(jti, (expires_at - datetime(1970, 1, 1)).total_seconds())
+                self._last_id = max(self._last_id, id_revoked_token)
+            if time.monotonic() - self._last_purge >= PURGE_SECONDS:
+                await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+                await db.commit()
+                self._last_purge = time.monotonic()
+        self._evict_expired()
+        self._synced = True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Sincronización de tokens revocados fallida: %s", e)
+            await asyncio.sleep(SYNC_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+TOKEN_REVOCATIONS = TokenRevocationList()
@@ -1,20 +1,41 @@
-from fastapi import FastAPI
+# Primero: fija el instante de referencia del desglose de arranque
+from app.core.startup import STARTUP, bootstrap, bootstrap_on_startup
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
+import logging
 import os
 
 # Cargar variables de entorno desde .env
 load_dotenv()
 
+from app.core.logger import configure_logging
+
+# Logging estructurado (cola + hilo escritor) antes de importar el resto de módulos
+configure_logging()
+logger = logging.getLogger(__name__)
+STARTUP.checkpoint("import_fastapi_logging")
+
 from app.core.middleware import configure_middleware
-from app.core.database import create_tables, initialize_default_roles
+from app.core.metrics import render_prometheus
+from app.core.dependencies import require_metrics_access
+from app.core.read_replicas import REPLICA_ROUTER
+from app.core.password_hasher import PASSWORD_HASHER
+from app.core.database import async_engine
+from app.core.token_revocation import TOKEN_REVOCATIONS
+STARTUP.checkpoint("import_core")
 # from app.modules.citas.routers import health, citas, citas_today
 from app.modules.auth.routers.user_router import router as user_router
 from app.modules.auth.routers.auth_router import router as auth_router
 from app.modules.register.routers.register_router import router as register_router
 from app.modules.expert_system.routers.expert_system_router import router as expert_system_router
+from app.modules.monitoring.routers.profiler_router import router as profiler_router
 # from app.modules.assistantAI.routers.assistantAI_router import router as assistantAI_router
 # from app.modules.schedules.routers.schedule_router import router as schedule_router
 # from app.modules.medical_history.routers.medical_history_router import router as medical_history_router
+STARTUP.checkpoint("import_routers")
 
 app = FastAPI(title="Expert System Project - Backend", version="0.2.0")
 
@@ -23,9 +44,25 @@ configure_middleware(app)
 
 @app.on_event("startup")
 async def startup_event():
-    create_tables()
-    initialize_default_roles()
-    print("[startup] Routers registrados: users, auth, register, expert-system")
+    # El esquema y los roles los prepara el despliegue (python -m app.core.migrations upgrade)
+    if bootstrap_on_startup():
+        with STARTUP.phase("bootstrap"):
+            await run_in_threadpool(bootstrap)
+    # Los procesos de hashing arrancan sin retrasar el servicio; un login anterior solo espera al spawn
+    STARTUP.background("password_pool_warm_up", PASSWORD_HASHER.warm_up())
+    # Carga y sincronización periódica de tokens revocados (la primera vuelta no bloquea el arranque)
+    TOKEN_REVOCATIONS.start()
+    logger.info("[startup] Routers registrados: users, auth, register, expert-system, profiler")
+    STARTUP.ready()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await STARTUP.cancel_background()
+    await TOKEN_REVOCATIONS.stop()
+    # Cierra las conexiones del pool async antes de que termine el event loop
+    await async_engine.dispose()
+    await REPLICA_ROUTER.dispose()
+    PASSWORD_HASHER.shutdown()
 
 # app.include_router(health.router)
 # app.include_router(citas.router)  # Main appointments router
@@ -36,9 +73,11 @@ app.include_router(user_router)
 app.include_router(auth_router)
 app.include_router(register_router)
 app.include_router(expert_system_router)
+app.include_router(profiler_router)
 # app.include_router(assistantAI_router)
 # app.include_router(schedule_router)
 # app.include_router(medical_history_router)
+STARTUP.checkpoint("build_app")
 
 @app.get("/")
 @app.head("/")
@@ -50,6 +89,7 @@ def read_root():
             "auth": "/auth/",
             "register": "/register/",
             "expert-system": "/expert-system/recommend",
+            "metrics": "/metrics",
             "docs": "/docs",
             "redoc": "/redoc"
         }
@@ -67,3 +107,8 @@ def list_routes():
             for r in app.router.routes
         ]
     }
+
+# Latencias por ruta, admisión y cachés de auth: solo para el scraper (METRICS_TOKEN) o admins
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_access)])
+def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -6,7 +6,7 @@ class Credentials(Base):
     __tablename__ = "credentials"
 
     id_credentials = Column(Integer, primary_key=True, index=True)
-    id_user = Column(Integer, ForeignKey("user.id_user"), nullable=False)
+    id_user = Column(Integer, ForeignKey("user.id_user"), nullable=False, index=True)
     email = Column(String(50), unique=True, nullable=False)
     password = Column(String(255), nullable=False)
 
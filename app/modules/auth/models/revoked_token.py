@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from app.core.database import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_token"
+
+    # Autoincremental: marca de agua de la sincronización incremental entre workers
+    id_revoked_token = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(64), unique=True, nullable=False)
+    # exp del token: pasada esta fecha la fila ya no hace falta y se purga
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=False)
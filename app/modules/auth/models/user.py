@@ -8,7 +8,7 @@ class User(Base):
     id_user = Column(Integer, primary_key=True, index=True)
     firstName = Column(String(100), nullable=False)
     lastName = Column(String(100), nullable=False)
-    username = Column(String(100), nullable=False)
+    username = Column(String(100), nullable=False, unique=True, index=True)
     phone = Column(String(20))
     id_status = Column(Boolean, default=True)
 
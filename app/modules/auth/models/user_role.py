@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class UserRole(Base):
     __tablename__ = "user_role"
+    __table_args__ = (
+        # Join usuario -> rol y filtro por rol de get_patients (ver migración 0001)
+        Index("ix_user_role_id_user", "id_user", "id_role"),
+        Index("ix_user_role_id_role", "id_role", "id_user"),
+    )
 
     id_user_role = Column(Integer, primary_key=True, index=True)
     id_user = Column(Integer, ForeignKey("user.id_user"), nullable=False)
@@ -1,28 +1,33 @@
 """
 Router de autenticación con JWT
 """
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
+from app.core.auth_cache import USER_CONTEXT_CACHE
 from app.core.dependencies import get_db, verify_jwt_auth
-from app.core.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.security import create_access_token, verify_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.token_revocation import TOKEN_REVOCATIONS
 from app.modules.auth.services.user_service import UserService
 from app.modules.auth.schemas.auth.login_dto import LoginRequest, LoginResponse, UserInfo
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 @router.post("/login", response_model=LoginResponse)
-async def login(login_data: LoginRequest, response: Response, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, response: Response, db: AsyncSession = Depends(get_db)):
     """
     Iniciar sesión con email y contraseña
     """
-    print("🚀 ENDPOINT EJECUTÁNDOSE - /auth/login")
-    print(f"🔍 Datos de login recibidos: {login_data.email}")
+    logger.debug("ENDPOINT EJECUTÁNDOSE - /auth/login")
+    logger.debug("Datos de login recibidos: %s", login_data.email)
     
     try:
         user_service = UserService(db)
-        user_info = user_service.verify_credentials(login_data.email, login_data.password)
+        user_info = await user_service.verify_credentials(login_data.email, login_data.password)
         
         # Crear token de acceso
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -54,8 +59,11 @@ async def login(login_data: LoginRequest, response: Response, db: Session = Depe
             detail=str(e),
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except HTTPException:
+        # p. ej. 503 del pool de hashing saturado
+        raise
     except Exception as e:
-        print(f"❌ Error en login: {e}")
+        logger.exception("Error en login: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor"
@@ -69,10 +77,23 @@ async def get_current_user_info(current_user: dict = Depends(verify_jwt_auth)):
     return UserInfo(**current_user)
 
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(request: Request, response: Response):
     """
-    Cerrar sesión - eliminar cookie HttpOnly
+    Cerrar sesión - revocar el token (cookie o header Authorization) y eliminar la cookie HttpOnly
     """
+    token = request.cookies.get("auth_token")
+    auth_header = request.headers.get("Authorization")
+    if not token and auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
+    if token:
+        USER_CONTEXT_CACHE.discard(token)
+        try:
+            payload = verify_token(token)
+        except HTTPException:
+            payload = None  # token inválido o vencido: no hay nada que revocar
+        if payload is not None:
+            await TOKEN_REVOCATIONS.revoke(payload.get("jti"), payload.get("exp"))
+
     # Eliminar la cookie HttpOnly
     response.delete_cookie(
         key="auth_token",
@@ -1,37 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
+import logging
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.dependencies import get_db, get_read_db, require_permission
+from app.core.read_replicas import open_read_session
 from app.modules.auth.services.user_service import UserService
 from app.modules.auth.schemas.user.user_response_dto import UserResponseDto
 from app.modules.register.services.register_service import RegisterService
 from app.modules.register.schemas.create_user_dto import CreateUserDto
-from typing import List
+from app.modules.register.schemas.import_report_dto import ImportReportDto
+from app.modules.register.services.user_import_service import UserImportService
+from typing import List, Literal, Optional
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["users"])
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 1000
+
 @router.get("/users/test")
 def test_endpoint():
     """Endpoint de prueba"""
-    print("🧪 ENDPOINT DE PRUEBA EJECUTÁNDOSE")
+    logger.debug("ENDPOINT DE PRUEBA EJECUTÁNDOSE")
     return {"message": "Router de usuarios funcionando", "status": "ok"}
 
-def get_db():
-    """Dependencia para obtener la sesión de base de datos"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.get("/users/{user_id}", response_model=UserResponseDto)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_read_db)):
     """
     Obtener un usuario por ID
     """
     try:
         user_service = UserService(db)
-        user = user_service.get_user_by_id(user_id)
+        user = await user_service.get_user_by_id(user_id)
         return user
     except ValueError as e:
         raise HTTPException(
@@ -44,15 +46,53 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
             detail="Error interno del servidor"
         )
 
+async def _ndjson_stream(request: Request, patients_only: bool, search: Optional[str], cursor: Optional[int]):
+    # Sesión propia (el generador sigue leyendo después de que el handler retorna), elegida con
+    # la misma regla que get_read_db: primario si el cliente escribió hace poco, réplica si no
+    async with await open_read_session(request) as db:
+        async for user in UserService(db).iter_users(patients_only, search, cursor, STREAM_BATCH_SIZE):
+            yield user.model_dump_json() + "\n"
+
+
+async def _list_users(
+    request: Request, response: Response, db: AsyncSession, patients_only: bool, search: Optional[str],
+    limit: Optional[int], cursor: Optional[int], output: str,
+):
+    if output == "ndjson":
+        stream = StreamingResponse(_ndjson_stream(request, patients_only, search, cursor), media_type="application/x-ndjson")
+        # FastAPI no copia a una Response devuelta lo fijado en ``response`` (p. ej. la cookie
+        # db_primary_until de read-your-writes): se traslada igual que en la respuesta JSON
+        stream.raw_headers.extend(
+            (name, value) for name, value in response.raw_headers if name not in (b"content-length", b"content-type")
+        )
+        return stream
+    user_service = UserService(db)
+    if limit is None and cursor is None:
+        # Sin paginación: respuesta completa como antes (compatibilidad)
+        return await (user_service.get_patients(search) if patients_only else user_service.get_all_users())
+    users, next_cursor = await user_service.list_users_page(limit or DEFAULT_PAGE_SIZE, cursor, patients_only, search)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return users
+
+
 @router.get("/users/", response_model=List[UserResponseDto])
-def get_all_users(db: Session = Depends(get_db)):
+async def get_all_users(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(default=None, ge=0, description="id_user del último elemento recibido"),
+    output: Literal["json", "ndjson"] = Query(default="json", alias="format"),
+    db: AsyncSession = Depends(get_read_db),
+):
     """
     Obtener todos los usuarios
+
+    Con ``limit``/``cursor`` pagina por id_user y devuelve el cursor siguiente en la cabecera
+    X-Next-Cursor; con ``format=ndjson`` transmite todos los usuarios en streaming.
     """
     try:
-        user_service = UserService(db)
-        users = user_service.get_all_users()
-        return users
+        return await _list_users(request, response, db, False, None, limit, cursor, output)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -60,46 +100,78 @@ def get_all_users(db: Session = Depends(get_db)):
         )
 
 @router.get("/patients/", response_model=List[UserResponseDto])
-def get_patients(search: str = None, db: Session = Depends(get_db)):
+async def get_patients(
+    request: Request,
+    response: Response,
+    search: str = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(default=None, ge=0, description="id_user del último elemento recibido"),
+    output: Literal["json", "ndjson"] = Query(default="json", alias="format"),
+    db: AsyncSession = Depends(get_read_db),
+):
     """
     Obtener solo pacientes con búsqueda opcional
 
     Args:
         search (str, optional): Término de búsqueda para nombre, apellido o identificación
+        limit, cursor, format: paginación por keyset o streaming NDJSON, igual que /users/
     """
     try:
-        print(f"🚀 ENDPOINT: /patients/ ejecutándose con search='{search}'")
-        user_service = UserService(db)
-        patients = user_service.get_patients(search)
-        print(f"✅ ENDPOINT: Retornando {len(patients)} pacientes")
-        return patients
+        logger.debug("/patients/ ejecutándose con search='%s'", search)
+        return await _list_users(request, response, db, True, search, limit, cursor, output)
     except Exception as e:
-        print(f"❌ ENDPOINT: Error en /patients/: {e}")
+        logger.exception("Error en /patients/: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor"
         )
 
 @router.post("/users/register", status_code=status.HTTP_201_CREATED)
-def create_user(data: CreateUserDto, db: Session = Depends(get_db)):
+async def create_user(data: CreateUserDto, db: AsyncSession = Depends(get_db)):
     """
     Crear un nuevo usuario
     """
-    print("🚀 ENDPOINT EJECUTÁNDOSE - /users/register")
-    print(f"🔍 Datos recibidos: {data}")
-    print(f"🔍 Tipo: {type(data)}")
-    print(f"🔍 Diccionario: {data.dict()}")
+    logger.debug("ENDPOINT EJECUTÁNDOSE - /users/register")
     try:
         register_service = RegisterService(db)
-        new_user = register_service.create_user(data)
+        new_user = await register_service.create_user(data)
         return new_user
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except HTTPException:
+        # p. ej. 503 del pool de hashing saturado
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor"
-        )
\ No newline at end of file
+        )
+
+@router.post("/users/import", response_model=ImportReportDto, dependencies=[Depends(require_permission("users:import"))])
+async def import_users(file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
+    """
+    Importar usuarios desde un CSV o XLSX con las columnas de registro
+    (firstName, lastName, username, phone, email, password, id_role)
+
+    Las filas válidas se crean por bloques; las inválidas se devuelven en ``errors`` con su
+    número de fila.
+    """
+    logger.debug("ENDPOINT EJECUTÁNDOSE - /users/import (%s)", file.filename)
+    try:
+        return await UserImportService(db).import_file(file.file, file.filename)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error en /users/import: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error interno del servidor"
+        )
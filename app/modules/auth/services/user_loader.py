@@ -0,0 +1,108 @@
+"""
+Cargador de proyecciones de usuario (User + Credentials + UserRole) en una sola consulta
+"""
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.modules.auth.models.credentials import Credentials
+from app.modules.auth.models.user import User
+from app.modules.auth.models.user_role import UserRole
+
+# Campo de salida -> columna. "password" (hash) solo se carga si se pide explícitamente.
+COLUMNS = {
+    "id_user": User.id_user,
+    "firstName": User.firstName,
+    "lastName": User.lastName,
+    "username": User.username,
+    "phone": User.phone,
+    "id_status": User.id_status,
+    "email": Credentials.email,
+    "password": Credentials.password,
+    "id_role": UserRole.id_role,
+}
+DEFAULT_FIELDS = ("id_user", "firstName", "lastName", "username", "phone", "id_status", "email", "id_role")
+
+# Orden base: agrupa las filas de un mismo usuario (necesario para deduplicar) y da el keyset
+ORDER_BY = (User.id_user, Credentials.id_credentials, UserRole.id_user_role)
+
+# Valores por defecto cuando el usuario no tiene credenciales o rol (LEFT JOIN sin fila)
+_DEFAULTS = {"phone": "", "email": "", "id_role": 1}
+
+
+class UserLoader:
+    """Construye y ejecuta la consulta unificada de usuarios con sus credenciales y rol.
+
+    Un usuario con varias filas de credenciales o de rol aparece una sola vez: se conserva
+    la primera fila por id (mismo criterio que los ``.first()`` que reemplaza).
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    def select(self, fields: Optional[Sequence[str]] = None) -> Select:
+        fields = tuple(fields or DEFAULT_FIELDS)
+        unknown = [f for f in fields if f not in COLUMNS]
+        if unknown:
+            raise ValueError(f"Campos no soportados: {', '.join(unknown)}")
+        if "id_user" not in fields:
+            fields = ("id_user",) + fields
+        return (
+            select(*(COLUMNS[f].label(f) for f in fields))
+            .select_from(User)
+            .outerjoin(Credentials, Credentials.id_user == User.id_user)
+            .outerjoin(UserRole, UserRole.id_user == User.id_user)
+            .order_by(*ORDER_BY)
+        )
+
+    async def load(self, stmt: Select) -> List[Dict[str, Any]]:
+        """Filas como dicts, una por usuario, en orden de id_user."""
+        result = await self.db.execute(stmt)
+        return list(self._dedupe(result.mappings()))
+
+    async def stream(self, stmt: Select, yield_per: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """Como ``load`` pero leyendo por lotes (cursor del lado servidor en Postgres)."""
+        result = await self.db.stream(stmt.execution_options(yield_per=yield_per))
+        last_id = None
+        async for row in result.mappings():
+            if row["id_user"] == last_id:
+                continue
+            last_id = row["id_user"]
+            yield self._with_defaults(row)
+
+    async def first(self, stmt: Select) -> Optional[Dict[str, Any]]:
+        # El ORDER BY empieza por id_user, así que la primera fila ya es la del primer usuario
+        rows = await self.load(stmt.limit(1))
+        return rows[0] if rows else None
+
+    async def page(self, stmt: Select, limit: int, after: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Paginación por keyset sobre id_user: devuelve (usuarios, cursor siguiente o None).
+
+        El LIMIT se aplica a filas del JOIN (limit + 1 para saber si hay más); con usuarios
+        duplicados por varias credenciales/roles la página puede traer menos de ``limit``.
+        """
+        if after is not None:
+            stmt = stmt.where(User.id_user > after)
+        rows = (await self.db.execute(stmt.limit(limit + 1))).mappings().all()
+        items = list(self._dedupe(rows))[:limit]
+        next_cursor = items[-1]["id_user"] if len(rows) > limit and items else None
+        return items, next_cursor
+
+    @staticmethod
+    def _dedupe(rows: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+        last_id = None
+        for row in rows:
+            if row["id_user"] == last_id:
+                continue
+            last_id = row["id_user"]
+            yield UserLoader._with_defaults(row)
+
+    @staticmethod
+    def _with_defaults(row: Any) -> Dict[str, Any]:
+        item = dict(row)
+        for key, default in _DEFAULTS.items():
+            if key in item and item[key] is None:
+                item[key] = default
+        return item
@@ -0,0 +1,77 @@
+"""
+Búsqueda difusa de usuarios por nombre con índice trigram (pg_trgm) y ranking por similitud.
+
+El documento de búsqueda es ``lower(firstName || ' ' || lastName || ' ' || username)``; en
+Postgres lo cubre un índice GIN ``gin_trgm_ops`` que sirve tanto ILIKE '%term%' como el
+operador de similitud. En SQLite (tests/desarrollo) se registra una función ``similarity``
+equivalente en Python y la búsqueda recorre la tabla.
+"""
+import sqlite3
+from typing import Set
+
+from sqlalchemy import event, func, literal_column, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import Select
+
+from app.modules.auth.models.user import User
+from app.modules.auth.services.user_loader import ORDER_BY
+
+SEARCH_INDEX_NAME = "ix_user_search_trgm"
+
+
+def search_document():
+    # El separador va como literal (no parámetro) para que la expresión coincida con la del índice
+    space = literal_column("' '")
+    return func.lower(User.firstName + space + User.lastName + space + User.username)
+
+
+def _trigrams(value: str) -> Set[str]:
+    grams: Set[str] = set()
+    for word in "".join(ch if ch.isalnum() else " " for ch in value.lower()).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def trigram_similarity(left: str, right: str) -> float:
+    """Misma definición que pg_trgm.similarity: |A ∩ B| / |A ∪ B| sobre trigramas por palabra."""
+    a, b = _trigrams(left or ""), _trigrams(right or "")
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def apply_search(query: Select, term: str, ranked: bool = False) -> Select:
+    """Filtra por subcadena del documento normalizado; con ``ranked`` ordena por similitud."""
+    term = term.strip().lower()
+    pattern = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    document = search_document()
+    query = query.where(document.ilike(f"%{pattern}%", escape="\\"))
+    if ranked:
+        # La similitud va primero; el orden base (id_user...) queda como desempate y mantiene
+        # juntas las filas de un mismo usuario
+        query = query.order_by(None).order_by(func.similarity(document, term).desc(), *ORDER_BY)
+    return query
+
+
+def create_search_index(conn: Connection) -> None:
+    """Crea la extensión pg_trgm y el índice GIN del documento de búsqueda (solo Postgres).
+
+    Lo ejecuta la migración 0002 (app/core/migrations.py).
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    document = 'lower("firstName" || \' \' || "lastName" || \' \' || username)'
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    conn.execute(text(
+        f'CREATE INDEX IF NOT EXISTS {SEARCH_INDEX_NAME} ON "user" USING gin (({document}) gin_trgm_ops)'
+    ))
+
+
+@event.listens_for(Engine, "connect")
+def _register_sqlite_similarity(dbapi_connection, connection_record) -> None:
+    # sqlite3 directo (motor síncrono) o el adaptador de aiosqlite (motor async), que expone
+    # la misma create_function
+    driver = type(getattr(dbapi_connection, "driver_connection", None)).__module__
+    if isinstance(dbapi_connection, sqlite3.Connection) or driver.startswith("aiosqlite"):
+        dbapi_connection.create_function("similarity", 2, trigram_similarity, deterministic=True)
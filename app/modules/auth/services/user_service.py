@@ -1,71 +1,42 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+import logging
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from app.modules.auth.models.user import User
 from app.modules.auth.models.credentials import Credentials
 from app.modules.auth.models.user_role import UserRole
 from app.modules.auth.schemas.user.user_response_dto import UserResponseDto
-from app.core.security import get_password_hash, verify_password
-from typing import List, Optional
+from app.modules.auth.services.user_loader import UserLoader
+from app.modules.auth.services.user_search import apply_search
+from app.core.password_hasher import PASSWORD_HASHER, REHASHED, needs_rehash
+from typing import AsyncIterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 class UserService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
     
-    def get_user_by_id(self, user_id: int) -> UserResponseDto:
+    async def get_user_by_id(self, user_id: int) -> UserResponseDto:
         """Obtener usuario por ID"""
-        user = self.db.query(User).filter(User.id_user == user_id).first()
-        if not user:
+        loader = UserLoader(self.db)
+        row = await loader.first(loader.select().where(User.id_user == user_id))
+        if not row:
             raise ValueError("Usuario no encontrado")
-        
-        # Obtener credenciales del usuario
-        credentials = self.db.query(Credentials).filter(Credentials.id_user == user_id).first()
-        
-        # Obtener el rol del usuario
-        user_role = self.db.query(UserRole).filter(UserRole.id_user == user_id).first()
-        
-        return UserResponseDto(
-            id_user=user.id_user,
-            firstName=user.firstName,
-            lastName=user.lastName,
-            username=user.username,
-            phone=user.phone or "",
-            email=credentials.email if credentials else "",
-            id_status=user.id_status,
-            id_role=user_role.id_role if user_role else 1,  # Por defecto paciente
-            createdAt=datetime.now().isoformat(),
-            updatedAt=datetime.now().isoformat()
-        )
+        return self._to_dto(row, datetime.now().isoformat())
     
-    def get_all_users(self) -> List[UserResponseDto]:
-        """Obtener todos los usuarios"""
-        users = self.db.query(User).all()
-        result = []
-        
-        for user in users:
-            # Obtener credenciales del usuario
-            credentials = self.db.query(Credentials).filter(Credentials.id_user == user.id_user).first()
-            
-            # Obtener el rol del usuario
-            user_role = self.db.query(UserRole).filter(UserRole.id_user == user.id_user).first()
-            
-            result.append(UserResponseDto(
-                id_user=user.id_user,
-                firstName=user.firstName,
-                lastName=user.lastName,
-                username=user.username,
-                phone=user.phone or "",
-                email=credentials.email if credentials else "",
-                id_status=user.id_status,
-                id_role=user_role.id_role if user_role else 1,
-                createdAt=datetime.now().isoformat(),
-                updatedAt=datetime.now().isoformat()
-            ))
-        
-        return result
+    async def get_all_users(self) -> List[UserResponseDto]:
+        """Obtener todos los usuarios (una sola consulta con credenciales y rol)"""
+        loader = UserLoader(self.db)
+        now = datetime.now().isoformat()
+        return [self._to_dto(row, now) for row in await loader.load(loader.select())]
+
+    @staticmethod
+    def _to_dto(row: dict, timestamp: str) -> UserResponseDto:
+        return UserResponseDto(**row, createdAt=timestamp, updatedAt=timestamp)
     
-    def verify_credentials(self, email: str, password: str) -> dict:
+    async def verify_credentials(self, email: str, password: str) -> dict:
         """
         Verificar credenciales de login
         
@@ -76,39 +47,55 @@ class UserService:
         Returns:
             dict: Información del usuario si las credenciales son correctas
         """
-        print(f"🔍 USER_SERVICE: Verificando credenciales para {email}")
+        logger.debug("Verificando credenciales para %s", email)
         
-        # Buscar credenciales por email
-        credentials = self.db.query(Credentials).filter(Credentials.email == email).first()
-        if not credentials:
-            print("❌ USER_SERVICE: Email no encontrado")
+        # Credenciales, usuario y rol en una sola consulta
+        loader = UserLoader(self.db)
+        row = await loader.first(
+            loader.select(("firstName", "lastName", "email", "password", "id_role", "id_status"))
+            .where(Credentials.email == email)
+        )
+        if not row:
+            logger.info("Email no encontrado")
             raise ValueError("Credenciales inválidas")
         
-        # Verificar contraseña
-        if not verify_password(password, credentials.password):
-            print("❌ USER_SERVICE: Contraseña incorrecta")
+        # Verificar contraseña (bcrypt es CPU: en el pool de hashing, fuera del event loop)
+        if not await PASSWORD_HASHER.verify(password, row["password"]):
+            logger.info("Contraseña incorrecta")
             raise ValueError("Credenciales inválidas")
+
+        # Hash por debajo de la política vigente: aprovechar que tenemos la contraseña
+        if needs_rehash(row["password"]):
+            await self._rehash_password(email, password, row["password"])
         
-        # Obtener información del usuario
-        user = self.db.query(User).filter(User.id_user == credentials.id_user).first()
-        if not user:
-            print("❌ USER_SERVICE: Usuario no encontrado")
-            raise ValueError("Usuario no encontrado")
-        
-        # Obtener rol del usuario
-        user_role = self.db.query(UserRole).filter(UserRole.id_user == user.id_user).first()
-        
-        print("✅ USER_SERVICE: Credenciales verificadas correctamente")
+        logger.debug("Credenciales verificadas correctamente")
         return {
-            "id": user.id_user,
-            "firstName": user.firstName,
-            "lastName": user.lastName,
-            "email": credentials.email,
-            "id_role": user_role.id_role if user_role else 1,
-            "id_status": user.id_status
+            "id": row["id_user"],
+            "firstName": row["firstName"],
+            "lastName": row["lastName"],
+            "email": row["email"],
+            "id_role": row["id_role"],
+            "id_status": row["id_status"]
         }
 
-    def get_patients(self, search: Optional[str] = None) -> List[UserResponseDto]:
+    async def _rehash_password(self, email: str, password: str, old_hash: str) -> None:
+        scheme = "sha256" if old_hash.startswith("sha256:") else "bcrypt"
+        try:
+            new_hash = await PASSWORD_HASHER.hash(password)
+            # Condicionado al hash leído: no pisar un cambio de contraseña concurrente
+            await self.db.execute(
+                update(Credentials)
+                .where(Credentials.email == email, Credentials.password == old_hash)
+                .values(password=new_hash)
+            )
+            await self.db.commit()
+            REHASHED.inc(scheme=scheme)
+        except Exception as e:
+            # El login ya es válido; el rehash se reintenta en el próximo
+            await self.db.rollback()
+            logger.warning("No se pudo actualizar el hash de contraseña: %s", e)
+
+    async def get_patients(self, search: Optional[str] = None) -> List[UserResponseDto]:
         """
         Obtener solo pacientes (id_role = 1) con búsqueda opcional
 
@@ -118,57 +105,61 @@ class UserService:
         Returns:
             List[UserResponseDto]: Lista de pacientes que coinciden con la búsqueda
         """
-        print(f"🔍 USER_SERVICE: Obteniendo pacientes con búsqueda: '{search}'")
+        logger.debug("Obteniendo pacientes con búsqueda: '%s'", search)
+
+        loader = UserLoader(self.db)
+        # Sin paginar, los resultados de búsqueda se ordenan por similitud con el término
+        query = self._patients_query(loader, search, ranked=True)
+
+        # Ejecutar query y convertir a DTOs
+        now = datetime.now().isoformat()
+        result = [self._to_dto(row, now) for row in await loader.load(query)]
+
+        logger.debug("Retornando %s pacientes", len(result))
+        return result
+
+    async def list_users_page(
+        self, limit: int, cursor: Optional[int] = None, patients_only: bool = False, search: Optional[str] = None
+    ) -> Tuple[List[UserResponseDto], Optional[int]]:
+        """
+        Página de usuarios (o pacientes) por keyset sobre id_user
 
+        Returns:
+            Tuple[List[UserResponseDto], Optional[int]]: usuarios y cursor de la página siguiente
+        """
+        loader = UserLoader(self.db)
+        query = self._patients_query(loader, search) if patients_only else loader.select()
+        rows, next_cursor = await loader.page(query, limit, cursor)
+        now = datetime.now().isoformat()
+        return [self._to_dto(row, now) for row in rows], next_cursor
+
+    async def iter_users(
+        self, patients_only: bool = False, search: Optional[str] = None, cursor: Optional[int] = None, batch_size: int = 1000
+    ) -> AsyncIterator[UserResponseDto]:
+        """Itera usuarios (o pacientes) leyendo por lotes, sin materializar la lista completa"""
+        loader = UserLoader(self.db)
+        query = self._patients_query(loader, search) if patients_only else loader.select()
+        if cursor is not None:
+            query = query.where(User.id_user > cursor)
+        now = datetime.now().isoformat()
+        async for row in loader.stream(query, yield_per=batch_size):
+            yield self._to_dto(row, now)
+
+    @staticmethod
+    def _patients_query(loader: UserLoader, search: Optional[str], ranked: bool = False):
         # Query base: obtener usuarios que son pacientes (id_role = 1) y están activos
-        query = self.db.query(User).join(UserRole).filter(
+        query = loader.select().where(
             UserRole.id_role == 1,  # Solo pacientes
             User.id_status == True   # Solo usuarios activos
         )
 
-        # Aplicar filtro de búsqueda si se proporciona
+        # Aplicar filtro de búsqueda si se proporciona (índice trigram en Postgres)
         if search and search.strip():
-            search_term = f"%{search.strip().lower()}%"
-            query = query.filter(
-                or_(
-                    User.firstName.ilike(search_term),
-                    User.lastName.ilike(search_term),
-                    User.username.ilike(search_term),
-                    (User.firstName + ' ' + User.lastName).ilike(search_term)
-                )
-            )
-            print(f"🔍 USER_SERVICE: Aplicando filtro de búsqueda: {search_term}")
-
-        # Ejecutar query
-        users = query.all()
-        print(f"✅ USER_SERVICE: Encontrados {len(users)} pacientes")
-
-        # Convertir a DTOs
-        result = []
-        for user in users:
-            # Obtener credenciales del usuario
-            credentials = self.db.query(Credentials).filter(Credentials.id_user == user.id_user).first()
-
-            # Obtener el rol del usuario (ya sabemos que es 1, pero por consistencia)
-            user_role = self.db.query(UserRole).filter(UserRole.id_user == user.id_user).first()
-
-            result.append(UserResponseDto(
-                id_user=user.id_user,
-                firstName=user.firstName,
-                lastName=user.lastName,
-                username=user.username,
-                phone=user.phone or "",
-                email=credentials.email if credentials else "",
-                id_status=user.id_status,
-                id_role=user_role.id_role if user_role else 1,
-                createdAt=datetime.now().isoformat(),
-                updatedAt=datetime.now().isoformat()
-            ))
-
-        print(f"✅ USER_SERVICE: Retornando {len(result)} pacientes procesados")
-        return result
+            query = apply_search(query, search, ranked=ranked)
+            logger.debug("Aplicando filtro de búsqueda: %s", search)
+        return query
 
-    def get_user_info_by_email(self, email: str) -> dict:
+    async def get_user_info_by_email(self, email: str) -> dict:
         """
         Obtener información del usuario por email sin verificar contraseña
 
@@ -178,29 +169,21 @@ class UserService:
         Returns:
             dict: Información del usuario
         """
-        print(f"🔍 USER_SERVICE: Obteniendo información del usuario para {email}")
+        logger.debug("Obteniendo información del usuario para %s", email)
 
-        # Buscar credenciales por email
-        credentials = self.db.query(Credentials).filter(Credentials.email == email).first()
-        if not credentials:
-            print("❌ USER_SERVICE: Email no encontrado")
+        loader = UserLoader(self.db)
+        row = await loader.first(loader.select().where(Credentials.email == email))
+        if not row:
+            logger.info("Email no encontrado")
             raise ValueError("Usuario no encontrado")
 
-        # Obtener información del usuario
-        user = self.db.query(User).filter(User.id_user == credentials.id_user).first()
-        if not user:
-            print("❌ USER_SERVICE: Usuario no encontrado")
-            raise ValueError("Usuario no encontrado")
-
-        # Obtener rol del usuario
-        user_role = self.db.query(UserRole).filter(UserRole.id_user == user.id_user).first()
-
-        print("✅ USER_SERVICE: Información del usuario obtenida correctamente")
+        logger.debug("Información del usuario obtenida correctamente")
         return {
-            "id_user": user.id_user,
-            "firstName": user.firstName,
-            "lastName": user.lastName,
-            "email": credentials.email,
-            "id_role": user_role.id_role if user_role else 1,
-            "id_status": user.id_status
+            "id": row["id_user"],
+            "id_user": row["id_user"],
+            "firstName": row["firstName"],
+            "lastName": row["lastName"],
+            "email": row["email"],
+            "id_role": row["id_role"],
+            "id_status": row["id_status"]
         }
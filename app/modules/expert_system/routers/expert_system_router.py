@@ -1,20 +1,108 @@
-import os
+import threading
+import time
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, List, Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import Optional, List
 from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 
+from app.core.http_cache import CACHE_POLICIES, code_version, conditional, make_etag, normalized_query
+from app.core.instrumentation import record_phase, timing_phase
 from app.modules.expert_system.schemas.recommendation_request_dto import RecommendationRequest
 from app.modules.expert_system.schemas.recommendation_response_dto import RecommendationResponse
 from app.modules.expert_system.schemas.constraints_request_dto import DiagnoseRequest
+from app.modules.expert_system.schemas.similar_games_response_dto import SimilarGamesResponse, SimilarGameItem
 from app.modules.expert_system.services.expert_engine import ExpertEngine
 from app.modules.expert_system.services.rawg_client import RawgClient
+from app.modules.expert_system.services import catalog_store
 from app.modules.expert_system.services.catalog_store import CatalogStore
+from app.modules.expert_system.services.similarity_index import SimilarityIndex
+from app.modules.expert_system.services.diagnose_engine import DiagnoseEngine
+from app.modules.expert_system.services.rule_engine import rule_stats_summary
 
 router = APIRouter(prefix="/expert-system", tags=["expert-system"])
 
-_engine = ExpertEngine()
 _store = CatalogStore(file_path="app_data/catalog_games.json")
+_similarity = SimilarityIndex()
+# Versión del catálogo (CatalogStore.version) ya cargada en _similarity; None = nunca se intentó
+_similarity_version: Optional[str] = None
+# El índice se actualiza y se consulta en el pool de hilos: el lock evita leerlo a medio actualizar
+_similarity_lock = threading.Lock()
+# Los motores compilan sus reglas al primer uso, no al importar el router en cada worker
+_engine: Optional[ExpertEngine] = None
+_diagnose_engine: Optional[DiagnoseEngine] = None
+
+
+def _search_code_version() -> str:
+    # Filtros y proyección de /search-ndjson (este router) y campos calientes (catalog_store)
+    return code_version(__file__, catalog_store.__file__)
+
+
+def _get_engine() -> ExpertEngine:
+    global _engine
+    if _engine is None:
+        _engine = ExpertEngine()
+    return _engine
+
+
+def _get_diagnose_engine() -> DiagnoseEngine:
+    global _diagnose_engine
+    if _diagnose_engine is None:
+        _diagnose_engine = DiagnoseEngine(_store, "app_data/catalog_games.ndjson")
+    return _diagnose_engine
+
+
+async def _catalog_version() -> str:
+    """Versión del JSON del catálogo; si hubiera que hashearlo (sin sidecar al día), fuera del event loop."""
+    return _store.cached_version() or await run_in_threadpool(_store.version)
+
+
+async def _prepared_ndjson(ndjson_path: str) -> str:
+    """Versión del NDJSON con su índice y su .hot al día. Crearlos o reconstruirlos recorre el
+    catálogo entero: se hace en el pool de hilos y solo cuando el archivo cambió."""
+    version = _store.prepared_version(ndjson_path)
+    if version is not None:
+        return version
+    try:
+        return await run_in_threadpool(_store.prepare, ndjson_path)
+    except Exception as ex:
+        raise HTTPException(status_code=500, detail=f"No se pudo crear NDJSON: {ex}")
+
+
+def _ensure_similarity_index() -> SimilarityIndex:
+    """Construye el índice de similitud desde el caché una vez por versión del catálogo.
+
+    Se recuerda la versión cargada y no el tamaño del índice: con el catálogo vacío o sin
+    descargar no se vuelve a leer el JSON en cada petición. Llamar con _similarity_lock
+    tomado y fuera del event loop (carga y parsea el catálogo entero).
+    """
+    global _similarity_version
+    version = _store.version()
+    if version != _similarity_version:
+        _similarity.update(_store.load())
+        _similarity_version = version
+    return _similarity
+
+
+def _update_similarity(games: List[dict]) -> dict:
+    """Actualiza el índice con lo recién guardado (solo juegos nuevos o modificados)."""
+    global _similarity_version
+    with _similarity_lock:
+        stats = _similarity.update(games)
+        _similarity_version = _store.version()
+    return stats
+
+
+def _similar_items(game_id: int, limit: int) -> List[SimilarGameItem]:
+    with _similarity_lock:
+        with timing_phase("load"):
+            index = _ensure_similarity_index()
+        with timing_phase("rank"):
+            neighbors = index.similar(game_id, limit)
+        return [
+            SimilarGameItem(**index.summary(other_id), similarity=round(similarity, 4))
+            for other_id, similarity in neighbors
+        ]
 
 
 @router.get("/ping")
@@ -24,8 +112,14 @@ async def ping():
 
 @router.post("/recommend", response_model=RecommendationResponse)
 async def recommend_games(payload: RecommendationRequest) -> RecommendationResponse:
-    items, rules = _engine.recommend(payload.preferences, payload.limit)
-    return RecommendationResponse(recommendations=items, rules_applied=rules, total=len(items))
+    items, rules, rule_stats = _get_engine().recommend(payload.preferences, payload.limit)
+    return RecommendationResponse(recommendations=items, rules_applied=rules, rule_stats=rule_stats, total=len(items))
+
+
+@router.get("/rules/stats")
+async def rules_stats():
+    """Selectividad agregada por regla desde el arranque del proceso."""
+    return {"rules": rule_stats_summary()}
 
 
 @router.post("/sync")
@@ -39,25 +133,35 @@ async def sync_catalog(max_pages: int = 5, page_size: int = 40, genres: Optional
             filters["platforms"] = platforms
         if ordering:
             filters["ordering"] = ordering
-        games = client.fetch_all_games(max_pages=max_pages, page_size=page_size, **filters)
+        # HTTP bloqueante contra RAWG: en el pool de hilos para no congelar el event loop
+        games = await run_in_threadpool(client.fetch_all_games, max_pages=max_pages, page_size=page_size, **filters)
         # Guardar RAW en cache
         _store.save(games)
         # Recargar motor
-        _engine.reload_from_cache(_store.load())
-        return {"downloaded": len(games)}
+        _get_engine().reload_from_cache(_store.load())
+        # Actualizar índice de similitud (solo juegos nuevos o modificados)
+        similarity_stats = await run_in_threadpool(_update_similarity, games)
+        return {"downloaded": len(games), "similarity_index": similarity_stats}
     except Exception as ex:
         raise HTTPException(status_code=500, detail=str(ex))
 
 
 @router.get("/catalog-size")
-async def catalog_size():
+async def catalog_size(request: Request, response: Response):
+    not_modified = conditional(request, response, "catalog_size", make_etag(await _catalog_version(), "catalog-size"))
+    if not_modified is not None:
+        return not_modified
     data = _store.load()
     return {"catalog_size": len(data)}
 
 
 @router.get("/download-catalog")
-async def download_catalog(api_key: str, max_pages: int = 5, page_size: int = 40, genres: Optional[str] = None, platforms: Optional[str] = None, ordering: Optional[str] = "-rating"):
-    """Descarga el catálogo desde RAWG con la api_key suministrada y devuelve el JSON como archivo."""
+async def download_catalog(request: Request, api_key: str, max_pages: int = 5, page_size: int = 40, genres: Optional[str] = None, platforms: Optional[str] = None, ordering: Optional[str] = "-rating"):
+    """Descarga el catálogo desde RAWG con la api_key suministrada y devuelve el JSON como archivo.
+
+    La descarga desde RAWG se hace siempre (el endpoint sincroniza); si el catálogo resultante
+    es el que el cliente ya tiene (If-None-Match), responde 304 sin reenviar el archivo.
+    """
     try:
         client = RawgClient(api_key=api_key)
         filters = {}
@@ -67,23 +171,59 @@ async def download_catalog(api_key: str, max_pages: int = 5, page_size: int = 40
             filters["platforms"] = platforms
         if ordering:
             filters["ordering"] = ordering
-        games = client.fetch_all_games(max_pages=max_pages, page_size=page_size, **filters)
+        # HTTP bloqueante contra RAWG: en el pool de hilos para no congelar el event loop
+        games = await run_in_threadpool(client.fetch_all_games, max_pages=max_pages, page_size=page_size, **filters)
         _store.save(games)
-        _engine.reload_from_cache(_store.load())
-        return FileResponse(path=_store.file_path, media_type="application/json", filename="catalog_games.json")
+        _get_engine().reload_from_cache(_store.load())
+        await run_in_threadpool(_update_similarity, games)
+        # El contenido del archivo ya es la respuesta: la query no forma parte del ETag
+        etag = make_etag(await _catalog_version(), "download-catalog")
+        not_modified = conditional(request, None, "download", etag)
+        if not_modified is not None:
+            return not_modified
+        return FileResponse(
+            path=_store.file_path, media_type="application/json", filename="catalog_games.json",
+            headers={"ETag": etag, "Cache-Control": CACHE_POLICIES["download"]},
+        )
     except Exception as ex:
         raise HTTPException(status_code=500, detail=str(ex))
 
 
+@router.get("/games/{game_id}/similar", response_model=SimilarGamesResponse)
+async def similar_games(game_id: int, limit: int = Query(default=10, ge=1, le=50)) -> SimilarGamesResponse:
+    # La primera petición tras un cambio de catálogo reconstruye el índice: fuera del event loop
+    try:
+        items = await run_in_threadpool(_similar_items, game_id, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Juego no encontrado en el catálogo")
+    return SimilarGamesResponse(game_id=game_id, items=items, total=len(items))
+
+
+@router.get("/games/{game_id}")
+async def get_game(game_id: int, request: Request, response: Response):
+    """Registro completo de un juego: índice de offsets del NDJSON + una lectura, sin recorrerlo."""
+    ndjson_path = "app_data/catalog_games.ndjson"
+    etag = make_etag(await _prepared_ndjson(ndjson_path), "game", str(game_id))
+    not_modified = conditional(request, response, "game", etag)
+    if not_modified is not None:
+        return not_modified
+    item = _store.get(game_id, ndjson_path)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Juego no encontrado en el catálogo")
+    return item
+
+
 @router.post("/to-ndjson")
 async def convert_to_ndjson():
     ndjson_path = "app_data/catalog_games.ndjson"
-    count = _store.to_ndjson(ndjson_path)
+    count = await run_in_threadpool(_store.to_ndjson, ndjson_path)
     return {"converted": count, "path": ndjson_path}
 
 
 @router.get("/search-ndjson")
 async def search_ndjson(
+    request: Request,
+    response: Response,
     q: Optional[str] = Query(default=None),
     page: int = 1,
     page_size: int = 20,
@@ -107,13 +247,14 @@ async def search_ndjson(
     max_playtime: Optional[int] = None,
     tags: Optional[str] = None,  # Comma-separated tags
     exclude_tags: Optional[str] = None,  # Comma-separated tags to exclude
+    full: bool = False,  # Añade el registro RAWG completo (details) de los juegos devueltos
 ):
     ndjson_path = "app_data/catalog_games.ndjson"
-    if not os.path.exists(ndjson_path):
-        try:
-            _store.to_ndjson(ndjson_path)
-        except Exception as ex:
-            raise HTTPException(status_code=500, detail=f"No se pudo crear NDJSON: {ex}")
+    # Misma versión del NDJSON y del código + misma consulta => misma respuesta: 304 sin recorrer el catálogo
+    etag = make_etag(await _prepared_ndjson(ndjson_path), _search_code_version(), "search-ndjson", normalized_query(request))
+    not_modified = conditional(request, response, "search", etag)
+    if not_modified is not None:
+        return not_modified
     start = max(0, (page - 1) * page_size)
     end = start + page_size
     results: List[dict] = []
@@ -160,7 +301,9 @@ async def search_ndjson(
         exclude_tags_list.extend([t.strip().lower() for t in exclude_tags.split(',') if t.strip()])
 
     matched = 0
-    for item in _store.iter_ndjson(ndjson_path):
+    filter_started = time.perf_counter()
+    # Solo campos calientes: los arrays pesados no se decodifican en el recorrido
+    for item in _store.iter_projected(ndjson_path):
         esrb = None
         if isinstance(item.get("esrb_rating"), dict):
             esrb = item.get("esrb_rating", {}).get("name")
@@ -279,149 +422,19 @@ async def search_ndjson(
             if emitted >= page_size:
                 break
         matched += 1
+    record_phase("filter", filter_started)
+
+    if full:
+        details = _store.hydrate((result["id"] for result in results), ndjson_path)
+        for result in results:
+            result["details"] = details.get(result["id"])
 
     return {"page": page, "page_size": page_size, "items": results, "count": len(results)}
 
 
 @router.post("/diagnose")
 async def diagnose(req: DiagnoseRequest):
-    ndjson_path = "app_data/catalog_games.ndjson"
-    if not os.path.exists(ndjson_path):
-        try:
-            _store.to_ndjson(ndjson_path)
-        except Exception as ex:
-            raise HTTPException(status_code=500, detail=f"No se pudo crear NDJSON: {ex}")
-    rules_log: List[str] = []
-    matches: List[Dict[str, Any]] = []
-    examined = 0
-
-    # Normalizar paginación
-    page_size = req.page_size or 12
-    if req.limit is not None:
-        page_size = req.limit
-    page = req.page or 1
-    start = (page - 1) * page_size
-    end = start + page_size
-
-    # Conjunto de tags sensibles para menores
-    sensitive_tags = {"nsfw", "nudity", "sexual content", "sexual-content", "hentai", "porn", "erotic", "mature", "violence", "violent", "gore"}
-
-    def log(rule: str, before: int, after: int):
-        rules_log.append(f"{rule}: {before}->{after}")
-
-    passed = 0
-    for item in _store.iter_ndjson(ndjson_path):
-        examined += 1
-        keep = True
-        # Normalizar
-        genres = [g.get("name") if isinstance(g, dict) else g for g in (item.get("genres") or [])]
-        platforms = [
-            (p.get("platform") or {}).get("name") if isinstance(p, dict) else p for p in (item.get("platforms") or [])
-        ]
-        tags = [t.get("name", "").lower() for t in (item.get("tags") or []) if isinstance(t, dict)]
-        title = item.get("name") or item.get("title") or ""
-        released = item.get("released")
-        playtime_hours = int(item.get("playtime") or 0)
-        rating_val = float(item.get("rating") or 0.0)
-        metacritic_val = int(item.get("metacritic") or 0) if item.get("metacritic") is not None else 0
-        esrb = (item.get("esrb_rating") or {}).get("name") if item.get("esrb_rating") else None
-        age_map = {
-            "Everyone": 6,
-            "Everyone 10+": 10,
-            "Teen": 13,
-            "Mature": 17,
-            "Adults Only": 21,
-        }
-        age_rating = age_map.get(esrb, 12 if esrb else 12)
-
-        # Detectar características de multijugador
-        is_multiplayer = any("multiplayer" in t for t in tags)
-        is_singleplayer = any("singleplayer" in t or "single-player" in t or "single player" in t for t in tags)
-        is_coop = any("co-op" in t or "coop" in t or "cooperative" in t for t in tags)
-        is_pvp = any("pvp" in t or "competitive" in t for t in tags)
-
-        # Reglas sensibles por edad o preferencia de violencia
-        if keep and req.content.age_max is not None and req.content.age_max < 18:
-            if any(any(s in t for s in sensitive_tags) for t in tags):
-                keep = False
-        if keep and req.content.allow_violence is False:
-            if any(any(s in t for s in sensitive_tags) for t in tags):
-                keep = False
-        if keep and req.content.age_max is not None and age_rating > req.content.age_max:
-            keep = False
-        if keep and req.content.multiplayer_required is not None:
-            if req.content.multiplayer_required and not is_multiplayer:
-                keep = False
-            if not req.content.multiplayer_required and is_multiplayer:
-                keep = False
-        if keep and req.content.singleplayer_required is not None:
-            if req.content.singleplayer_required and not is_singleplayer:
-                keep = False
-        if keep and req.content.coop_required is not None:
-            if req.content.coop_required and not is_coop:
-                keep = False
-        if keep and req.content.pvp_required is not None:
-            if req.content.pvp_required and not is_pvp:
-                keep = False
-        if keep and req.preferences.exclude_genres:
-            if any(eg.lower() in [g.lower() for g in genres] for eg in req.preferences.exclude_genres):
-                keep = False
-        if keep and req.preferences.include_genres:
-            if not any(ig.lower() in [g.lower() for g in genres] for ig in req.preferences.include_genres):
-                keep = False
-        if keep and req.hardware.platform:
-            if req.hardware.platform.lower() not in [p.lower() for p in platforms]:
-                keep = False
-        if keep and req.time.min_playtime_hours is not None and playtime_hours < req.time.min_playtime_hours:
-            keep = False
-        if keep and req.time.max_playtime_hours is not None and playtime_hours > req.time.max_playtime_hours:
-            keep = False
-        if keep and req.preferences.min_rating is not None and rating_val < req.preferences.min_rating:
-            keep = False
-        if keep and req.preferences.min_metacritic is not None and metacritic_val < req.preferences.min_metacritic:
-            keep = False
-        if keep and req.preferences.include_tags:
-            if not any(tag.lower() in tags for tag in req.preferences.include_tags):
-                keep = False
-        if keep and req.preferences.exclude_tags:
-            if any(tag.lower() in tags for tag in req.preferences.exclude_tags):
-                keep = False
-        if keep and req.content.offline_required:
-            if any("online" in t for t in tags):
-                keep = False
-        # Precio: no aplicable (RAWG no da precio)
-
-        if not keep:
-            continue
-
-        if passed >= start and passed < end:
-            matches.append({
-                "id": item.get("id"),
-                "title": title,
-                "released": released,
-                "rating": rating_val,
-                "metacritic": metacritic_val,
-                "genres": genres,
-                "platforms": platforms,
-                "age_rating": age_rating,
-                "esrb_rating": esrb,
-                "playtime_hours": playtime_hours,
-                "multiplayer": is_multiplayer,
-                "singleplayer": is_singleplayer,
-                "coop": is_coop,
-                "pvp": is_pvp,
-                "tags": [t.get("name") for t in (item.get("tags") or []) if isinstance(t, dict)][:10],
-                "background_image": item.get("background_image"),
-                "slug": item.get("slug"),
-            })
-            if len(matches) >= page_size:
-                break
-        passed += 1
-
-    return {
-        "page": page,
-        "page_size": page_size,
-        "matched": len(matches),
-        "examined": examined,
-        "items": matches,
-    }
+    """Diagnóstico por restricciones. Sin ETag: RFC 9110 solo admite 304 en GET/HEAD y ni
+    navegadores ni cachés revalidan un POST."""
+    await _prepared_ndjson("app_data/catalog_games.ndjson")
+    return _get_diagnose_engine().diagnose(req)
@@ -15,8 +15,17 @@ class RecommendationItem(BaseModel):
     score: float = Field(description="Puntaje de recomendación calculado por reglas")
 
 
+class RuleStat(BaseModel):
+    rule: str
+    rows_in: int = Field(description="Candidatos antes de aplicar la regla")
+    rows_out: int = Field(description="Candidatos que sobreviven a la regla")
+    elapsed_ms: float
+    cached: bool = Field(description="La conjunción se sirvió desde la memoria de la red de reglas")
+
+
 class RecommendationResponse(BaseModel):
     recommendations: List[RecommendationItem]
     rules_applied: List[str]
+    rule_stats: List[RuleStat] = Field(default_factory=list)
     total: int
 
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class SimilarGameItem(BaseModel):
+    id: int
+    title: str
+    genres: List[str]
+    platforms: List[str]
+    rating: float
+    playtime_hours: int
+    background_image: Optional[str] = None
+    slug: Optional[str] = None
+    similarity: float = Field(description="Similitud coseno entre vectores de features (0-1)")
+
+
+class SimilarGamesResponse(BaseModel):
+    game_id: int
+    items: List[SimilarGameItem]
+    total: int
@@ -1,18 +1,137 @@
+import hashlib
 import json
 import os
-from typing import List, Dict, Any, Iterable
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, BinaryIO
+
+_INDEX_MAGIC = b"NDJIDX01"
+_INDEX_HEADER = struct.Struct("<8sqqq")
+
+# Campos "calientes": los que leen /search-ndjson y /diagnose. El archivo <ndjson>.hot guarda
+# solo estos (los anidados recortados a las claves que se consultan); el resto del registro
+# (short_screenshots, stores, ratings, los tags completos...) queda en el NDJSON y se hidrata
+# por id con el índice de offsets
+HOT_FIELDS: Tuple[str, ...] = (
+    "id", "name", "title", "slug", "released", "tba", "rating", "metacritic", "playtime",
+    "background_image", "genres", "platforms", "tags", "esrb_rating",
+)
+_HOT_NESTED = {"genres": ("name", "slug"), "tags": ("name",), "esrb_rating": ("name",)}
+
+
+class _NdjsonIndex:
+    """Índice id -> (offset, longitud) de un NDJSON en arrays compactos, con su archivo abierto."""
+
+    def __init__(self, key: Tuple[int, int, int], ids: array, offsets: array, lengths: array, file) -> None:
+        self.key = key
+        self.ids = ids
+        self.offsets = offsets
+        self.lengths = lengths
+        self.file = file
+
+    @classmethod
+    def load(cls, index_path: str, file) -> Optional["_NdjsonIndex"]:
+        stat = os.fstat(file.fileno())
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        try:
+            with open(index_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if len(data) < _INDEX_HEADER.size:
+            return None
+        magic, count, size, mtime_ns = _INDEX_HEADER.unpack_from(data)
+        # El índice solo vale para el NDJSON exacto que se indexó
+        if magic != _INDEX_MAGIC or (size, mtime_ns) != key[1:] or len(data) != _INDEX_HEADER.size + 24 * count:
+            return None
+        blocks = []
+        for i in range(3):
+            block = array("q")
+            start = _INDEX_HEADER.size + 8 * count * i
+            block.frombytes(data[start:start + 8 * count])
+            if sys.byteorder != "little":
+                block.byteswap()
+            blocks.append(block)
+        return cls(key, *blocks, file)
+
+    def read(self, game_id: int) -> Optional[bytes]:
+        position = bisect_left(self.ids, game_id)
+        if position == len(self.ids) or self.ids[position] != game_id:
+            return None
+        # pread: sin estado de posición compartido entre peticiones concurrentes
+        return os.pread(self.file.fileno(), self.lengths[position], self.offsets[position])
+
+
+@contextmanager
+def _atomic_output(path: str) -> Iterator[BinaryIO]:
+    """Archivo temporal único junto a ``path`` que se renombra sobre él al salir sin errores.
+
+    Cada escritor usa su propio temporal: dos escrituras concurrentes nunca se mezclan en el
+    mismo archivo, y quien lee ve el contenido anterior o el nuevo completo.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            yield out
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _hot_value(field: str, value: Any) -> Any:
+    if field == "platforms" and isinstance(value, list):
+        return [
+            {"platform": {"name": (p.get("platform") or {}).get("name")}} if isinstance(p, dict) else p
+            for p in value
+        ]
+    keys = _HOT_NESTED.get(field)
+    if keys is None:
+        return value
+    if isinstance(value, dict):
+        return {key: value[key] for key in keys if key in value}
+    if isinstance(value, list):
+        return [{key: v[key] for key in keys if key in v} if isinstance(v, dict) else v for v in value]
+    return value
+
+
+def hot_projection(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Subconjunto caliente de un registro RAWG (HOT_FIELDS con los anidados recortados)."""
+    return {field: _hot_value(field, item[field]) for field in HOT_FIELDS if field in item}
 
 
 class CatalogStore:
     def __init__(self, file_path: str) -> None:
         self.file_path = file_path
+        # ruta -> (mtime_ns, tamaño, hash): el contenido solo se rehashea cuando el archivo cambia
+        self._versions: Dict[str, Tuple[int, int, str]] = {}
+        # Un único cerrojo (reentrante) para todo lo que escribe: JSON, NDJSON, .idx, .hot y .version
+        self._lock = threading.RLock()
+        self._indexes: Dict[str, _NdjsonIndex] = {}
+        # ruta del NDJSON -> (tamaño, mtime_ns) con el que se validó su archivo .hot
+        self._hot_checked: Dict[str, Tuple[int, int]] = {}
+        # ruta del NDJSON -> ((inodo, tamaño, mtime_ns), versión) ya preparado por ``prepare``
+        self._prepared: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
         directory = os.path.dirname(self.file_path)
         if directory and not os.path.exists(directory):
             os.makedirs(directory, exist_ok=True)
 
     def save(self, items: List[Dict[str, Any]]) -> None:
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            json.dump(items, f, ensure_ascii=False)
+        data = json.dumps(items, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            with _atomic_output(self.file_path) as out:
+                out.write(data)
+                out.flush()
+                stat = os.fstat(out.fileno())
+                self._write_version(self.file_path, (stat.st_size, stat.st_mtime_ns), self._digest(data))
 
     def load(self) -> List[Dict[str, Any]]:
         if not os.path.exists(self.file_path):
@@ -23,16 +142,278 @@ class CatalogStore:
             except json.JSONDecodeError:
                 return []
 
+    @staticmethod
+    def version_path(path: str) -> str:
+        return path + ".version"
+
+    @staticmethod
+    def _digest(data: bytes = b"") -> "hashlib.blake2b":
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(data)
+        return digest
+
+    def _write_version(self, path: str, source: Tuple[int, int], digest: "hashlib.blake2b") -> None:
+        # Sidecar <archivo>.version: hash del contenido y (tamaño, mtime_ns) del archivo al que
+        # corresponde. Se escribe junto con los datos: leer la versión no exige volver a hashear
+        version = digest.hexdigest()
+        with _atomic_output(self.version_path(path)) as out:
+            out.write(json.dumps({"source": list(source), "version": version}).encode("utf-8"))
+        self._versions[path] = (source[1], source[0], version)
+
+    def cached_version(self, path: Optional[str] = None) -> Optional[str]:
+        """Versión sin leer el contenido (memoria o sidecar ``.version``); None si habría que hashear."""
+        path = path or self.file_path
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return "empty"
+        cached = self._versions.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        try:
+            with open(self.version_path(path), "rb") as f:
+                sidecar = json.loads(f.read())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        version = sidecar.get("version")
+        if tuple(sidecar.get("source") or ()) != (stat.st_size, stat.st_mtime_ns) or not isinstance(version, str):
+            return None
+        self._versions[path] = (stat.st_mtime_ns, stat.st_size, version)
+        return version
+
+    def version(self, path: Optional[str] = None) -> str:
+        """Versión del archivo (por defecto el JSON) como hash de su contenido; "empty" si no existe.
+
+        Basada en el contenido y no en mtime: una descarga idéntica conserva la versión y todas
+        las instancias coinciden (ETag estables para navegadores y CDN). ``save`` y ``to_ndjson``
+        la calculan al escribir; solo un archivo sin sidecar al día (copiado o editado a mano) se
+        hashea aquí, y el resultado queda en su sidecar para el resto de workers.
+        """
+        path = path or self.file_path
+        version = self.cached_version(path)
+        if version is not None:
+            return version
+        with self._lock:
+            with open(path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                digest = self._digest()
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            self._write_version(path, (stat.st_size, stat.st_mtime_ns), digest)
+        return digest.hexdigest()
+
     def to_ndjson(self, ndjson_path: str) -> int:
-        """Convierte el JSON de lista a NDJSON (una línea por juego). Devuelve cantidad convertida."""
+        """Convierte el JSON de lista a NDJSON (una línea por juego). Devuelve cantidad convertida.
+
+        Escribe también el índice ``<ndjson>.idx`` (id -> offset, longitud) que usa ``get``, los
+        campos calientes ``<ndjson>.hot`` que usa ``iter_projected`` y la versión
+        ``<ndjson>.version``. Los derivados se escriben antes de renombrar el NDJSON y ya con su
+        tamaño y mtime: quien lee nunca ve un archivo a medias ni un derivado desfasado.
+        """
         data = self.load()
         count = 0
-        with open(ndjson_path, "w", encoding="utf-8") as out:
-            for item in data:
-                out.write(json.dumps(item, ensure_ascii=False) + "\n")
-                count += 1
+        entries: Dict[int, Tuple[int, int]] = {}
+        hot_lines: List[bytes] = []
+        digest = self._digest()
+        with self._lock:
+            with _atomic_output(ndjson_path) as out:
+                offset = 0
+                for item in data:
+                    line = (json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8")
+                    out.write(line)
+                    digest.update(line)
+                    if isinstance(item, dict):
+                        hot_lines.append(self._hot_line(item))
+                    game_id = item.get("id") if isinstance(item, dict) else None
+                    if isinstance(game_id, int):
+                        # Ids repetidos: gana la última línea, como al recorrer el archivo
+                        entries[game_id] = (offset, len(line) - 1)
+                    offset += len(line)
+                    count += 1
+                out.flush()
+                # El renombrado conserva tamaño y mtime: los derivados ya apuntan al NDJSON final
+                stat = os.fstat(out.fileno())
+                source = (stat.st_size, stat.st_mtime_ns)
+                self._write_index(ndjson_path, entries, source)
+                self._write_hot(ndjson_path, hot_lines, source)
+                self._write_version(ndjson_path, source, digest)
         return count
 
+    def prepare(self, ndjson_path: str) -> str:
+        """Deja listo el NDJSON para leerlo: lo crea si falta, carga su índice, valida su .hot y
+        devuelve su versión. Puede recorrer el archivo entero: llamarlo fuera del event loop."""
+        with self._lock:
+            if not os.path.exists(ndjson_path):
+                self.to_ndjson(ndjson_path)
+            index = self._open_index(ndjson_path)
+            self._ensure_hot(ndjson_path)
+            version = self.version(ndjson_path)
+            if index is not None:
+                self._prepared[ndjson_path] = (index.key, version)
+        return version
+
+    def prepared_version(self, ndjson_path: str) -> Optional[str]:
+        """Versión si ``prepare`` ya dejó listo este mismo NDJSON (solo un stat); None si no."""
+        try:
+            stat = os.stat(ndjson_path)
+        except FileNotFoundError:
+            return None
+        prepared = self._prepared.get(ndjson_path)
+        if prepared is None or prepared[0] != (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+            return None
+        return prepared[1]
+
+    @staticmethod
+    def index_path(ndjson_path: str) -> str:
+        return ndjson_path + ".idx"
+
+    def _write_index(self, ndjson_path: str, entries: Dict[int, Tuple[int, int]], source: Tuple[int, int]) -> None:
+        # Formato: cabecera (magia, n, tamaño y mtime_ns del NDJSON indexado) y tres bloques
+        # int64 little-endian ordenados por id: ids, offsets, longitudes
+        ids = array("q", sorted(entries))
+        offsets = array("q", (entries[game_id][0] for game_id in ids))
+        lengths = array("q", (entries[game_id][1] for game_id in ids))
+        if sys.byteorder != "little":
+            for block in (ids, offsets, lengths):
+                block.byteswap()
+        with _atomic_output(self.index_path(ndjson_path)) as out:
+            out.write(_INDEX_HEADER.pack(_INDEX_MAGIC, len(ids), *source))
+            for block in (ids, offsets, lengths):
+                out.write(block.tobytes())
+
+    def rebuild_index(self, ndjson_path: str) -> int:
+        """Indexa un NDJSON existente (escrito sin índice o modificado a mano). Devuelve entradas."""
+        entries: Dict[int, Tuple[int, int]] = {}
+        with self._lock:
+            with open(ndjson_path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                offset = 0
+                for line in f:
+                    stripped = line.rstrip(b"\r\n")
+                    if stripped.strip():
+                        try:
+                            game_id = json.loads(stripped).get("id")
+                        except (json.JSONDecodeError, AttributeError):
+                            game_id = None
+                        if isinstance(game_id, int):
+                            entries[game_id] = (offset, len(stripped))
+                    offset += len(line)
+            self._write_index(ndjson_path, entries, (stat.st_size, stat.st_mtime_ns))
+        return len(entries)
+
+    def _open_index(self, ndjson_path: str) -> Optional["_NdjsonIndex"]:
+        try:
+            stat = os.stat(ndjson_path)
+        except FileNotFoundError:
+            return None
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        index = self._indexes.get(ndjson_path)
+        if index is not None and index.key == key:
+            return index
+        with self._lock:
+            index = self._indexes.get(ndjson_path)
+            if index is not None and index.key == key:
+                return index
+            # La clave sale del archivo ya abierto: si se reemplaza ahora, índice y lecturas
+            # siguen refiriéndose a la misma versión
+            file = open(ndjson_path, "rb")
+            loaded = _NdjsonIndex.load(self.index_path(ndjson_path), file)
+            if loaded is None:
+                # Sin índice o de otra versión del NDJSON: se reconstruye una vez
+                self.rebuild_index(ndjson_path)
+                loaded = _NdjsonIndex.load(self.index_path(ndjson_path), file)
+            if loaded is None:
+                file.close()
+                return None
+            # El índice anterior no se cierra: otra petición puede estar leyendo con él; su
+            # archivo (el NDJSON reemplazado) se cierra cuando deja de estar referenciado
+            self._indexes[ndjson_path] = loaded
+            return loaded
+
+    def get(self, game_id: int, ndjson_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Registro RAWG completo de un juego: búsqueda en el índice + una lectura de su línea."""
+        index = self._open_index(ndjson_path or self.default_ndjson_path())
+        if index is None:
+            return None
+        raw = index.read(game_id)
+        return json.loads(raw) if raw is not None else None
+
+    def default_ndjson_path(self) -> str:
+        return os.path.splitext(self.file_path)[0] + ".ndjson"
+
+    @staticmethod
+    def hot_path(ndjson_path: str) -> str:
+        return ndjson_path + ".hot"
+
+    @staticmethod
+    def _hot_line(item: Dict[str, Any]) -> bytes:
+        return (json.dumps(hot_projection(item), ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+    def _write_hot(self, ndjson_path: str, lines: Iterable[bytes], source: Tuple[int, int]) -> None:
+        # Primera línea: qué NDJSON (tamaño, mtime_ns) y qué campos contiene; si no coinciden
+        # con los actuales el archivo se regenera
+        header = {"source": list(source), "fields": list(HOT_FIELDS)}
+        with _atomic_output(self.hot_path(ndjson_path)) as out:
+            out.write((json.dumps(header) + "\n").encode("utf-8"))
+            out.writelines(lines)
+
+    def _hot_is_current(self, ndjson_path: str, source: Tuple[int, int]) -> bool:
+        try:
+            with open(self.hot_path(ndjson_path), "rb") as f:
+                header = json.loads(f.readline())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        return tuple(header.get("source") or ()) == source and tuple(header.get("fields") or ()) == HOT_FIELDS
+
+    def _ensure_hot(self, ndjson_path: str) -> bool:
+        """Deja al día el archivo .hot del NDJSON (lo regenera si falta o es de otra versión)."""
+        try:
+            stat = os.stat(ndjson_path)
+        except FileNotFoundError:
+            return False
+        source = (stat.st_size, stat.st_mtime_ns)
+        if self._hot_checked.get(ndjson_path) == source:
+            return True
+        with self._lock:
+            if self._hot_checked.get(ndjson_path) != source:
+                if not self._hot_is_current(ndjson_path, source):
+                    self._write_hot(ndjson_path, (self._hot_line(item) for item in self.iter_ndjson(ndjson_path)), source)
+                self._hot_checked[ndjson_path] = source
+        return True
+
+    def iter_projected(self, ndjson_path: str, fields: Optional[Iterable[str]] = None) -> Iterable[Dict[str, Any]]:
+        """Recorre el catálogo decodificando solo los campos calientes.
+
+        Cada fila trae HOT_FIELDS (``genres``, ``platforms``, ``tags`` y ``esrb_rating`` solo con
+        las claves que se filtran); si ``fields`` pide algo fuera de ellos se recorre el NDJSON
+        completo. Para devolver el registro entero de las filas elegidas, ``hydrate``.
+        """
+        if fields is not None and not set(fields) <= set(HOT_FIELDS):
+            return self.iter_ndjson(ndjson_path)
+        if not self._ensure_hot(ndjson_path):
+            return []
+        hot_path = self.hot_path(ndjson_path)
+
+        def generator():
+            with open(hot_path, "rb") as f:
+                f.readline()
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        return generator()
+
+    def hydrate(self, ids: Iterable[int], ndjson_path: Optional[str] = None) -> Dict[int, Dict[str, Any]]:
+        """Registros completos de los ids pedidos (solo las filas que se devuelven), vía índice."""
+        hydrated: Dict[int, Dict[str, Any]] = {}
+        for game_id in ids:
+            if isinstance(game_id, int) and game_id not in hydrated:
+                item = self.get(game_id, ndjson_path)
+                if item is not None:
+                    hydrated[game_id] = item
+        return hydrated
+
     def iter_ndjson(self, ndjson_path: str) -> Iterable[Dict[str, Any]]:
         if not os.path.exists(ndjson_path):
             return []
@@ -0,0 +1,130 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.instrumentation import timing_phase
+from app.modules.expert_system.schemas.constraints_request_dto import DiagnoseRequest
+from app.modules.expert_system.services.catalog_store import CatalogStore
+from app.modules.expert_system.services.rule_engine import FactTable, RuleNetwork, iter_indices, load_rules
+
+
+class DiagnoseEngine:
+    """Evalúa las reglas de /diagnose (rules/diagnose.json) sobre el catálogo NDJSON.
+
+    Los hechos se construyen una sola vez por versión del archivo NDJSON; entre peticiones
+    se reutilizan junto con las memorias alfa/beta de la red de reglas.
+    """
+
+    AGE_MAP = {
+        "Everyone": 6,
+        "Everyone 10+": 10,
+        "Teen": 13,
+        "Mature": 17,
+        "Adults Only": 21,
+    }
+
+    def __init__(self, store: CatalogStore, ndjson_path: str) -> None:
+        self.store = store
+        self.ndjson_path = ndjson_path
+        self._network = RuleNetwork("diagnose", load_rules("diagnose"), FactTable([]))
+        self._version: Optional[Tuple[int, int]] = None
+
+    def diagnose(self, req: DiagnoseRequest) -> Dict[str, Any]:
+        with timing_phase("load"):
+            network = self._current_network()
+        with timing_phase("filter"):
+            mask, rules_applied, rule_stats = network.evaluate(req.model_dump())
+
+        # Normalizar paginación
+        page_size = req.page_size or 12
+        if req.limit is not None:
+            page_size = req.limit
+        page = req.page or 1
+        start = (page - 1) * page_size
+        end = start + page_size
+
+        matches: List[Dict[str, Any]] = []
+        # "examined" conserva su significado: filas recorridas hasta llenar la página (la
+        # posición de la última coincidencia devuelta) o el catálogo entero si no se llenó
+        examined = network.facts.size
+        for passed, index in enumerate(iter_indices(mask)):
+            if passed >= end:
+                break
+            if passed >= start:
+                matches.append(network.facts.rows[index]["item"])
+                if len(matches) >= page_size:
+                    examined = index + 1
+                    break
+
+        return {
+            "page": page,
+            "page_size": page_size,
+            "matched": len(matches),
+            "examined": examined,
+            "items": matches,
+            "rules_applied": rules_applied,
+            "rule_stats": rule_stats,
+        }
+
+    def _current_network(self) -> RuleNetwork:
+        try:
+            st = os.stat(self.ndjson_path)
+            version = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            version = None
+        if version != self._version:
+            self._network.reload(FactTable(self._map_item(item) for item in self.store.iter_projected(self.ndjson_path)))
+            self._version = version
+        return self._network
+
+    @classmethod
+    def _map_item(cls, item: Dict[str, Any]) -> Dict[str, Any]:
+        genres = [g.get("name") if isinstance(g, dict) else g for g in (item.get("genres") or [])]
+        platforms = [
+            (p.get("platform") or {}).get("name") if isinstance(p, dict) else p for p in (item.get("platforms") or [])
+        ]
+        tags = [t.get("name", "").lower() for t in (item.get("tags") or []) if isinstance(t, dict)]
+        playtime_hours = int(item.get("playtime") or 0)
+        rating_val = float(item.get("rating") or 0.0)
+        metacritic_val = int(item.get("metacritic") or 0) if item.get("metacritic") is not None else 0
+        esrb = (item.get("esrb_rating") or {}).get("name") if item.get("esrb_rating") else None
+        age_rating = cls.AGE_MAP.get(esrb, 12 if esrb else 12)
+
+        # Detectar características de multijugador
+        is_multiplayer = any("multiplayer" in t for t in tags)
+        is_singleplayer = any("singleplayer" in t or "single-player" in t or "single player" in t for t in tags)
+        is_coop = any("co-op" in t or "coop" in t or "cooperative" in t for t in tags)
+        is_pvp = any("pvp" in t or "competitive" in t for t in tags)
+
+        return {
+            "genres": genres,
+            "platforms": platforms,
+            "tags": tags,
+            "playtime_hours": playtime_hours,
+            "rating": rating_val,
+            "metacritic": metacritic_val,
+            "age_rating": age_rating,
+            "multiplayer": is_multiplayer,
+            "singleplayer": is_singleplayer,
+            "coop": is_coop,
+            "pvp": is_pvp,
+            # Proyección que se devuelve al cliente
+            "item": {
+                "id": item.get("id"),
+                "title": item.get("name") or item.get("title") or "",
+                "released": item.get("released"),
+                "rating": rating_val,
+                "metacritic": metacritic_val,
+                "genres": genres,
+                "platforms": platforms,
+                "age_rating": age_rating,
+                "esrb_rating": esrb,
+                "playtime_hours": playtime_hours,
+                "multiplayer": is_multiplayer,
+                "singleplayer": is_singleplayer,
+                "coop": is_coop,
+                "pvp": is_pvp,
+                "tags": [t.get("name") for t in (item.get("tags") or []) if isinstance(t, dict)][:10],
+                "background_image": item.get("background_image"),
+                "slug": item.get("slug"),
+            },
+        }
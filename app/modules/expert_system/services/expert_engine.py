@@ -1,7 +1,9 @@
 from typing import List, Tuple, Dict, Any
 
+from app.core.instrumentation import timing_phase
 from app.modules.expert_system.schemas.recommendation_request_dto import PreferenceRequest
 from app.modules.expert_system.schemas.recommendation_response_dto import RecommendationItem
+from app.modules.expert_system.services.rule_engine import FactTable, RuleNetwork, load_rules
 
 
 class ExpertEngine:
@@ -67,6 +69,8 @@ class ExpertEngine:
                 "released": "2015-05-19",
             },
         ]
+        # Las reglas de filtrado son datos (rules/recommend.json) evaluados por la red de reglas
+        self._network = RuleNetwork("recommend", load_rules("recommend"), FactTable(self._catalog))
 
     def reload_from_cache(self, rawg_items: List[Dict[str, Any]]) -> None:
         """Reemplaza el catálogo interno con datos mapeados desde RAWG."""
@@ -77,6 +81,7 @@ class ExpertEngine:
                 mapped.append(mapped_item)
         if mapped:
             self._catalog = mapped
+            self._network.reload(FactTable(self._catalog))
 
     def _map_rawg_game(self, g: Dict[str, Any]) -> Dict[str, Any]:
         # Campos mínimos esperados: id, name, genres, platforms, playtime, esrb_rating, tags (opcional)
@@ -127,49 +132,12 @@ class ExpertEngine:
         except Exception:
             return {}
 
-    def recommend(self, preferences: PreferenceRequest, limit: int) -> Tuple[List[RecommendationItem], List[str]]:
-        rules_applied: List[str] = []
-        candidates = list(self._catalog)
-
-        # Regla 1: excluir géneros
-        if preferences.exclude_genres:
-            before = len(candidates)
-            candidates = [g for g in candidates if not any(eg.lower() in [x.lower() for x in g["genres"]] for eg in preferences.exclude_genres)]
-            rules_applied.append(f"Excluidos géneros {preferences.exclude_genres} ({before}->{len(candidates)})")
-
-        # Regla 2: excluir plataformas
-        if preferences.exclude_platforms:
-            before = len(candidates)
-            candidates = [g for g in candidates if not any(ep.lower() in [x.lower() for x in g["platforms"]] for ep in preferences.exclude_platforms)]
-            rules_applied.append(f"Excluidas plataformas {preferences.exclude_platforms} ({before}->{len(candidates)})")
-
-        # Regla 3: filtro por precio máximo
-        if preferences.max_price is not None:
-            before = len(candidates)
-            candidates = [g for g in candidates if g["price"] <= preferences.max_price]
-            rules_applied.append(f"Precio <= {preferences.max_price} ({before}->{len(candidates)})")
-
-        # Regla 4: filtro por edad máxima
-        if preferences.age_rating_max is not None:
-            before = len(candidates)
-            candidates = [g for g in candidates if g["age_rating"] <= preferences.age_rating_max]
-            rules_applied.append(f"Edad <= {preferences.age_rating_max} ({before}->{len(candidates)})")
-
-        # Regla 5: filtro por multijugador
-        if preferences.allow_multiplayer is not None:
-            before = len(candidates)
-            if preferences.allow_multiplayer:
-                candidates = [g for g in candidates if g["multiplayer"]]
-                rules_applied.append(f"Solo multijugador ({before}->{len(candidates)})")
-            else:
-                candidates = [g for g in candidates if not g["multiplayer"]]
-                rules_applied.append(f"Solo single-player ({before}->{len(candidates)})")
-
-        # Regla 6: filtro por horas mínimas
-        if preferences.min_playtime_hours is not None:
-            before = len(candidates)
-            candidates = [g for g in candidates if g["playtime_hours"] >= preferences.min_playtime_hours]
-            rules_applied.append(f"Horas >= {preferences.min_playtime_hours} ({before}->{len(candidates)})")
+    def recommend(
+        self, preferences: PreferenceRequest, limit: int
+    ) -> Tuple[List[RecommendationItem], List[str], List[Dict[str, Any]]]:
+        with timing_phase("filter"):
+            mask, rules_applied, rule_stats = self._network.evaluate(preferences.model_dump())
+            candidates = self._network.facts.select(mask)
 
         # Puntaje por afinidad
         def score(game: dict) -> float:
@@ -195,7 +163,8 @@ class ExpertEngine:
             return score_value
 
         # Ordenar por puntaje descendente
-        ranked = sorted(candidates, key=score, reverse=True)
+        with timing_phase("rank"):
+            ranked = sorted(candidates, key=score, reverse=True)
 
         items: List[RecommendationItem] = [
             RecommendationItem(
@@ -213,4 +182,4 @@ class ExpertEngine:
             for g in ranked[:limit]
         ]
 
-        return items, rules_applied
+        return items, rules_applied, rule_stats
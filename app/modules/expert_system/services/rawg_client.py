@@ -1,34 +1,81 @@
 import http.client
 import json
+import time
 from typing import Dict, Any, List, Optional
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urlsplit
 import os
 
 
 class RawgClient:
-    BASE_HOST = "api.rawg.io"
-    BASE_PATH = "/api"
+    DEFAULT_BASE_URL = "https://api.rawg.io/api"
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
 
-    def __init__(self, api_key: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: float = 30,
+        max_retries: int = 3,
+    ) -> None:
         self.api_key = api_key or os.getenv("RAWG_API_KEY")
         if not self.api_key:
             raise ValueError("RAWG_API_KEY no configurada en entorno")
+        # RAWG_BASE_URL permite apuntar a un RAWG falso local (benchmarks/fake_rawg.py)
+        self.base_url = (base_url or os.getenv("RAWG_BASE_URL") or self.DEFAULT_BASE_URL).rstrip("/")
+        parts = urlsplit(self.base_url)
+        self._scheme = parts.scheme or "https"
+        self._netloc = parts.netloc
+        self._base_path = parts.path
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retries = 0
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def _connection(self) -> http.client.HTTPConnection:
+        # Se reutiliza la conexión (keep-alive) entre páginas de una misma descarga
+        if self._conn is None:
+            conn_cls = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+            self._conn = conn_cls(self._netloc, timeout=self.timeout)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
 
     def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
         params = dict(params or {})
         params["key"] = self.api_key
         query = urlencode(params, doseq=True)
-        full_path = f"{self.BASE_PATH}{path}?{query}"
-        conn = http.client.HTTPSConnection(self.BASE_HOST, timeout=30)
-        try:
-            conn.request("GET", full_path)
-            resp = conn.getresponse()
-            raw = resp.read()
-            if resp.status != 200:
-                raise RuntimeError(f"RAWG error {resp.status}: {raw[:200].decode(errors='ignore')}")
-            return json.loads(raw.decode("utf-8"))
-        finally:
-            conn.close()
+        full_path = f"{self._base_path}{path}?{query}"
+        attempt = 0
+        while True:
+            conn = self._connection()
+            try:
+                conn.request("GET", full_path)
+                resp = conn.getresponse()
+                raw = resp.read()
+            except (http.client.HTTPException, OSError):
+                self.close()
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self.retries += 1
+                time.sleep(min(8.0, 0.5 * 2 ** (attempt - 1)))
+                continue
+            if resp.status == 200:
+                return json.loads(raw.decode("utf-8"))
+            if resp.status in self.RETRY_STATUSES and attempt < self.max_retries:
+                attempt += 1
+                self.retries += 1
+                retry_after = resp.getheader("Retry-After")
+                try:
+                    delay = float(retry_after) if retry_after else 0.5 * 2 ** (attempt - 1)
+                except ValueError:
+                    delay = 0.5 * 2 ** (attempt - 1)
+                time.sleep(min(8.0, delay))
+                continue
+            raise RuntimeError(f"RAWG error {resp.status}: {raw[:200].decode(errors='ignore')}")
 
     def list_games(self, *, page: int = 1, page_size: int = 40, **filters: Any) -> Dict[str, Any]:
         params = {"page": page, "page_size": page_size}
@@ -39,13 +86,15 @@ class RawgClient:
         """Descarga paginada hasta max_pages. Ojo: traer "todo" puede ser enorme; controla límites."""
         results: List[Dict[str, Any]] = []
         page = 1
-        while page <= max_pages:
-            data = self.list_games(page=page, page_size=page_size, **filters)
-            batch = data.get("results", [])
-            results.extend(batch)
-            next_url = data.get("next")
-            if not next_url or not batch:
-                break
-            page += 1
+        try:
+            while page <= max_pages:
+                data = self.list_games(page=page, page_size=page_size, **filters)
+                batch = data.get("results", [])
+                results.extend(batch)
+                next_url = data.get("next")
+                if not next_url or not batch:
+                    break
+                page += 1
+        finally:
+            self.close()
         return results
-
@@ -0,0 +1,303 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.metrics import REGISTRY
+
+RULES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "rules")
+
+_MISSING = object()
+
+# Selectividad agregada por regla en el proceso (qué restricción elimina más filas)
+RULE_EVALUATIONS = REGISTRY.counter("expert_rule_evaluations_total", "Evaluaciones de cada regla", ("engine", "rule"))
+RULE_ROWS_IN = REGISTRY.counter("expert_rule_rows_in_total", "Filas que llegan a cada regla", ("engine", "rule"))
+RULE_ROWS_OUT = REGISTRY.counter("expert_rule_rows_out_total", "Filas que sobreviven a cada regla", ("engine", "rule"))
+RULE_SECONDS = REGISTRY.counter("expert_rule_seconds_total", "Tiempo acumulado evaluando cada regla", ("engine", "rule"))
+
+
+def load_rules(name: str) -> List[Dict[str, Any]]:
+    """Carga un conjunto de reglas declarativas desde app/modules/expert_system/rules/<name>.json"""
+    with open(os.path.join(RULES_DIR, f"{name}.json"), "r", encoding="utf-8") as f:
+        return json.load(f)["rules"]
+
+
+def resolve_param(params: Dict[str, Any], path: str) -> Any:
+    """Resuelve un parámetro con notación de puntos ('content.age_max') sobre un dict anidado."""
+    value: Any = params
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def rule_stats_summary() -> List[Dict[str, Any]]:
+    """Agrega los contadores de proceso por (engine, regla), ordenados por filas eliminadas."""
+    summary: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+    for counter, field in (
+        (RULE_EVALUATIONS, "evaluations"),
+        (RULE_ROWS_IN, "rows_in"),
+        (RULE_ROWS_OUT, "rows_out"),
+        (RULE_SECONDS, "seconds"),
+    ):
+        for (engine, rule), value in counter.samples():
+            entry = summary.setdefault((engine, rule), {"engine": engine, "rule": rule})
+            entry[field] = value
+    result = []
+    for entry in summary.values():
+        rows_in = entry.get("rows_in", 0)
+        rows_out = entry.get("rows_out", 0)
+        entry["eliminated"] = rows_in - rows_out
+        entry["selectivity"] = round(rows_out / rows_in, 4) if rows_in else 1.0
+        result.append(entry)
+    result.sort(key=lambda e: e["eliminated"], reverse=True)
+    return result
+
+
+def iter_indices(mask: int) -> Iterator[int]:
+    """Itera en orden ascendente los índices de los bits encendidos de una máscara."""
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for byte_index, byte in enumerate(data):
+        if not byte:
+            continue
+        base = byte_index << 3
+        for bit in range(8):
+            if byte & (1 << bit):
+                yield base + bit
+
+
+class FactTable:
+    """Hechos del catálogo en formato columnar; cada fila es un juego."""
+
+    def __init__(self, facts: Iterable[Dict[str, Any]]) -> None:
+        self.rows: List[Dict[str, Any]] = list(facts)
+        self.size = len(self.rows)
+        self.all_mask = (1 << self.size) - 1
+        self._columns: Dict[str, List[Any]] = {}
+        self._token_index: Dict[str, Dict[str, int]] = {}
+
+    def column(self, attr: str) -> List[Any]:
+        col = self._columns.get(attr)
+        if col is None:
+            col = [row.get(attr) for row in self.rows]
+            self._columns[attr] = col
+        return col
+
+    def token_index(self, attr: str) -> Dict[str, int]:
+        """Índice invertido token -> máscara para atributos de tipo lista (géneros, tags, ...)."""
+        index = self._token_index.get(attr)
+        if index is None:
+            positions: Dict[str, List[int]] = {}
+            for i, values in enumerate(self.column(attr)):
+                for token in {str(v).lower() for v in (values or []) if v is not None}:
+                    positions.setdefault(token, []).append(i)
+            index = {token: self.mask_from_indices(idx) for token, idx in positions.items()}
+            self._token_index[attr] = index
+        return index
+
+    def mask_from_indices(self, indices: Iterable[int]) -> int:
+        bits = bytearray((self.size + 7) // 8)
+        for i in indices:
+            bits[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(bits, "little")
+
+    def mask_where(self, attr: str, predicate) -> int:
+        return self.mask_from_indices(i for i, v in enumerate(self.column(attr)) if predicate(v))
+
+    def select(self, mask: int) -> List[Dict[str, Any]]:
+        return [self.rows[i] for i in iter_indices(mask)]
+
+
+_COMPARATORS = {
+    "eq": lambda a, b: a == b,
+    "ne": lambda a, b: a != b,
+    "lt": lambda a, b: a is not None and a < b,
+    "le": lambda a, b: a is not None and a <= b,
+    "gt": lambda a, b: a is not None and a > b,
+    "ge": lambda a, b: a is not None and a >= b,
+}
+
+
+class Rule:
+    """Regla declarativa: guardas sobre los parámetros del usuario + condiciones sobre los hechos."""
+
+    def __init__(self, spec: Dict[str, Any], order: int) -> None:
+        self.name: str = spec["name"]
+        self.order = order
+        self.trace: str = spec.get("trace") or self.name
+        self.guards: List[Dict[str, Any]] = spec.get("when") or []
+        self.conditions: List[Dict[str, Any]] = spec.get("if") or []
+        self.params: List[str] = []
+        for clause in self.guards:
+            self._add_param(clause.get("param"))
+        for cond in self.conditions:
+            value = cond.get("value")
+            if isinstance(value, dict):
+                self._add_param(value.get("param"))
+
+    def _add_param(self, param: Optional[str]) -> None:
+        if param and param not in self.params:
+            self.params.append(param)
+
+    def bind(self, params: Dict[str, Any]) -> Optional[Tuple[Tuple[str, str, Any], ...]]:
+        """Devuelve las condiciones con valores concretos, o None si la regla no aplica a esta petición."""
+        for param in self.params:
+            value = resolve_param(params, param)
+            if value is _MISSING or value is None or value == [] or value == "":
+                return None
+        for guard in self.guards:
+            if not _COMPARATORS[guard.get("op", "eq")](resolve_param(params, guard["param"]), guard.get("value")):
+                return None
+        bound = []
+        for cond in self.conditions:
+            value = cond.get("value")
+            if isinstance(value, dict):
+                value = resolve_param(params, value["param"])
+            bound.append((cond["fact"], cond["op"], _freeze(value)))
+        return tuple(bound)
+
+    def describe(self, params: Dict[str, Any], before: int, after: int) -> str:
+        values = {p.replace(".", "_"): resolve_param(params, p) for p in self.params}
+        return self.trace.format(before=before, after=after, **values)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(str(v).lower() for v in value))
+    if isinstance(value, str):
+        return value.lower()
+    return value
+
+
+class RuleNetwork:
+    """Red de reglas estilo Rete sobre un FactTable.
+
+    - Nodos alfa: una condición concreta (hecho, operador, valor) evaluada sobre todo el catálogo;
+      se comparten entre reglas y su memoria (máscara de bits) se cachea entre peticiones.
+    - Nodos beta: la conjunción acumulada de reglas activas; también se cachea por prefijo.
+    - Las reglas se indexan por los parámetros que usan, así que solo se visitan las que la
+      petición puede activar.
+    """
+
+    def __init__(self, name: str, rules: List[Dict[str, Any]], facts: FactTable, cache_size: int = 4096) -> None:
+        self.name = name
+        self.rules = [Rule(spec, order) for order, spec in enumerate(rules)]
+        self.facts = facts
+        self.cache_size = cache_size
+        self._alpha: "OrderedDict[Tuple[str, str, Any], int]" = OrderedDict()
+        self._beta: "OrderedDict[Tuple, int]" = OrderedDict()
+        self._rules_by_param: Dict[str, List[Rule]] = {}
+        self._unconditional: List[Rule] = []
+        for rule in self.rules:
+            if not rule.params:
+                self._unconditional.append(rule)
+            for param in rule.params:
+                self._rules_by_param.setdefault(param, []).append(rule)
+
+    def reload(self, facts: FactTable) -> None:
+        """Reemplaza los hechos e invalida las memorias alfa/beta."""
+        self.facts = facts
+        self._alpha.clear()
+        self._beta.clear()
+
+    def candidate_rules(self, params: Dict[str, Any]) -> List[Rule]:
+        selected = {id(r): r for r in self._unconditional}
+        for path in self._set_param_paths(params):
+            for rule in self._rules_by_param.get(path, ()):
+                selected[id(rule)] = rule
+        return sorted(selected.values(), key=lambda r: r.order)
+
+    def evaluate(self, params: Dict[str, Any]) -> Tuple[int, List[str], List[Dict[str, Any]]]:
+        """Aplica las reglas activas en orden.
+
+        Devuelve (máscara resultante, traza rules_applied, estadísticas por regla). Las filas de
+        entrada/salida de cada regla salen del popcount de las máscaras, sin copiar listas.
+        """
+        mask = self.facts.all_mask
+        trace: List[str] = []
+        stats: List[Dict[str, Any]] = []
+        prefix: Tuple = ()
+        for rule in self.candidate_rules(params):
+            bound = rule.bind(params)
+            if bound is None:
+                continue
+            started = time.perf_counter()
+            before = mask
+            prefix = prefix + ((rule.name, bound),)
+            mask = self._beta_get(prefix)
+            cached = mask is not None
+            if not cached:
+                mask = before
+                for key in bound:
+                    mask &= self._alpha_memory(key)
+                self._cache_put(self._beta, prefix, mask)
+            rows_in = before.bit_count()
+            rows_out = mask.bit_count()
+            elapsed = time.perf_counter() - started
+            trace.append(rule.describe(params, rows_in, rows_out))
+            stats.append({
+                "rule": rule.name,
+                "rows_in": rows_in,
+                "rows_out": rows_out,
+                "elapsed_ms": round(elapsed * 1000, 3),
+                "cached": cached,
+            })
+            RULE_EVALUATIONS.inc(engine=self.name, rule=rule.name)
+            RULE_ROWS_IN.inc(rows_in, engine=self.name, rule=rule.name)
+            RULE_ROWS_OUT.inc(rows_out, engine=self.name, rule=rule.name)
+            RULE_SECONDS.inc(elapsed, engine=self.name, rule=rule.name)
+        return mask, trace, stats
+
+    def _set_param_paths(self, params: Dict[str, Any], prefix: str = "") -> Iterator[str]:
+        for key, value in params.items():
+            path = f"{prefix}{key}"
+            if isinstance(value, dict):
+                yield from self._set_param_paths(value, f"{path}.")
+            elif value is not None and value != [] and value != "":
+                yield path
+
+    def _beta_get(self, key: Tuple) -> Optional[int]:
+        mask = self._beta.get(key)
+        if mask is not None:
+            self._beta.move_to_end(key)
+        return mask
+
+    def _alpha_memory(self, key: Tuple[str, str, Any]) -> int:
+        mask = self._alpha.get(key)
+        if mask is not None:
+            self._alpha.move_to_end(key)
+            return mask
+        mask = self._compute_alpha(*key)
+        self._cache_put(self._alpha, key, mask)
+        return mask
+
+    def _compute_alpha(self, attr: str, op: str, value: Any) -> int:
+        facts = self.facts
+        if op in ("has_any", "has_none"):
+            tokens = value if isinstance(value, tuple) else (value,)
+            index = facts.token_index(attr)
+            mask = 0
+            for token in tokens:
+                mask |= index.get(token, 0)
+            return mask if op == "has_any" else facts.all_mask & ~mask
+        if op in ("contains_any", "contains_none"):
+            needles = value if isinstance(value, tuple) else (value,)
+            mask = 0
+            for needle in needles:
+                mask |= self._alpha_memory((attr, "contains", needle))
+            return mask if op == "contains_any" else facts.all_mask & ~mask
+        if op == "contains":
+            mask = 0
+            for token, token_mask in facts.token_index(attr).items():
+                if value in token:
+                    mask |= token_mask
+            return mask
+        compare = _COMPARATORS[op]
+        return facts.mask_where(attr, lambda v: compare(v, value))
+
+    def _cache_put(self, cache: OrderedDict, key: Any, mask: int) -> None:
+        cache[key] = mask
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
@@ -0,0 +1,179 @@
+import hashlib
+import math
+import random
+from collections import Counter
+from itertools import islice
+from typing import Dict, Any, List, Tuple, Iterable, Optional
+
+
+class SimilarityIndex:
+    """Índice aproximado de vecinos cercanos (MinHash + LSH por bandas) sobre el catálogo RAWG.
+
+    Cada juego se representa como un vector disperso de features (géneros, plataformas,
+    tags, rango de horas y rango de rating). Las firmas MinHash se agrupan en bandas para
+    obtener candidatos y luego se re-ordenan por similitud coseno exacta.
+    """
+
+    _PRIME = (1 << 61) - 1
+
+    def __init__(
+        self,
+        bands: int = 20,
+        rows_per_band: int = 3,
+        bucket_cap: int = 200,
+        max_candidates: int = 300,
+        exhaustive_threshold: int = 20000,
+        seed: int = 42,
+    ) -> None:
+        self.bands = bands
+        self.rows_per_band = rows_per_band
+        self.bucket_cap = bucket_cap
+        self.max_candidates = max_candidates
+        # En catálogos pequeños, si LSH no alcanza el límite pedido se compara contra todo
+        self.exhaustive_threshold = exhaustive_threshold
+        rnd = random.Random(seed)
+        self._coeffs = [
+            (rnd.randrange(1, self._PRIME), rnd.randrange(0, self._PRIME))
+            for _ in range(bands * rows_per_band)
+        ]
+        self._feature_hashes: Dict[str, Tuple[int, ...]] = {}
+        self._buckets: Dict[Tuple[int, int], set] = {}
+        self._band_keys: Dict[int, Tuple[Tuple[int, int], ...]] = {}
+        self._vectors: Dict[int, Dict[str, float]] = {}
+        self._fingerprints: Dict[int, int] = {}
+        self._summaries: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def __contains__(self, game_id: int) -> bool:
+        return game_id in self._vectors
+
+    def update(self, rawg_items: Iterable[Dict[str, Any]], replace: bool = True) -> Dict[str, int]:
+        """Indexa incrementalmente: solo recalcula firmas de juegos nuevos o modificados.
+
+        Con replace=True los juegos que ya no vienen en la sincronización se eliminan.
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        seen = set()
+        for g in rawg_items:
+            game_id = g.get("id")
+            if game_id is None:
+                continue
+            seen.add(game_id)
+            vector = self._features(g)
+            if not vector:
+                continue
+            fingerprint = hash(frozenset(vector.items()))
+            if self._fingerprints.get(game_id) == fingerprint:
+                self._summaries[game_id] = self._summary(g)
+                stats["unchanged"] += 1
+                continue
+            if game_id in self._vectors:
+                self._remove(game_id)
+                stats["updated"] += 1
+            else:
+                stats["added"] += 1
+            self._insert(game_id, vector, fingerprint, self._summary(g))
+        if replace:
+            for game_id in [gid for gid in self._vectors if gid not in seen]:
+                self._remove(game_id)
+                stats["removed"] += 1
+        return stats
+
+    def summary(self, game_id: int) -> Optional[Dict[str, Any]]:
+        return self._summaries.get(game_id)
+
+    def similar(self, game_id: int, limit: int = 10) -> List[Tuple[int, float]]:
+        """Devuelve [(id, similitud)] de los juegos más parecidos, excluyendo el propio juego."""
+        vector = self._vectors.get(game_id)
+        if vector is None:
+            raise KeyError(game_id)
+        collisions: Counter = Counter()
+        for key in self._band_keys[game_id]:
+            collisions.update(islice(self._buckets.get(key, ()), self.bucket_cap))
+        collisions.pop(game_id, None)
+        if len(collisions) < limit and len(self._vectors) <= self.exhaustive_threshold:
+            candidates = [other_id for other_id in self._vectors if other_id != game_id]
+        else:
+            candidates = [other_id for other_id, _ in collisions.most_common(self.max_candidates)]
+        scored = [(other_id, self._cosine(vector, self._vectors[other_id])) for other_id in candidates]
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:limit]
+
+    def _insert(self, game_id: int, vector: Dict[str, float], fingerprint: int, summary: Dict[str, Any]) -> None:
+        keys = self._band_keys_for(vector)
+        for key in keys:
+            self._buckets.setdefault(key, set()).add(game_id)
+        self._band_keys[game_id] = keys
+        self._vectors[game_id] = vector
+        self._fingerprints[game_id] = fingerprint
+        self._summaries[game_id] = summary
+
+    def _remove(self, game_id: int) -> None:
+        for key in self._band_keys.pop(game_id, ()):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(game_id)
+                if not bucket:
+                    del self._buckets[key]
+        self._vectors.pop(game_id, None)
+        self._fingerprints.pop(game_id, None)
+        self._summaries.pop(game_id, None)
+
+    def _band_keys_for(self, vector: Dict[str, float]) -> Tuple[Tuple[int, int], ...]:
+        signature = list(map(min, zip(*(self._hash_feature(f) for f in vector))))
+        r = self.rows_per_band
+        return tuple((band, hash(tuple(signature[band * r:(band + 1) * r]))) for band in range(self.bands))
+
+    def _hash_feature(self, feature: str) -> Tuple[int, ...]:
+        cached = self._feature_hashes.get(feature)
+        if cached is None:
+            x = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+            cached = tuple((a * x + b) % self._PRIME for a, b in self._coeffs)
+            self._feature_hashes[feature] = cached
+        return cached
+
+    @staticmethod
+    def _cosine(a: Dict[str, float], b: Dict[str, float]) -> float:
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(w * b.get(f, 0.0) for f, w in a.items())
+
+    @staticmethod
+    def _features(g: Dict[str, Any]) -> Dict[str, float]:
+        """Vector disperso normalizado (L2) con los mismos pesos relativos que el motor de reglas."""
+        weights: Dict[str, float] = {}
+        for x in (g.get("genres") or []):
+            name = x.get("name") if isinstance(x, dict) else x
+            if name:
+                weights[f"g:{name.lower()}"] = 3.0
+        for p in (g.get("platforms") or []):
+            name = (p.get("platform") or {}).get("name") if isinstance(p, dict) else p
+            if name:
+                weights[f"p:{name.lower()}"] = 1.5
+        for t in (g.get("tags") or [])[:20]:
+            name = t.get("name") if isinstance(t, dict) else t
+            if name:
+                weights[f"t:{name.lower()}"] = 1.0
+        playtime = int(g.get("playtime") or 0)
+        weights[f"pt:{playtime.bit_length()}"] = 1.0
+        rating = float(g.get("rating") or 0.0)
+        weights[f"r:{round(rating * 2)}"] = 1.0
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return {f: w / norm for f, w in weights.items()}
+
+    @staticmethod
+    def _summary(g: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": g.get("id"),
+            "title": g.get("name") or g.get("title") or "",
+            "genres": [n for n in (x.get("name") if isinstance(x, dict) else x for x in (g.get("genres") or [])) if n],
+            "platforms": [
+                n for n in ((p.get("platform") or {}).get("name") if isinstance(p, dict) else p for p in (g.get("platforms") or [])) if n
+            ],
+            "rating": float(g.get("rating") or 0.0),
+            "playtime_hours": int(g.get("playtime") or 0),
+            "background_image": g.get("background_image"),
+            "slug": g.get("slug"),
+        }
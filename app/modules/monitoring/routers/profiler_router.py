@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.dependencies import require_permission
+from app.core.profiler import MAX_SECONDS, PROFILER
+
+router = APIRouter(prefix="/debug/profiler", tags=["monitoring"], dependencies=[Depends(require_permission("profiler:use"))])
+
+
+def _resolve_endpoint(request: Request, path: str, method: str):
+    for route in request.app.router.routes:
+        if isinstance(route, Route) and route.path == path and method in (route.methods or ()):
+            return route.endpoint
+    raise HTTPException(status_code=404, detail=f"Ruta no encontrada: {method} {path}")
+
+
+@router.post("/start")
+def start_profiling(
+    request: Request,
+    route: str = Query(..., description="Plantilla de la ruta, p.ej. /expert-system/diagnose"),
+    method: str = "POST",
+    seconds: float = Query(default=30.0, gt=0, le=MAX_SECONDS),
+    interval_ms: float = Query(default=5.0, ge=1.0, le=1000.0),
+):
+    """Activa el muestreo de pilas para una ruta durante una ventana acotada."""
+    method = method.upper()
+    endpoint = _resolve_endpoint(request, route, method)
+    code = getattr(endpoint, "__code__", None)
+    if code is None:
+        raise HTTPException(status_code=400, detail="El endpoint no es una función Python perfilable")
+    session = PROFILER.start(route, method, code, seconds, interval_ms / 1000.0)
+    return {"profiling": session.summary(), "seconds": min(seconds, MAX_SECONDS)}
+
+
+@router.post("/stop")
+def stop_profiling(route: str):
+    session = PROFILER.stop(route)
+    if session is None:
+        raise HTTPException(status_code=404, detail="No hay sesión de perfilado para esa ruta")
+    return {"profiling": session.summary()}
+
+
+@router.get("/sessions")
+def list_sessions():
+    return {"sessions": [session.summary() for session in PROFILER.sessions()]}
+
+
+@router.get("/result")
+def profiling_result(route: str, format: str = Query(default="collapsed", pattern="^(collapsed|json)$"), top: int = Query(default=20, ge=1, le=200)):
+    """Pilas agregadas de la última sesión: texto colapsado para flamegraph o resumen JSON."""
+    session = PROFILER.get(route)
+    if session is None:
+        raise HTTPException(status_code=404, detail="No hay sesión de perfilado para esa ruta")
+    if format == "collapsed":
+        return PlainTextResponse(session.collapsed())
+    return session.summary(top=top)
@@ -1,40 +1,35 @@
 """
 Router para el registro de usuarios
 """
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.dependencies import get_db
 from app.modules.register.services.register_service import RegisterService
 from app.modules.register.schemas.create_user_dto import CreateUserDto
 
-router = APIRouter(prefix="/register", tags=["register"])
+logger = logging.getLogger(__name__)
 
-def get_db():
-    """Dependencia para obtener la sesión de base de datos"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+router = APIRouter(prefix="/register", tags=["register"])
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def create_user(data: CreateUserDto, db: Session = Depends(get_db)):
+async def create_user(data: CreateUserDto, db: AsyncSession = Depends(get_db)):
     """
     Crear un nuevo usuario
     """
-    print("🚀 ENDPOINT EJECUTÁNDOSE - /register/")
-    print(f"🔍 Datos recibidos: {data}")
-    print(f"🔍 Tipo: {type(data)}")
-    print(f"🔍 Diccionario: {data.dict()}")
+    logger.debug("ENDPOINT EJECUTÁNDOSE - /register/")
     try:
         register_service = RegisterService(db)
-        new_user = register_service.create_user(data)
+        new_user = await register_service.create_user(data)
         return new_user
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except HTTPException:
+        # p. ej. 503 del pool de hashing saturado
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
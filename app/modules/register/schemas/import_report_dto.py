@@ -0,0 +1,15 @@
+"""
+Esquemas para la importación masiva de usuarios
+"""
+from pydantic import BaseModel
+from typing import List
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ImportReportDto(BaseModel):
+    total: int
+    created: int
+    failed: int
+    errors: List[ImportRowError]
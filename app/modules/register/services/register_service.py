@@ -1,45 +1,53 @@
 """
 Servicio para el registro de usuarios
 """
-from sqlalchemy.orm import Session
-from datetime import datetime
+import logging
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.modules.auth.models.user import User
 from app.modules.auth.models.credentials import Credentials
 from app.modules.auth.models.user_role import UserRole
 from app.modules.register.schemas.create_user_dto import CreateUserDto
-from app.core.security import get_password_hash
-from typing import List
+from app.core.password_hasher import PASSWORD_HASHER
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Marcadores de cada restricción en el mensaje del driver: nombre en Postgres
+# (credentials_email_key, ix_user_username, user_role_id_role_fkey) o tabla.columna en SQLite
+_CONFLICT_MESSAGES = (
+    (("credentials_email_key", "credentials.email"), "El email ya está registrado"),
+    (("ix_user_username", "user.username"), "El username ya está registrado"),
+    (("user_role_id_role_fkey",), "El rol indicado no existe"),
+)
+
+
+def conflict_message(error: IntegrityError) -> Optional[str]:
+    """Mensaje de registro para una violación de restricción, o None si no es una conocida."""
+    detail = str(getattr(error, "orig", error)).lower()
+    for markers, message in _CONFLICT_MESSAGES:
+        if any(marker in detail for marker in markers):
+            return message
+    return None
+
 
 class RegisterService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def create_user(self, data: CreateUserDto) -> dict:
-        """Crear un nuevo usuario"""
-        print("🔍 REGISTER_SERVICE: Iniciando creación de usuario")
-        
-        # Verificar si el email ya existe en credentials
-        print("🔍 REGISTER_SERVICE: Verificando email existente")
-        try:
-            existing_credentials = self.db.query(Credentials).filter(Credentials.email == data.email).first()
-            print(f"🔍 REGISTER_SERVICE: Consulta de email ejecutada, resultado: {existing_credentials}")
-        except Exception as e:
-            print(f"❌ REGISTER_SERVICE: Error al consultar credentials: {e}")
-            raise e
-        
-        if existing_credentials:
-            print("❌ REGISTER_SERVICE: Email ya existe")
-            raise ValueError("El email ya está registrado")
-        
-        # Verificar si la identificación ya existe
-        print("🔍 REGISTER_SERVICE: Verificando username existente")
-        existing_id = self.db.query(User).filter(User.username == data.username).first()
-        if existing_id:
-            print("❌ REGISTER_SERVICE: Username ya existe")
-            raise ValueError("El username ya está registrado")
-        
-        # Crear nuevo usuario
-        print("🔍 REGISTER_SERVICE: Creando nuevo usuario")
+    async def create_user(self, data: CreateUserDto) -> dict:
+        """
+        Crear un nuevo usuario
+
+        Una sola transacción: user (INSERT ... RETURNING id), credentials y user_role se
+        escriben en el mismo flush y un único commit. La unicidad de email y username la
+        garantizan las restricciones de la base; su violación se traduce a ValueError.
+        """
+        logger.debug("Iniciando creación de usuario")
+
+        # bcrypt es CPU: en el pool de hashing, fuera del event loop y antes de tomar conexión
+        hashed_password = await PASSWORD_HASHER.hash(data.password)
+
         new_user = User(
             firstName=data.firstName,
             lastName=data.lastName,
@@ -47,43 +55,21 @@ class RegisterService:
             phone=data.phone,
             id_status=True
         )
-        
-        print("🔍 REGISTER_SERVICE: Agregando usuario a la sesión")
+        new_user.credentials = [Credentials(email=data.email, password=hashed_password)]
+        new_user.user_roles = [UserRole(id_role=data.id_role)]
         self.db.add(new_user)
-        print("🔍 REGISTER_SERVICE: Haciendo commit del usuario")
-        self.db.commit()
-        print("🔍 REGISTER_SERVICE: Refrescando usuario")
-        self.db.refresh(new_user)
-        print(f"✅ REGISTER_SERVICE: Usuario creado con ID: {new_user.id_user}")
-        
-        # Crear credenciales con la contraseña hasheada
-        print("🔍 REGISTER_SERVICE: Creando credenciales")
-        hashed_password = get_password_hash(data.password)
-        new_credentials = Credentials(
-            id_user=new_user.id_user,
-            email=data.email,
-            password=hashed_password
-        )
-        
-        print("🔍 REGISTER_SERVICE: Agregando credenciales a la sesión")
-        self.db.add(new_credentials)
-        
-        # Crear la relación user_role
-        print(f"🔍 REGISTER_SERVICE: Creando user_role con id_role={data.id_role}")
-        new_user_role = UserRole(
-            id_user=new_user.id_user,
-            id_role=data.id_role
-        )
-        
-        print("🔍 REGISTER_SERVICE: Agregando user_role a la sesión")
-        self.db.add(new_user_role)
-        print("🔍 REGISTER_SERVICE: Haciendo commit final")
-        self.db.commit()
-        print("🔍 REGISTER_SERVICE: Refrescando objetos")
-        self.db.refresh(new_credentials)
-        self.db.refresh(new_user_role)
-        
-        print("✅ REGISTER_SERVICE: Usuario creado exitosamente")
+
+        try:
+            await self.db.commit()
+        except IntegrityError as e:
+            await self.db.rollback()
+            message = conflict_message(e)
+            if message is None:
+                raise
+            logger.info("Registro rechazado: %s", message)
+            raise ValueError(message)
+
+        logger.debug("Usuario creado con ID: %s", new_user.id_user)
         return {
             "message": "Usuario registrado exitosamente",
             "id": new_user.id_user,
@@ -0,0 +1,239 @@
+"""
+Importación masiva de usuarios desde CSV o XLSX.
+
+El archivo se lee por bloques de IMPORT_CHUNK_SIZE filas (pandas para CSV, openpyxl en modo
+read-only para XLSX). Cada bloque se valida con CreateUserDto, comprueba unicidad de email y
+username contra el propio archivo y contra la base con una consulta por columna, hashea las
+contraseñas en el pool de hashing y se inserta (user, credentials, user_role) con INSERTs
+multi-fila en una transacción por bloque. Las filas inválidas no bloquean el resto: van al
+informe con su número de fila (la cabecera es la fila 1).
+"""
+import logging
+import os
+import zipfile
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.password_hasher import PASSWORD_HASHER
+from app.core.read_replicas import mark_written
+from app.modules.auth.models.credentials import Credentials
+from app.modules.auth.models.role import Role
+from app.modules.auth.models.user import User
+from app.modules.auth.models.user_role import UserRole
+from app.modules.register.schemas.create_user_dto import CreateUserDto
+from app.modules.register.schemas.import_report_dto import ImportReportDto, ImportRowError
+from app.modules.register.services.register_service import conflict_message
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = int(os.getenv("USER_IMPORT_CHUNK_SIZE", "1000"))
+
+# Longitudes de las columnas destino: en Postgres un valor más largo haría fallar el bloque entero
+_MAX_LENGTHS = {
+    "firstName": User.__table__.c.firstName.type.length,
+    "lastName": User.__table__.c.lastName.type.length,
+    "username": User.__table__.c.username.type.length,
+    "phone": User.__table__.c.phone.type.length,
+    "email": Credentials.__table__.c.email.type.length,
+}
+
+Row = Tuple[int, Dict[str, Any]]
+
+
+def _clean(value: Any) -> Optional[str]:
+    # Celdas vacías cuentan como ausentes; los números de Excel (teléfono, rol) llegan como float
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value).strip()
+    return value or None
+
+
+def _record(header: List[str], values: Any) -> Dict[str, Any]:
+    return {key: cleaned for key, value in zip(header, values) if key and (cleaned := _clean(value)) is not None}
+
+
+# pandas y openpyxl se importan al leer el primer archivo: suman ~0.5s al arranque del worker
+def _csv_chunks(file: BinaryIO, chunk_size: int) -> Iterator[List[Row]]:
+    import pandas as pd
+
+    row_number = 1
+    # skip_blank_lines=False: pandas descartaría las líneas en blanco y desplazaría el número de
+    # todas las filas siguientes; se leen y se saltan aquí, como en XLSX
+    frames = pd.read_csv(
+        file, dtype=str, keep_default_na=False, skip_blank_lines=False, chunksize=chunk_size, encoding="utf-8-sig"
+    )
+    for frame in frames:
+        header = [str(column).strip() for column in frame.columns]
+        chunk = []
+        for values in frame.itertuples(index=False, name=None):
+            row_number += 1
+            record = _record(header, values)
+            if record:
+                chunk.append((row_number, record))
+        if chunk:
+            yield chunk
+
+
+def _xlsx_chunks(file: BinaryIO, chunk_size: int) -> Iterator[List[Row]]:
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError) as e:
+        raise ValueError(f"Archivo XLSX inválido: {e}")
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+        chunk: List[Row] = []
+        for row_number, values in enumerate(rows, start=2):
+            record = _record(header, values)
+            if not record:
+                continue  # filas en blanco al final de la hoja
+            chunk.append((row_number, record))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        workbook.close()
+
+
+def read_chunks(file: BinaryIO, filename: str, chunk_size: int = IMPORT_CHUNK_SIZE) -> Iterator[List[Row]]:
+    """Bloques de (número de fila, registro) según la extensión del archivo."""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".csv":
+        return _csv_chunks(file, chunk_size)
+    if extension == ".xlsx":
+        return _xlsx_chunks(file, chunk_size)
+    raise ValueError("Formato no soportado: se admite .csv o .xlsx")
+
+
+class UserImportService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._seen_emails: Dict[str, int] = {}
+        self._seen_usernames: Dict[str, int] = {}
+
+    async def import_file(self, file: BinaryIO, filename: str) -> ImportReportDto:
+        """Importa todas las filas válidas y devuelve el informe por fila"""
+        chunks = read_chunks(file, filename)
+        role_ids = set((await self.db.scalars(select(Role.id_role))).all())
+        total = created = 0
+        errors: List[ImportRowError] = []
+        while True:
+            # Leer/parsear el bloque es CPU y E/S síncrona: fuera del event loop
+            chunk = await run_in_threadpool(next, chunks, None)
+            if chunk is None:
+                break
+            total += len(chunk)
+            valid, chunk_errors = await self._validate(chunk, role_ids)
+            errors.extend(chunk_errors)
+            if valid:
+                inserted, insert_errors = await self._insert(valid)
+                created += inserted
+                errors.extend(insert_errors)
+        errors.sort(key=lambda error: error.row)
+        logger.info("Importación de usuarios: %s filas, %s creadas, %s con errores", total, created, len(errors))
+        return ImportReportDto(total=total, created=created, failed=len(errors), errors=errors)
+
+    async def _validate(self, chunk: List[Row], role_ids: Set[int]) -> Tuple[List[Tuple[int, CreateUserDto]], List[ImportRowError]]:
+        parsed: List[Tuple[int, CreateUserDto]] = []
+        row_errors: Dict[int, List[str]] = {}
+        for row_number, record in chunk:
+            try:
+                dto = CreateUserDto(**record)
+            except ValidationError as e:
+                row_errors[row_number] = [
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                ]
+                continue
+            messages = [
+                f"{field}: máximo {limit} caracteres"
+                for field, limit in _MAX_LENGTHS.items()
+                if limit and len(getattr(dto, field)) > limit
+            ]
+            if dto.id_role not in role_ids:
+                messages.append(f"id_role: el rol {dto.id_role} no existe")
+            for value, seen, label in (
+                (dto.email, self._seen_emails, "email"),
+                (dto.username, self._seen_usernames, "username"),
+            ):
+                if value in seen:
+                    messages.append(f"{label} duplicado en el archivo (fila {seen[value]})")
+            if messages:
+                row_errors[row_number] = messages
+            else:
+                # Solo una fila aceptada reserva su email/username: una rechazada no se importa y
+                # no debe invalidar una fila posterior válida con el mismo valor
+                self._seen_emails[dto.email] = row_number
+                self._seen_usernames[dto.username] = row_number
+                parsed.append((row_number, dto))
+
+        # Unicidad contra la base: una consulta por columna para todo el bloque
+        emails = {dto.email for _, dto in parsed}
+        usernames = {dto.username for _, dto in parsed}
+        taken_emails = set((await self.db.scalars(select(Credentials.email).where(Credentials.email.in_(emails)))).all()) if emails else set()
+        taken_usernames = set((await self.db.scalars(select(User.username).where(User.username.in_(usernames)))).all()) if usernames else set()
+        valid: List[Tuple[int, CreateUserDto]] = []
+        for row_number, dto in parsed:
+            messages = []
+            if dto.email in taken_emails:
+                messages.append("El email ya está registrado")
+            if dto.username in taken_usernames:
+                messages.append("El username ya está registrado")
+            if messages:
+                row_errors[row_number] = messages
+            else:
+                valid.append((row_number, dto))
+        return valid, [ImportRowError(row=row, errors=messages) for row, messages in row_errors.items()]
+
+    async def _insert(self, valid: List[Tuple[int, CreateUserDto]]) -> Tuple[int, List[ImportRowError]]:
+        hashes = await PASSWORD_HASHER.hash_many([dto.password for _, dto in valid])
+        try:
+            created = await self._insert_rows(valid, hashes)
+            return created, []
+        except IntegrityError as e:
+            # Un alta concurrente entre la validación y el INSERT: se reintenta fila a fila para
+            # informar solo de la que choca y crear el resto del bloque
+            await self.db.rollback()
+            logger.warning("Conflicto al insertar un bloque de %s usuarios, reintento por fila: %s", len(valid), e.orig)
+        created = 0
+        errors: List[ImportRowError] = []
+        for row, hashed in zip(valid, hashes):
+            try:
+                created += await self._insert_rows([row], [hashed])
+            except IntegrityError as e:
+                await self.db.rollback()
+                errors.append(ImportRowError(row=row[0], errors=[conflict_message(e) or "Conflicto al insertar la fila"]))
+        return created, errors
+
+    async def _insert_rows(self, rows: List[Tuple[int, CreateUserDto]], hashes: List[str]) -> int:
+        """INSERTs multi-fila (user, credentials, user_role) y commit; IntegrityError si alguna choca."""
+        user_ids = (await self.db.scalars(
+            insert(User).returning(User.id_user, sort_by_parameter_order=True),
+            [
+                {"firstName": dto.firstName, "lastName": dto.lastName, "username": dto.username,
+                 "phone": dto.phone, "id_status": True}
+                for _, dto in rows
+            ],
+        )).all()
+        await self.db.execute(insert(Credentials), [
+            {"id_user": id_user, "email": dto.email, "password": hashed}
+            for id_user, (_, dto), hashed in zip(user_ids, rows, hashes)
+        ])
+        await self.db.execute(insert(UserRole), [
+            {"id_user": id_user, "id_role": dto.id_role} for id_user, (_, dto) in zip(user_ids, rows)
+        ])
+        # INSERT Core: sin flush ORM que active la cookie de lectura de las propias escrituras
+        mark_written(self.db)
+        await self.db.commit()
+        return len(user_ids)
@@ -0,0 +1,5 @@
+"""
+Benchmarks del sistema experto: generador de catálogos RAWG sintéticos y escenarios por endpoint.
+
+    python -m benchmarks.run --sizes 1000,10000 --output bench_results.json
+"""
@@ -0,0 +1,130 @@
+"""
+Latencia de una ruta barata (/expert-system/ping) mientras una ráfaga de /diagnose desde
+varios clientes satura el worker, con y sin control de admisión (app/core/admission.py).
+
+Corre la app real en proceso (httpx + ASGITransport, un solo event loop como un worker de
+uvicorn) sobre un catálogo sintético; la base es una SQLite temporal.
+
+Uso:
+    python -m benchmarks.admission_burst --size 5000 --heavy-concurrency 32 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks.run import _percentile, prepare_catalog
+
+
+def _find_admission(app):
+    from app.core.admission import AdmissionControlMiddleware
+
+    layer = app.middleware_stack
+    while layer is not None and not isinstance(layer, AdmissionControlMiddleware):
+        layer = getattr(layer, "app", None)
+    return layer
+
+
+async def _burst(app, heavy_concurrency: int, clients: int, seconds: float) -> Dict[str, Any]:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    statuses: Dict[int, int] = {}
+    cheap: List[float] = []
+    deadline = time.perf_counter() + seconds
+    payload = {"genres": ["Action"], "page": 1, "page_size": 12}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def heavy(worker: int) -> None:
+            headers = {"X-Forwarded-For": f"10.0.0.{worker % clients}"}
+            while time.perf_counter() < deadline:
+                response = await client.post("/expert-system/diagnose", json=payload, headers=headers)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                # ASGITransport no cede el loop entre peticiones; la red real sí
+                await asyncio.sleep(0)
+                if response.status_code == 429:
+                    # Un cliente que respeta Retry-After (acotado para que la prueba dure lo previsto)
+                    await asyncio.sleep(min(float(response.headers.get("retry-after", "1")), 0.2))
+
+        async def probe() -> None:
+            # Latencia desde la llegada prevista (cada 10ms), no desde que el loop la atiende:
+            # con el worker saturado la espera hasta ser atendida es justo lo que se mide
+            arrival = time.perf_counter()
+            while arrival < deadline:
+                await client.get("/expert-system/ping")
+                cheap.append(time.perf_counter() - arrival)
+                arrival = max(arrival + 0.01, time.perf_counter())
+                await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+
+        await asyncio.gather(probe(), *(heavy(i) for i in range(heavy_concurrency)))
+
+    cheap.sort()
+    return {
+        "cheap_requests": len(cheap),
+        "cheap_p50_ms": round(_percentile(cheap, 50) * 1000, 2),
+        "cheap_p99_ms": round(_percentile(cheap, 99) * 1000, 2),
+        "cheap_max_ms": round(cheap[-1] * 1000, 2),
+        "cheap_mean_ms": round(statistics.fmean(cheap) * 1000, 2),
+        "heavy_statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="p99 de rutas baratas bajo una ráfaga de rutas caras")
+    parser.add_argument("--size", type=int, default=5000, help="Juegos del catálogo sintético")
+    parser.add_argument("--heavy-concurrency", type=int, default=32)
+    parser.add_argument("--clients", type=int, default=4, help="Clientes distintos entre los que se reparte la ráfaga")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="admission-bench-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    os.environ.setdefault("SECRET_KEY", "bench")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+    # Los clientes simulados se distinguen por X-Forwarded-For, como detrás del proxy de Render
+    os.environ.setdefault("ADMISSION_TRUST_FORWARDED", "true")
+    prepare_catalog(workdir, args.size, 7)
+
+    from app.main import app
+
+    async def _bench() -> List[Dict[str, Any]]:
+        import httpx
+
+        # Primera petición: construye la pila de middlewares y el NDJSON/hechos de /diagnose
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            await client.get("/expert-system/ping")
+            await client.post("/expert-system/diagnose", json={"page": 1})
+        admission = _find_admission(app)
+        policies = admission.limiters if admission is not None else {}
+        results = []
+        for mode in ("off", "on"):
+            if admission is not None:
+                admission.limiters = policies if mode == "on" else {}
+            row = {"admission": mode, **await _burst(app, args.heavy_concurrency, args.clients, args.seconds)}
+            results.append(row)
+            print(
+                f"admisión={mode:<3} ping n={row['cheap_requests']} p50={row['cheap_p50_ms']}ms p99={row['cheap_p99_ms']}ms "
+                f"max={row['cheap_max_ms']}ms diagnose={row['heavy_statuses']}",
+                file=sys.stderr,
+            )
+            await asyncio.sleep(1.0)  # recargar los buckets entre modos
+        return results
+
+    results = asyncio.run(_bench())
+    payload = json.dumps({"size": args.size, "heavy_concurrency": args.heavy_concurrency, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Generador determinista de catálogos con la forma de /api/games de RAWG.
+
+Las distribuciones imitan el catálogo real: popularidad de géneros y tags tipo Zipf, tags
+correlacionados con el género, ~30% de juegos con metacritic, ESRB ausente en la mayoría y
+arrays pesados (ratings, stores, short_screenshots) como en la respuesta original.
+
+Uso:
+    python -m benchmarks.catalog_generator --count 100000 --seed 7 --output app_data/catalog_games.json
+"""
+import argparse
+import json
+import os
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+
+GENRES: List[Tuple[str, str]] = [
+    ("Action", "action"), ("Indie", "indie"), ("Adventure", "adventure"), ("RPG", "role-playing-games-rpg"),
+    ("Strategy", "strategy"), ("Shooter", "shooter"), ("Casual", "casual"), ("Simulation", "simulation"),
+    ("Puzzle", "puzzle"), ("Arcade", "arcade"), ("Platformer", "platformer"), ("Racing", "racing"),
+    ("Massively Multiplayer", "massively-multiplayer"), ("Sports", "sports"), ("Fighting", "fighting"),
+    ("Family", "family"), ("Board Games", "board-games"), ("Educational", "educational"), ("Card", "card"),
+]
+
+PLATFORMS: List[Tuple[str, str, float]] = [
+    ("PC", "pc", 0.80), ("PlayStation 4", "playstation4", 0.30), ("Xbox One", "xbox-one", 0.25),
+    ("Nintendo Switch", "nintendo-switch", 0.20), ("macOS", "macos", 0.25), ("Linux", "linux", 0.18),
+    ("PlayStation 5", "playstation5", 0.12), ("Xbox Series S/X", "xbox-series-x", 0.10), ("iOS", "ios", 0.15),
+    ("Android", "android", 0.14), ("Xbox 360", "xbox360", 0.08), ("PlayStation 3", "playstation3", 0.08),
+    ("Web", "web", 0.05),
+]
+
+# Tags reales más frecuentes en RAWG; el resto del vocabulario se completa con tags de cola larga
+COMMON_TAGS: List[str] = [
+    "Singleplayer", "Steam Achievements", "Multiplayer", "Full controller support", "Atmospheric",
+    "steam-trading-cards", "Great Soundtrack", "RPG", "Co-op", "Story Rich", "Open World", "cooperative",
+    "First-Person", "Sci-fi", "2D", "Third Person", "FPS", "Horror", "Fantasy", "Gore", "Funny",
+    "Sandbox", "Survival", "Exploration", "Stealth", "Comedy", "Difficult", "Pixel Graphics", "Violent",
+    "Online Co-Op", "PvP", "Competitive", "Online multiplayer", "Local Co-Op", "Split Screen", "Nudity",
+    "Sexual Content", "Mature", "Female Protagonist", "Retro", "Cute", "Physics", "Anime", "Zombies",
+    "Post-apocalyptic", "Space", "Crafting", "Roguelike", "Turn-Based", "Tactical", "Replay Value",
+    "Moddable", "VR", "Family Friendly", "Relaxing", "Short", "Casual", "Puzzle", "Platformer",
+]
+
+GENRE_TAG_AFFINITY: Dict[str, List[str]] = {
+    "Action": ["Violent", "Gore", "Third Person", "FPS", "Difficult", "Stealth"],
+    "Shooter": ["FPS", "First-Person", "PvP", "Competitive", "Online multiplayer", "Violent"],
+    "RPG": ["RPG", "Fantasy", "Story Rich", "Open World", "Exploration", "Turn-Based"],
+    "Adventure": ["Story Rich", "Exploration", "Atmospheric", "Third Person", "Female Protagonist"],
+    "Indie": ["Pixel Graphics", "2D", "Retro", "Cute", "Short", "Roguelike"],
+    "Strategy": ["Tactical", "Turn-Based", "Replay Value", "Moddable"],
+    "Simulation": ["Sandbox", "Crafting", "Relaxing", "Physics", "VR"],
+    "Casual": ["Family Friendly", "Cute", "Relaxing", "Casual", "Short"],
+    "Puzzle": ["Puzzle", "Relaxing", "2D", "Family Friendly"],
+    "Massively Multiplayer": ["Online multiplayer", "PvP", "Online Co-Op", "Competitive", "Multiplayer"],
+    "Sports": ["Competitive", "Local Co-Op", "Split Screen", "Multiplayer"],
+    "Racing": ["Competitive", "Split Screen", "Physics"],
+    "Fighting": ["PvP", "Competitive", "Local Co-Op", "Violent"],
+    "Platformer": ["Platformer", "2D", "Difficult", "Pixel Graphics"],
+}
+
+STORES: List[Tuple[str, str, str]] = [
+    ("Steam", "steam", "store.steampowered.com"), ("PlayStation Store", "playstation-store", "store.playstation.com"),
+    ("Xbox Store", "xbox-store", "microsoft.com"), ("App Store", "apple-appstore", "apps.apple.com"),
+    ("GOG", "gog", "gog.com"), ("Nintendo Store", "nintendo", "nintendo.com"),
+    ("Google Play", "google-play", "play.google.com"), ("itch.io", "itch", "itch.io"),
+    ("Epic Games", "epic-games", "epicgames.com"),
+]
+
+ESRB: List[Tuple[int, str, str, float]] = [
+    (1, "Everyone", "everyone", 0.08), (2, "Everyone 10+", "everyone-10-plus", 0.05), (3, "Teen", "teen", 0.09),
+    (4, "Mature", "mature", 0.09), (5, "Adults Only", "adults-only", 0.01),
+]
+
+RATING_TITLES = [(5, "exceptional"), (4, "recommended"), (3, "meh"), (1, "skip")]
+
+WORDS = [
+    "Shadow", "Legend", "Quest", "Dungeon", "Star", "Knight", "Cyber", "Dragon", "Lost", "City", "Empire",
+    "Galaxy", "Dark", "Souls", "Racer", "Farm", "Tactics", "Island", "Night", "Hunter", "Chronicles", "Rise",
+    "Fall", "Kingdom", "Zero", "Storm", "Blade", "Pixel", "Tower", "Escape", "Origins", "Frontier", "Echo",
+]
+
+
+def _zipf_weights(n: int, s: float) -> List[float]:
+    return [1.0 / (rank ** s) for rank in range(1, n + 1)]
+
+
+class CatalogGenerator:
+    """Genera juegos RAWG sintéticos de forma reproducible a partir de una semilla."""
+
+    def __init__(self, seed: int = 7, long_tail_tags: int = 1500) -> None:
+        self.seed = seed
+        self.tags: List[str] = COMMON_TAGS + [f"tag-{i:04d}" for i in range(long_tail_tags)]
+        self._tag_ids = {name: 40 + i for i, name in enumerate(self.tags)}
+        self._tag_weights = _zipf_weights(len(self.tags), 1.05)
+        self._genre_weights = _zipf_weights(len(GENRES), 0.9)
+
+    def games(self, count: int, start_id: int = 1) -> Iterator[Dict[str, Any]]:
+        for offset in range(count):
+            yield self.game(start_id + offset)
+
+    def game(self, game_id: int) -> Dict[str, Any]:
+        """Cada juego depende solo de (seed, id), así que cualquier página se puede generar sin las anteriores."""
+        return self._game(random.Random(self.seed * 1_000_003 + game_id), game_id)
+
+    def _game(self, rnd: random.Random, game_id: int) -> Dict[str, Any]:
+        name = " ".join(rnd.sample(WORDS, rnd.randint(1, 3))) + ("" if rnd.random() < 0.7 else f" {rnd.randint(2, 5)}")
+        slug = f"{name.lower().replace(' ', '-')}-{game_id}"
+
+        genre_count = min(len(GENRES), 1 + int(rnd.expovariate(1.2)))
+        genres = list(dict.fromkeys(rnd.choices(GENRES, self._genre_weights, k=genre_count)))
+
+        tag_names = set(rnd.choices(self.tags, self._tag_weights, k=rnd.randint(0, 18)))
+        for genre_name, _ in genres:
+            affinity = GENRE_TAG_AFFINITY.get(genre_name)
+            if affinity:
+                tag_names.update(rnd.sample(affinity, rnd.randint(0, min(3, len(affinity)))))
+
+        platforms = [p for p in PLATFORMS if rnd.random() < p[2]] or [PLATFORMS[0]]
+        stores = rnd.sample(STORES, rnd.randint(0, 4))
+
+        released_day = date(1985, 1, 1) + timedelta(days=rnd.randint(0, 14600))
+        tba = rnd.random() < 0.02
+        rating = round(min(5.0, max(0.0, rnd.betavariate(5, 2) * 5)), 2) if rnd.random() < 0.7 else 0.0
+        ratings_count = int(rnd.paretovariate(1.2)) - 1
+        esrb = rnd.choices(ESRB + [None], [e[3] for e in ESRB] + [0.68])[0]
+
+        return {
+            "id": game_id,
+            "slug": slug,
+            "name": name,
+            "released": None if tba else released_day.isoformat(),
+            "tba": tba,
+            "background_image": f"https://media.rawg.io/media/games/{game_id % 997:03d}/{slug}.jpg",
+            "rating": rating,
+            "rating_top": 5 if rating >= 4 else 4,
+            "ratings": [
+                {"id": rid, "title": title, "count": rnd.randint(0, 500), "percent": round(rnd.random() * 100, 2)}
+                for rid, title in RATING_TITLES
+            ],
+            "ratings_count": ratings_count,
+            "reviews_text_count": rnd.randint(0, 50),
+            "added": rnd.randint(0, 20000),
+            "added_by_status": {
+                "yet": rnd.randint(0, 500), "owned": rnd.randint(0, 10000), "beaten": rnd.randint(0, 2000),
+                "toplay": rnd.randint(0, 500), "dropped": rnd.randint(0, 1000), "playing": rnd.randint(0, 200),
+            },
+            "metacritic": rnd.randint(35, 98) if rnd.random() < 0.3 else None,
+            "playtime": int(rnd.expovariate(1 / 8)) if rnd.random() < 0.8 else 0,
+            "suggestions_count": rnd.randint(0, 700),
+            "updated": "2024-01-15T10:00:00",
+            "user_game": None,
+            "reviews_count": ratings_count,
+            "saturated_color": "0f0f0f",
+            "dominant_color": "0f0f0f",
+            "platforms": [
+                {
+                    "platform": {"id": pid, "name": pname, "slug": pslug, "image": None, "year_end": None,
+                                 "year_start": None, "games_count": 100000 // pid, "image_background": None},
+                    "released_at": None if tba else released_day.isoformat(),
+                    "requirements_en": None,
+                    "requirements_ru": None,
+                }
+                for pid, (pname, pslug, _) in ((PLATFORMS.index(p) + 1, p) for p in platforms)
+            ],
+            "parent_platforms": [
+                {"platform": {"id": pid, "name": pname, "slug": pslug}}
+                for pid, (pname, pslug, _) in ((PLATFORMS.index(p) + 1, p) for p in platforms[:3])
+            ],
+            "genres": [
+                {"id": gid, "name": gname, "slug": gslug, "games_count": 50000 // gid, "image_background": None}
+                for gid, (gname, gslug) in ((GENRES.index(g) + 1, g) for g in genres)
+            ],
+            "stores": [
+                {"id": game_id * 10 + sid, "store": {"id": sid, "name": sname, "slug": sslug, "domain": domain,
+                                                     "games_count": 10000 * sid, "image_background": None}}
+                for sid, (sname, sslug, domain) in ((STORES.index(s) + 1, s) for s in stores)
+            ],
+            "clip": None,
+            "tags": [
+                {"id": self._tag_ids[t], "name": t, "slug": t.lower().replace(" ", "-"), "language": "eng",
+                 "games_count": 200000 // self._tag_ids[t], "image_background": None}
+                for t in sorted(tag_names, key=self._tag_ids.get)
+            ],
+            "esrb_rating": {"id": esrb[0], "name": esrb[1], "slug": esrb[2]} if esrb else None,
+            "short_screenshots": [
+                {"id": game_id * 10 + i, "image": f"https://media.rawg.io/media/screenshots/{game_id}/{i}.jpg"}
+                for i in range(rnd.randint(1, 7))
+            ],
+        }
+
+
+def generate_games(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    return list(CatalogGenerator(seed).games(count))
+
+
+def write_catalog(path: str, count: int, seed: int = 7) -> int:
+    """Escribe el catálogo como lista JSON (formato de CatalogStore) sin mantenerlo entero en memoria."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for game in CatalogGenerator(seed).games(count):
+            if written:
+                f.write(",")
+            f.write(json.dumps(game, ensure_ascii=False))
+            written += 1
+        f.write("]")
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Genera un catálogo RAWG sintético")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="app_data/catalog_games.json")
+    args = parser.parse_args()
+    written = write_catalog(args.output, args.count, args.seed)
+    print(f"{written} juegos escritos en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Servidor RAWG falso para ejercitar /sync y /download-catalog sin consumir cuota.
+
+Sirve GET /api/games paginado (y GET /api/games/{id}) con juegos del generador sintético,
+con latencia, errores 5xx, 429 y tamaño máximo de página configurables.
+
+Uso:
+    python -m benchmarks.fake_rawg --port 8099 --count 50000 --latency-ms 40 --rate-limit-rate 0.05
+    RAWG_BASE_URL=http://127.0.0.1:8099/api RAWG_API_KEY=fake uvicorn app.main:app
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from benchmarks.catalog_generator import CatalogGenerator
+
+
+class FakeRawgConfig:
+    def __init__(
+        self,
+        count: int = 10000,
+        seed: int = 7,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.1,
+        max_page_size: int = 40,
+        api_key: Optional[str] = None,
+    ) -> None:
+        self.count = count
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.max_page_size = max_page_size
+        self.api_key = api_key
+
+
+class FakeRawgServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: FakeRawgConfig) -> None:
+        super().__init__(address, _FakeRawgHandler)
+        self.config = config
+        self.generator = CatalogGenerator(config.seed)
+        self.stats = {"requests": 0, "pages": 0, "games": 0, "errors": 0, "rate_limited": 0}
+        self._lock = threading.Lock()
+        self._random = random.Random(config.seed)
+
+    def count(self, **deltas: int) -> None:
+        with self._lock:
+            for key, delta in deltas.items():
+                self.stats[key] += delta
+
+    def roll(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+
+class _FakeRawgHandler(BaseHTTPRequestHandler):
+    server: FakeRawgServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # silencia el log por petición
+        pass
+
+    def do_GET(self) -> None:
+        cfg = self.server.config
+        self.server.count(requests=1)
+        if cfg.latency_ms or cfg.jitter_ms:
+            time.sleep((cfg.latency_ms + self.server.roll() * cfg.jitter_ms) / 1000.0)
+
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if cfg.api_key and params.get("key") != cfg.api_key:
+            return self._send(401, {"error": "The key parameter is not provided"})
+        if cfg.rate_limit_rate and self.server.roll() < cfg.rate_limit_rate:
+            self.server.count(rate_limited=1)
+            return self._send(429, {"detail": "Too many requests"}, {"Retry-After": str(cfg.retry_after)})
+        if cfg.error_rate and self.server.roll() < cfg.error_rate:
+            self.server.count(errors=1)
+            return self._send(503, {"detail": "Service temporarily unavailable"})
+
+        path = url.path.rstrip("/")
+        if path == "/api/games":
+            return self._games_page(params)
+        if path.startswith("/api/games/"):
+            try:
+                game_id = int(path.rsplit("/", 1)[1])
+            except ValueError:
+                return self._send(404, {"detail": "Not found."})
+            if 1 <= game_id <= cfg.count:
+                return self._send(200, self.server.generator.game(game_id))
+        return self._send(404, {"detail": "Not found."})
+
+    def _games_page(self, params: Dict[str, str]) -> None:
+        cfg = self.server.config
+        try:
+            page = max(1, int(params.get("page", 1)))
+            page_size = max(1, min(cfg.max_page_size, int(params.get("page_size", 20))))
+        except ValueError:
+            return self._send(400, {"detail": "Invalid page"})
+        first = (page - 1) * page_size + 1
+        if first > cfg.count:
+            return self._send(404, {"detail": "Invalid page."})
+        last = min(cfg.count, first + page_size - 1)
+        results = [self.server.generator.game(game_id) for game_id in range(first, last + 1)]
+        self.server.count(pages=1, games=len(results))
+
+        def page_url(n: int) -> str:
+            query = dict(params, page=n, page_size=page_size)
+            return f"http://{self.headers.get('Host', 'localhost')}/api/games?{urlencode(query)}"
+
+        return self._send(200, {
+            "count": cfg.count,
+            "next": page_url(page + 1) if last < cfg.count else None,
+            "previous": page_url(page - 1) if page > 1 else None,
+            "results": results,
+        })
+
+    def _send(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_in_thread(config: FakeRawgConfig, host: str = "127.0.0.1", port: int = 0) -> FakeRawgServer:
+    """Arranca el servidor en un hilo daemon; port=0 elige un puerto libre. Detener con shutdown()."""
+    server = FakeRawgServer((host, port), config)
+    thread = threading.Thread(target=server.serve_forever, name="fake-rawg", daemon=True)
+    thread.start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor RAWG falso")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--count", type=int, default=10000, help="Total de juegos del catálogo falso")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de respuestas 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fracción de respuestas 429")
+    parser.add_argument("--retry-after", type=float, default=0.1)
+    parser.add_argument("--max-page-size", type=int, default=40)
+    parser.add_argument("--api-key", default=None, help="Si se indica, exige ?key=<api-key>")
+    args = parser.parse_args()
+
+    config = FakeRawgConfig(
+        count=args.count, seed=args.seed, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after,
+        max_page_size=args.max_page_size, api_key=args.api_key,
+    )
+    server = FakeRawgServer((args.host, args.port), config)
+    print(f"RAWG falso en {server.base_url} ({args.count} juegos)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
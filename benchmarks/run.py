@@ -0,0 +1,163 @@
+"""
+Ejecuta los escenarios de benchmark y emite resultados comparables entre corridas.
+
+Uso:
+    python -m benchmarks.run --sizes 1000,10000,100000 --output bench_results.json
+    python -m benchmarks.run --sizes 10000 --only search.,diagnose.
+    python -m benchmarks.run --compare bench_base.json bench_results.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, List
+
+from benchmarks.catalog_generator import write_catalog
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def prepare_catalog(workdir: str, size: int, seed: int) -> None:
+    """Escribe el catálogo sintético en <workdir>/app_data y deja el proceso trabajando ahí."""
+    os.makedirs(os.path.join(workdir, "app_data"), exist_ok=True)
+    write_catalog(os.path.join(workdir, "app_data", "catalog_games.json"), size, seed)
+    os.chdir(workdir)
+
+
+def measure(scenario, iterations: int, warmup: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        scenario.func()
+    timings: List[float] = []
+    gc.collect()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        scenario.func()
+        timings.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+
+    # Memoria pico en una corrida aparte para no distorsionar la latencia
+    gc.collect()
+    tracemalloc.start()
+    scenario.func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "p50_ms": round(_percentile(timings, 50) * 1000, 3),
+        "p90_ms": round(_percentile(timings, 90) * 1000, 3),
+        "p99_ms": round(_percentile(timings, 99) * 1000, 3),
+        "max_ms": round(timings[-1] * 1000, 3),
+        "throughput_ops": round(iterations / wall, 2) if wall else 0.0,
+        "peak_mem_kb": round(peak / 1024, 1),
+    }
+
+
+def run(sizes: List[int], seed: int, iterations: int, cold_iterations: int, warmup: int, only: List[str]) -> Dict[str, Any]:
+    from benchmarks.scenarios import build_scenarios
+
+    original_cwd = os.getcwd()
+    results: List[Dict[str, Any]] = []
+    try:
+        for size in sizes:
+            with tempfile.TemporaryDirectory(prefix=f"bench-{size}-") as workdir:
+                print(f"== catálogo sintético de {size} juegos (seed={seed})", file=sys.stderr)
+                prepare_catalog(workdir, size, seed)
+                for scenario in build_scenarios(size, seed):
+                    if only and not any(scenario.name.startswith(prefix) for prefix in only):
+                        continue
+                    cold = scenario.kind == "cold"
+                    stats = measure(scenario, cold_iterations if cold else iterations, 0 if cold else warmup)
+                    row = {"scenario": scenario.name, "endpoint": scenario.endpoint, "kind": scenario.kind, "size": size}
+                    row.update(stats)
+                    results.append(row)
+                    print(
+                        f"{scenario.name:<32} n={size:<8} p50={stats['p50_ms']:>10.3f}ms "
+                        f"p99={stats['p99_ms']:>10.3f}ms {stats['throughput_ops']:>10.2f} ops/s "
+                        f"peak={stats['peak_mem_kb']:>10.1f}KB",
+                        file=sys.stderr,
+                    )
+                os.chdir(original_cwd)
+    finally:
+        os.chdir(original_cwd)
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+
+def compare(base_path: str, new_path: str, metric: str = "p50_ms") -> None:
+    """Imprime la variación de una métrica entre dos archivos de resultados."""
+    with open(base_path, "r", encoding="utf-8") as f:
+        base = {(r["scenario"], r["size"]): r for r in json.load(f)["results"]}
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = {(r["scenario"], r["size"]): r for r in json.load(f)["results"]}
+    print(f"{'scenario':<32} {'size':>8} {'base':>12} {'new':>12} {'delta':>9}")
+    for key in sorted(set(base) & set(new), key=lambda k: (k[1], k[0])):
+        before, after = base[key][metric], new[key][metric]
+        delta = ((after - before) / before * 100) if before else 0.0
+        print(f"{key[0]:<32} {key[1]:>8} {before:>12.3f} {after:>12.3f} {delta:>+8.1f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks de los caminos calientes del sistema experto")
+    parser.add_argument("--sizes", default="1000,10000", help="Tamaños de catálogo separados por coma (1k a 1M)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--cold-iterations", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--only", default="", help="Prefijos de escenario separados por coma")
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compara dos archivos de resultados")
+    parser.add_argument("--metric", default="p50_ms")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare[0], args.compare[1], args.metric)
+        return
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    only = [p.strip() for p in args.only.split(",") if p.strip()]
+    report = run(sizes, args.seed, args.iterations, args.cold_iterations, args.warmup, only)
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Escenarios de benchmark para los caminos calientes del sistema experto.
+
+Cada escenario llama directamente a los handlers/servicios (sin HTTP) sobre un catálogo
+sintético ya escrito en app_data/ del directorio de trabajo actual.
+"""
+import asyncio
+import random
+from typing import Any, Callable, Dict, List
+
+from fastapi import Request, Response
+
+from app.modules.expert_system.schemas.constraints_request_dto import DiagnoseRequest
+from app.modules.expert_system.schemas.recommendation_request_dto import RecommendationRequest
+
+NDJSON_PATH = "app_data/catalog_games.ndjson"
+
+
+class Scenario:
+    """Un caso medible. kind='cold' para operaciones de carga/reconstrucción, 'hot' para peticiones."""
+
+    def __init__(self, name: str, endpoint: str, func: Callable[[], Any], kind: str = "hot") -> None:
+        self.name = name
+        self.endpoint = endpoint
+        self.func = func
+        self.kind = kind
+
+
+_LOOP = asyncio.new_event_loop()
+
+
+def _run(coro) -> Any:
+    return _LOOP.run_until_complete(coro)
+
+
+def _request(method: str, path: str) -> Request:
+    # Petición sin If-None-Match: los escenarios miden siempre el cálculo completo
+    return Request({"type": "http", "method": method, "path": path, "query_string": b"", "headers": []})
+
+
+def build_scenarios(size: int, seed: int = 7) -> List[Scenario]:
+    """Construye los escenarios para el catálogo del directorio actual (ya preparado con prepare_catalog)."""
+    from app.modules.expert_system.routers import expert_system_router as es
+
+    rnd = random.Random(seed)
+    ids = list(range(1, size + 1))
+
+    # Estado caliente equivalente a un /sync + /to-ndjson previos
+    catalog = es._store.load()
+    es._store.to_ndjson(NDJSON_PATH)
+    es._get_engine().reload_from_cache(catalog)
+    es._similarity.update(catalog)
+    del catalog
+
+    def search(**filters: Any) -> Callable[[], Any]:
+        params: Dict[str, Any] = {"q": None}
+        params.update(filters)
+        return lambda: _run(es.search_ndjson(_request("GET", "/expert-system/search-ndjson"), Response(), **params))
+
+    def diagnose(body: Dict[str, Any]) -> Callable[[], Any]:
+        req = DiagnoseRequest(**body)
+        return lambda: _run(es.diagnose(req))
+
+    def recommend(body: Dict[str, Any]) -> Callable[[], Any]:
+        req = RecommendationRequest(**body)
+        return lambda: _run(es.recommend_games(req))
+
+    def diagnose_cold() -> Any:
+        es._get_diagnose_engine()._version = None
+        return _run(es.diagnose(DiagnoseRequest()))
+
+    def similar() -> Any:
+        return _run(es.similar_games(rnd.choice(ids), 10))
+
+    return [
+        # Carga y reconstrucción
+        Scenario("catalog_store.load", "CatalogStore.load", es._store.load, kind="cold"),
+        Scenario("catalog_store.to_ndjson", "CatalogStore.to_ndjson", lambda: es._store.to_ndjson(NDJSON_PATH), kind="cold"),
+        Scenario("catalog_store.iter_ndjson", "CatalogStore.iter_ndjson",
+                 lambda: sum(1 for _ in es._store.iter_ndjson(NDJSON_PATH)), kind="cold"),
+        Scenario("catalog_store.iter_projected", "CatalogStore.iter_projected",
+                 lambda: sum(1 for _ in es._store.iter_projected(NDJSON_PATH)), kind="cold"),
+        Scenario("expert_engine.reload", "ExpertEngine.reload_from_cache",
+                 lambda: es._get_engine().reload_from_cache(es._store.load()), kind="cold"),
+        Scenario("diagnose.cold", "POST /expert-system/diagnose", diagnose_cold, kind="cold"),
+        Scenario("similarity.update", "SimilarityIndex.update", lambda: es._similarity.update(es._store.load()), kind="cold"),
+        # /recommend
+        Scenario("recommend.no_filters", "POST /expert-system/recommend", recommend({"preferences": {}, "limit": 10})),
+        Scenario("recommend.genres_platforms", "POST /expert-system/recommend",
+                 recommend({"preferences": {"genres": ["RPG", "Action"], "platforms": ["PC"]}, "limit": 10})),
+        Scenario("recommend.full_mix", "POST /expert-system/recommend", recommend({
+            "preferences": {
+                "genres": ["RPG"], "platforms": ["PC", "PlayStation 5"], "exclude_genres": ["Casual"],
+                "exclude_platforms": ["iOS"], "age_rating_max": 13, "allow_multiplayer": True,
+                "min_playtime_hours": 5, "max_price": 30,
+            },
+            "limit": 20,
+        })),
+        # /search-ndjson
+        Scenario("search.title_query", "GET /expert-system/search-ndjson", search(q="dragon")),
+        Scenario("search.genre_platform", "GET /expert-system/search-ndjson", search(genres="rpg,strategy", platform="pc")),
+        Scenario("search.rating_range", "GET /expert-system/search-ndjson",
+                 search(min_rating=4.0, min_metacritic=80, only_released=True)),
+        Scenario("search.tags_exclude", "GET /expert-system/search-ndjson",
+                 search(tags="co-op,pvp", exclude_tags="gore,violent", multiplayer=True)),
+        Scenario("search.deep_page", "GET /expert-system/search-ndjson", search(page=50, page_size=20, max_playtime=40)),
+        Scenario("search.no_match", "GET /expert-system/search-ndjson", search(q="zzzz-no-match")),
+        # /diagnose
+        Scenario("diagnose.defaults", "POST /expert-system/diagnose", diagnose({})),
+        Scenario("diagnose.minor_safe", "POST /expert-system/diagnose", diagnose({
+            "content": {"age_max": 12, "allow_violence": False, "offline_required": True},
+            "preferences": {"include_genres": ["Puzzle", "Casual", "Family"]},
+        })),
+        Scenario("diagnose.mixed", "POST /expert-system/diagnose", diagnose({
+            "hardware": {"platform": "PC"},
+            "time": {"min_playtime_hours": 2, "max_playtime_hours": 60},
+            "content": {"coop_required": True, "multiplayer_required": True},
+            "preferences": {"min_rating": 3.5, "exclude_tags": ["nudity"], "include_tags": ["co-op", "online co-op"]},
+            "page": 2,
+        })),
+        # /games/{id}/similar
+        Scenario("similar.lookup", "GET /expert-system/games/{id}/similar", similar),
+    ]
@@ -0,0 +1,182 @@
+"""
+Throughput de registros concurrentes: RegisterService.create_user frente al flujo anterior
+(consulta de email y de username, dos commits y tres refresh) como referencia.
+
+Por defecto usa una SQLite temporal, que serializa las escrituras; para medir contención
+real conviene apuntar a un Postgres desechable con --database-url. bcrypt va con coste
+mínimo (PASSWORD_HASH_ROUNDS=4) para medir la base de datos y no el hash.
+
+Uso:
+    python -m benchmarks.signup_throughput --signups 2000 --concurrency 20
+    python -m benchmarks.signup_throughput --database-url postgresql://.../bench --concurrency 100 --output signup.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+async def _legacy_create_user(db, data) -> None:
+    """Flujo previo de registro (5+ viajes y dos commits), solo como referencia."""
+    from sqlalchemy import select
+
+    from app.core.password_hasher import PASSWORD_HASHER
+    from app.modules.auth.models.credentials import Credentials
+    from app.modules.auth.models.user import User
+    from app.modules.auth.models.user_role import UserRole
+
+    if await db.scalar(select(Credentials.id_credentials).where(Credentials.email == data.email).limit(1)):
+        raise ValueError("El email ya está registrado")
+    if await db.scalar(select(User.id_user).where(User.username == data.username).limit(1)):
+        raise ValueError("El username ya está registrado")
+    new_user = User(firstName=data.firstName, lastName=data.lastName, username=data.username, phone=data.phone, id_status=True)
+    db.add(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+    hashed = await PASSWORD_HASHER.hash(data.password)
+    credentials = Credentials(id_user=new_user.id_user, email=data.email, password=hashed)
+    user_role = UserRole(id_user=new_user.id_user, id_role=data.id_role)
+    db.add_all([credentials, user_role])
+    await db.commit()
+    await db.refresh(credentials)
+    await db.refresh(user_role)
+
+
+async def _current_create_user(db, data) -> None:
+    from app.modules.register.services.register_service import RegisterService
+
+    await RegisterService(db).create_user(data)
+
+
+async def _run_flow(
+    name: str, create: Callable[[Any, Any], Awaitable[None]], prefix: str, signups: int, concurrency: int,
+    counters: Dict[str, int],
+) -> Dict[str, Any]:
+    from app.core.database import AsyncSessionLocal
+    from app.modules.register.schemas.create_user_dto import CreateUserDto
+
+    payloads = [
+        CreateUserDto(
+            firstName=f"Nombre{i}", lastName="Apellido", username=f"{prefix}{i}", phone=str(3000000000 + i),
+            email=f"{prefix}{i}@bench.local", password="bench-password", id_role=1,
+        )
+        for i in range(signups)
+    ]
+    queue: "asyncio.Queue[Any]" = asyncio.Queue()
+    for payload in payloads:
+        queue.put_nowait(payload)
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while not queue.empty():
+            payload = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    await create(db, payload)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    counters.update(queries=0, commits=0)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ok = max(1, len(latencies))
+    latencies.sort()
+    return {
+        "flow": name,
+        "signups": len(latencies),
+        "errors": errors,
+        "signups_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 2) if latencies else None,
+        "queries_per_signup": round(counters["queries"] / ok, 2),
+        "commits_per_signup": round(counters["commits"] / ok, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Registros concurrentes por segundo")
+    parser.add_argument("--signups", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--database-url", default=None, help="Base desechable; por defecto SQLite temporal")
+    parser.add_argument("--skip-legacy", action="store_true", help="No medir el flujo anterior")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="signup-bench-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(workdir, 'signup.db')}"
+    os.environ.setdefault("SECRET_KEY", "bench")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+    os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
+
+    from sqlalchemy import event
+
+    from app.core.database import async_engine, create_tables, engine, initialize_default_roles
+    from app.core.password_hasher import PASSWORD_HASHER
+
+    create_tables()
+    initialize_default_roles()
+    counters = {"queries": 0, "commits": 0}
+
+    def _count_query(*_: Any) -> None:
+        counters["queries"] += 1
+
+    def _count_commit(*_: Any) -> None:
+        counters["commits"] += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _count_query)
+    event.listen(async_engine.sync_engine, "commit", _count_commit)
+
+    # Prefijo por ejecución: con --database-url la base puede tener registros de corridas previas
+    run_id = f"b{int(time.time())}"
+    flows = [("current", _current_create_user)]
+    if not args.skip_legacy:
+        flows.insert(0, ("legacy_two_commits", _legacy_create_user))
+
+    async def _bench() -> List[Dict[str, Any]]:
+        await PASSWORD_HASHER.warm_up()
+        results = []
+        try:
+            for name, create in flows:
+                row = await _run_flow(name, create, f"{run_id}{name[0]}", args.signups, args.concurrency, counters)
+                results.append(row)
+                print(
+                    f"{name:<20} {row['signups_per_s']:>8.1f} registros/s  p95={row['p95_ms']}ms  "
+                    f"consultas={row['queries_per_signup']}  commits={row['commits_per_signup']}  errores={row['errors']}",
+                    file=sys.stderr,
+                )
+        finally:
+            await async_engine.dispose()
+            PASSWORD_HASHER.shutdown()
+        return results
+
+    try:
+        results = asyncio.run(_bench())
+    finally:
+        engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    payload = json.dumps(
+        {"signups": args.signups, "concurrency": args.concurrency, "results": results}, indent=2
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Harness de carga para la ingesta de RAWG (/sync) contra el servidor RAWG falso.
+
+Mide throughput (páginas/s, juegos/s), tiempo total y memoria pico de:
+  - fetch: solo RawgClient.fetch_all_games
+  - sync:  el handler /expert-system/sync completo (fetch + save + recarga de motor e índices)
+
+Uso:
+    python -m benchmarks.sync_load --count 20000 --max-pages 100 --page-size 40 --latency-ms 20
+    python -m benchmarks.sync_load --rate-limit-rate 0.05 --error-rate 0.02 --runs 3 --output sync.json
+    # Contra una app ya levantada con RAWG_BASE_URL=http://127.0.0.1:8099/api
+    python -m benchmarks.sync_load --fake-port 8099 --target http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from typing import Any, Dict, List
+
+from benchmarks.fake_rawg import FakeRawgConfig, start_in_thread
+
+FAKE_API_KEY = "fake-rawg-key"
+
+
+def _measure(func, trace_memory: bool) -> Dict[str, Any]:
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    peak_kb = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_kb = round(peak / 1024, 1)
+    return {"seconds": elapsed, "peak_mem_kb": peak_kb, "result": result}
+
+
+def run_fetch(base_url: str, max_pages: int, page_size: int, trace_memory: bool) -> Dict[str, Any]:
+    from app.modules.expert_system.services.rawg_client import RawgClient
+
+    client = RawgClient(api_key=FAKE_API_KEY, base_url=base_url)
+    measured = _measure(lambda: client.fetch_all_games(max_pages=max_pages, page_size=page_size), trace_memory)
+    games = measured.pop("result")
+    measured.update({"games": len(games), "retries": client.retries})
+    return measured
+
+
+def run_sync(max_pages: int, page_size: int, trace_memory: bool) -> Dict[str, Any]:
+    from app.modules.expert_system.routers import expert_system_router as es
+
+    loop = asyncio.new_event_loop()
+    try:
+        measured = _measure(
+            lambda: loop.run_until_complete(
+                es.sync_catalog(max_pages=max_pages, page_size=page_size, genres=None, platforms=None, ordering=None)
+            ),
+            trace_memory,
+        )
+    finally:
+        loop.close()
+    measured["games"] = measured.pop("result")["downloaded"]
+    return measured
+
+
+def run_http(target: str, max_pages: int, page_size: int) -> Dict[str, Any]:
+    url = f"{target.rstrip('/')}/expert-system/sync?max_pages={max_pages}&page_size={page_size}"
+    started = time.perf_counter()
+    with urllib.request.urlopen(urllib.request.Request(url, method="POST"), timeout=3600) as resp:
+        payload = json.loads(resp.read().decode("utf-8"))
+    return {"seconds": time.perf_counter() - started, "peak_mem_kb": None, "games": payload.get("downloaded", 0)}
+
+
+def summarize(mode: str, runs: List[Dict[str, Any]], page_size: int) -> Dict[str, Any]:
+    seconds = [r["seconds"] for r in runs]
+    games = runs[-1]["games"]
+    best = min(seconds)
+    peaks = [r["peak_mem_kb"] for r in runs if r.get("peak_mem_kb") is not None]
+    return {
+        "mode": mode,
+        "runs": len(runs),
+        "games": games,
+        "pages": -(-games // page_size) if page_size else 0,
+        "median_s": round(statistics.median(seconds), 3),
+        "best_s": round(best, 3),
+        "games_per_s": round(games / best, 1) if best else 0.0,
+        "pages_per_s": round((games / page_size) / best, 2) if best and page_size else 0.0,
+        "peak_mem_kb": max(peaks) if peaks else None,
+        # Solo el modo fetch ve el cliente; para sync/http ver "server" (errores y 429 servidos)
+        "retries": sum(r["retries"] for r in runs) if all("retries" in r for r in runs) else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Carga de /sync contra un RAWG falso")
+    parser.add_argument("--count", type=int, default=10000, help="Juegos del catálogo falso")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--max-pages", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.05)
+    parser.add_argument("--max-page-size", type=int, default=40)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", default="fetch,sync", help="fetch,sync (en proceso)")
+    parser.add_argument("--target", default=None, help="URL de una app levantada; mide /sync por HTTP")
+    parser.add_argument("--fake-port", type=int, default=0)
+    parser.add_argument("--no-tracemalloc", action="store_true", help="No medir memoria (tracemalloc ralentiza)")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    config = FakeRawgConfig(
+        count=args.count, seed=args.seed, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after,
+        max_page_size=args.max_page_size,
+    )
+    server = start_in_thread(config, port=args.fake_port)
+    print(f"RAWG falso en {server.base_url}", file=sys.stderr)
+    os.environ["RAWG_BASE_URL"] = server.base_url
+    os.environ["RAWG_API_KEY"] = FAKE_API_KEY
+
+    trace_memory = not args.no_tracemalloc
+    summaries: List[Dict[str, Any]] = []
+    original_cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory(prefix="sync-load-") as workdir:
+            os.chdir(workdir)
+            os.makedirs("app_data", exist_ok=True)
+            if args.target:
+                plan = [("http", lambda: run_http(args.target, args.max_pages, args.page_size))]
+            else:
+                modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+                plan = []
+                if "fetch" in modes:
+                    plan.append(("fetch", lambda: run_fetch(server.base_url, args.max_pages, args.page_size, trace_memory)))
+                if "sync" in modes:
+                    plan.append(("sync", lambda: run_sync(args.max_pages, args.page_size, trace_memory)))
+            for mode, func in plan:
+                runs = [func() for _ in range(args.runs)]
+                summary = summarize(mode, runs, min(args.page_size, args.max_page_size))
+                summaries.append(summary)
+                print(
+                    f"{mode:<6} {summary['games']} juegos  mediana={summary['median_s']}s  "
+                    f"{summary['games_per_s']} juegos/s  {summary['pages_per_s']} págs/s  "
+                    f"pico={summary['peak_mem_kb']}KB  reintentos={summary['retries']}",
+                    file=sys.stderr,
+                )
+            os.chdir(original_cwd)
+    finally:
+        os.chdir(original_cwd)
+        server.shutdown()
+        server.server_close()
+
+    report: Dict[str, Any] = {
+        "config": {k: v for k, v in vars(config).items()},
+        "params": {"max_pages": args.max_pages, "page_size": args.page_size, "runs": args.runs},
+        "server": server.stats,
+        "results": summaries,
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
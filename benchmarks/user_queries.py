@@ -0,0 +1,180 @@
+"""
+Cuenta consultas SQL y mide latencia de los caminos de UserService sobre una base sintética.
+
+Por defecto crea una SQLite temporal (DATABASE_URL se fija antes de importar la app); con
+--database-url se puede apuntar a un Postgres desechable. Incluye la versión N+1 anterior
+de get_all_users como referencia.
+
+Uso:
+    python -m benchmarks.user_queries --users 10000
+    python -m benchmarks.user_queries --users 100000 --database-url postgresql://.../bench --output users.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+PASSWORD = "bench-password"
+
+
+def _seed(session_factory, users: int, batch: int = 5000) -> None:
+    from app.modules.auth.models.credentials import Credentials
+    from app.modules.auth.models.role import Role
+    from app.modules.auth.models.user import User
+    from app.modules.auth.models.user_role import UserRole
+
+    from app.core.password_hasher import get_password_hash
+
+    # Un único hash bcrypt con el coste mínimo (PASSWORD_HASH_ROUNDS=4 abajo) para no medir
+    # bcrypt aquí; con la política vigente tampoco dispara el rehash en verify_credentials
+    hashed = get_password_hash(PASSWORD)
+    db = session_factory()
+    try:
+        if not db.query(Role).count():
+            db.add_all([Role(name="usuario", description="Rol de usuario estándar"), Role(name="admin", description="Rol de administrador del sistema")])
+            db.commit()
+        for start in range(1, users + 1, batch):
+            ids = range(start, min(users, start + batch - 1) + 1)
+            db.bulk_insert_mappings(User, [
+                {"id_user": i, "firstName": f"Nombre{i}", "lastName": f"Apellido{i % 997}", "username": f"user{i}",
+                 "phone": str(3000000000 + i), "id_status": i % 10 != 0}
+                for i in ids
+            ])
+            db.bulk_insert_mappings(Credentials, [
+                {"id_user": i, "email": f"user{i}@bench.local", "password": hashed} for i in ids
+            ])
+            db.bulk_insert_mappings(UserRole, [{"id_user": i, "id_role": 2 if i % 50 == 0 else 1} for i in ids])
+            db.commit()
+    finally:
+        db.close()
+
+
+def _naive_get_all_users(db) -> List[Any]:
+    """Implementación previa (1 + 2N consultas), solo como referencia."""
+    from app.modules.auth.models.credentials import Credentials
+    from app.modules.auth.models.user import User
+    from app.modules.auth.models.user_role import UserRole
+
+    result = []
+    for user in db.query(User).all():
+        credentials = db.query(Credentials).filter(Credentials.id_user == user.id_user).first()
+        user_role = db.query(UserRole).filter(UserRole.id_user == user.id_user).first()
+        result.append((user.id_user, credentials.email if credentials else "", user_role.id_role if user_role else 1))
+    return result
+
+
+async def _measure(name: str, func: Callable[[], Any], counter: Dict[str, int], runs: int) -> Dict[str, Any]:
+    timings: List[float] = []
+    queries = 0
+    for _ in range(runs):
+        counter["n"] = 0
+        started = time.perf_counter()
+        result = func()
+        if asyncio.iscoroutine(result):
+            await result
+        timings.append(time.perf_counter() - started)
+        queries = counter["n"]
+    return {
+        "scenario": name,
+        "queries": queries,
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "best_ms": round(min(timings) * 1000, 3),
+    }
+
+
+async def _run(args: argparse.Namespace, counter: Dict[str, int]) -> List[Dict[str, Any]]:
+    from app.core.database import AsyncSessionLocal, SessionLocal
+    from app.core.password_hasher import PASSWORD_HASHER
+    from app.modules.auth.services.user_service import UserService
+
+    middle = max(1, args.users // 2)
+    results: List[Dict[str, Any]] = []
+    # La referencia N+1 usa la sesión síncrona, igual que la implementación original
+    sync_db = SessionLocal()
+    await PASSWORD_HASHER.warm_up()
+    try:
+        async with AsyncSessionLocal() as db:
+            service = UserService(db)
+            plan = [
+                ("get_all_users", service.get_all_users),
+                ("get_patients", lambda: service.get_patients(None)),
+                ("get_patients.search", lambda: service.get_patients("apellido12")),
+                ("get_user_by_id", lambda: service.get_user_by_id(middle)),
+                ("get_user_info_by_email", lambda: service.get_user_info_by_email(f"user{middle}@bench.local")),
+                ("verify_credentials", lambda: service.verify_credentials(f"user{middle}@bench.local", PASSWORD)),
+            ]
+            if not args.skip_naive:
+                plan.append(("get_all_users.naive_n_plus_1", lambda: _naive_get_all_users(sync_db)))
+            for name, func in plan:
+                db.expunge_all()
+                sync_db.expunge_all()
+                row = await _measure(name, func, counter, args.runs)
+                results.append(row)
+                print(f"{name:<32} consultas={row['queries']:<8} mediana={row['median_ms']:>10.3f}ms", file=sys.stderr)
+    finally:
+        sync_db.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Consultas SQL por operación de UserService")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--database-url", default=None, help="Base desechable; por defecto SQLite temporal")
+    parser.add_argument("--skip-naive", action="store_true", help="No medir la versión N+1 (lenta con muchos usuarios)")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="user-bench-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(workdir, 'users.db')}"
+    os.environ.setdefault("SECRET_KEY", "bench")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+    os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
+
+    from sqlalchemy import event
+
+    from app.core.database import SessionLocal, async_engine, create_tables, engine
+    from app.core.password_hasher import PASSWORD_HASHER
+
+    create_tables()
+    print(f"== sembrando {args.users} usuarios en {engine.url.render_as_string(hide_password=True)}", file=sys.stderr)
+    _seed(SessionLocal, args.users)
+
+    counter = {"n": 0}
+
+    def _count(*_: Any) -> None:
+        counter["n"] += 1
+
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", _count)
+
+    async def _bench() -> List[Dict[str, Any]]:
+        try:
+            return await _run(args, counter)
+        finally:
+            await async_engine.dispose()
+            PASSWORD_HASHER.shutdown()
+
+    try:
+        results = asyncio.run(_bench())
+    finally:
+        engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    payload = json.dumps({"users": args.users, "runs": args.runs, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Fixtures comunes de la suite: base SQLite temporal (motor async con aiosqlite, ver
+requirements-dev.txt) con las migraciones aplicadas y un TestClient de la app.
+
+El entorno se fija antes de importar ``app``: la configuración se lee al importar los módulos.
+"""
+import os
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix="expert-system-tests-")
+
+# Nunca contra la base configurada en el entorno del desarrollador
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/test.db"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+# bcrypt al mínimo y en el pool de hilos: sin procesos spawn por test
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+# Los límites de /auth/login se prueban con su propia app (test_admission.py)
+os.environ.setdefault("ADMISSION_CONTROL", "off")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import itertools
+
+import pytest
+
+_emails = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app.core.database import engine
+    from app.core.migrations import upgrade
+
+    upgrade(engine)
+    from app.main import app as fastapi_app
+
+    return fastapi_app
+
+
+@pytest.fixture
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Directorio de trabajo propio: los routers usan rutas relativas (app_data/...)."""
+    (tmp_path / "app_data").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def user_payload():
+    """Fábrica de cuerpos de /register/ con email y username únicos en toda la sesión."""
+
+    def build(role: int = 1, **overrides):
+        n = next(_emails)
+        payload = {
+            "firstName": "Ana",
+            "lastName": "Prueba",
+            "username": f"user{n}",
+            "phone": "3000000000",
+            "email": f"user{n}@example.com",
+            "password": "secret123",
+            "id_role": role,
+        }
+        payload.update(overrides)
+        return payload
+
+    return build
+
+
+@pytest.fixture
+def register_user(client, user_payload):
+    """Registra un usuario y devuelve (payload, cabecera Authorization de su login)."""
+
+    def register(role: int = 1, **overrides):
+        payload = user_payload(role, **overrides)
+        response = client.post("/register/", json=payload)
+        assert response.status_code in (200, 201), response.text
+        login = client.post("/auth/login", json={"email": payload["email"], "password": payload["password"]})
+        assert login.status_code == 200, login.text
+        return payload, {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    return register
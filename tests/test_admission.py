@@ -0,0 +1,131 @@
+"""
+Control de admisión: 429 inmediato con Retry-After al agotar el bucket del cliente, de la ruta
+o la concurrencia, y X-Forwarded-For solo identifica al cliente si se confía en el proxy.
+"""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import admission
+from app.core.admission import AdmissionControlMiddleware, AdmissionPolicy
+
+# Sin recarga apreciable durante el test: el bucket solo se vacía
+_SLOW = 1 / 3600
+
+
+def _client(policy: AdmissionPolicy) -> TestClient:
+    app = FastAPI()
+
+    @app.post("/limited")
+    async def limited():
+        return {"ok": True}
+
+    @app.post("/free")
+    async def free():
+        return {"ok": True}
+
+    app.add_middleware(AdmissionControlMiddleware, policies={"/limited": policy})
+    return TestClient(app)
+
+
+def _per_client(burst: int = 2) -> AdmissionPolicy:
+    return AdmissionPolicy(rate=100, burst=100, client_rate=_SLOW, client_burst=burst, max_concurrency=10)
+
+
+def test_client_bucket_rejects_with_retry_after():
+    client = _client(_per_client(burst=2))
+
+    assert [client.post("/limited").status_code for _ in range(2)] == [200, 200]
+    response = client.post("/limited")
+
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert response.json() == {"detail": "Demasiadas peticiones, intenta de nuevo más tarde"}
+    # Las rutas sin política no pasan por los buckets
+    assert client.post("/free").status_code == 200
+    assert client.options("/limited").status_code != 429
+
+
+def test_route_bucket_limits_all_clients_together(monkeypatch):
+    monkeypatch.setattr(admission, "TRUST_FORWARDED", True)
+    client = _client(AdmissionPolicy(rate=_SLOW, burst=3, client_rate=100, client_burst=100, max_concurrency=10))
+
+    codes = [client.post("/limited", headers={"X-Forwarded-For": f"10.0.0.{n}"}).status_code for n in range(4)]
+
+    assert codes == [200, 200, 200, 429]
+    response = client.post("/limited", headers={"X-Forwarded-For": "10.0.0.9"})
+    assert response.json()["detail"] == "Servicio saturado, intenta de nuevo más tarde"
+    assert int(response.headers["retry-after"]) > 60
+
+
+def test_forwarded_for_is_ignored_unless_trusted(monkeypatch):
+    monkeypatch.setattr(admission, "TRUST_FORWARDED", False)
+    client = _client(_per_client(burst=2))
+
+    codes = [client.post("/limited", headers={"X-Forwarded-For": f"203.0.113.{n}"}).status_code for n in range(3)]
+
+    # Cambiar la cabecera no da un bucket nuevo: todas cuentan para la IP de la conexión
+    assert codes == [200, 200, 429]
+
+
+def test_trusted_forwarded_for_uses_the_proxy_appended_address(monkeypatch):
+    monkeypatch.setattr(admission, "TRUST_FORWARDED", True)
+    client = _client(_per_client(burst=1))
+
+    assert client.post("/limited", headers={"X-Forwarded-For": "198.51.100.1"}).status_code == 200
+    assert client.post("/limited", headers={"X-Forwarded-For": "198.51.100.2"}).status_code == 200
+    # Lo que el cliente antepone no cuenta: la última IP (la del proxy) sigue siendo la misma
+    spoofed = client.post("/limited", headers={"X-Forwarded-For": "1.2.3.4, 198.51.100.1"})
+    assert spoofed.status_code == 429
+
+
+def test_concurrency_limit_rejects_while_requests_are_in_flight():
+    release = asyncio.Event()
+    started = []
+
+    async def slow_app(scope, receive, send):
+        started.append(scope["path"])
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = AdmissionControlMiddleware(
+        slow_app, policies={"/limited": AdmissionPolicy(rate=100, burst=100, client_rate=100, client_burst=100, max_concurrency=2)}
+    )
+
+    async def request():
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": "POST", "path": "/limited", "headers": [], "client": ("127.0.0.1", 1)}
+        await middleware(scope, receive, send)
+        return messages[0]
+
+    async def scenario():
+        in_flight = [asyncio.ensure_future(request()) for _ in range(2)]
+        while len(started) < 2:
+            await asyncio.sleep(0)
+        rejected = await request()
+        release.set()
+        admitted = await asyncio.gather(*in_flight)
+        after = await request()
+        return rejected, admitted, after
+
+    rejected, admitted, after = asyncio.run(scenario())
+
+    assert rejected["status"] == 429
+    assert (b"retry-after", b"1") in rejected["headers"]
+    assert [message["status"] for message in admitted] == [200, 200]
+    assert after["status"] == 200
+
+
+@pytest.mark.parametrize("reason", ["concurrency", "client_rate", "route_rate"])
+def test_every_rejection_reason_has_a_message(reason):
+    assert admission._DETAILS[reason]
@@ -0,0 +1,109 @@
+"""
+UserContextCache: el contexto cacheado por verify_jwt_auth se invalida al confirmar cambios
+ORM en User, Credentials o UserRole del usuario (sesiones síncronas y async), y no antes.
+"""
+from sqlalchemy import select
+
+from app.core.auth_cache import USER_CONTEXT_CACHE, UserContextCache
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.modules.auth.models.credentials import Credentials
+from app.modules.auth.models.user import User
+from app.modules.auth.models.user_role import UserRole
+
+
+def _cached_me(client, headers):
+    response = client.get("/auth/me", headers=headers)
+    assert response.status_code == 200
+    token = headers["Authorization"].split(" ", 1)[1]
+    assert token in USER_CONTEXT_CACHE._entries
+    return token, response.json()
+
+
+def _change(model, id_user, **values):
+    with SessionLocal() as db:
+        obj = db.scalars(select(model).where(model.id_user == id_user)).first()
+        for key, value in values.items():
+            setattr(obj, key, value)
+        db.commit()
+
+
+def test_user_commit_invalidates_cached_context(client, register_user):
+    _, headers = register_user()
+    token, me = _cached_me(client, headers)
+
+    _change(User, me["id"], firstName="Renombrada")
+
+    assert token not in USER_CONTEXT_CACHE._entries
+    assert client.get("/auth/me", headers=headers).json()["firstName"] == "Renombrada"
+
+
+def test_credentials_commit_invalidates_cached_context(client, register_user):
+    _, headers = register_user()
+    token, me = _cached_me(client, headers)
+
+    _change(Credentials, me["id"], password="sha256:" + "0" * 64)
+
+    assert token not in USER_CONTEXT_CACHE._entries
+
+
+def test_user_role_commit_invalidates_cached_context(client, register_user):
+    _, headers = register_user(role=1)
+    token, me = _cached_me(client, headers)
+    assert me["id_role"] == 1
+
+    _change(UserRole, me["id"], id_role=2)
+
+    assert token not in USER_CONTEXT_CACHE._entries
+    assert client.get("/auth/me", headers=headers).json()["id_role"] == 2
+
+
+def test_async_session_commit_invalidates_cached_context(client, register_user):
+    _, headers = register_user()
+    token, me = _cached_me(client, headers)
+
+    async def rename():
+        async with AsyncSessionLocal() as db:
+            user = await db.get(User, me["id"])
+            user.lastName = "Async"
+            await db.commit()
+
+    client.portal.call(rename)
+
+    assert token not in USER_CONTEXT_CACHE._entries
+    assert client.get("/auth/me", headers=headers).json()["lastName"] == "Async"
+
+
+def test_rollback_keeps_cached_context(client, register_user):
+    _, headers = register_user()
+    token, me = _cached_me(client, headers)
+
+    with SessionLocal() as db:
+        db.get(User, me["id"]).firstName = "Descartado"
+        db.flush()
+        db.rollback()
+
+    assert token in USER_CONTEXT_CACHE._entries
+    assert client.get("/auth/me", headers=headers).json()["firstName"] == me["firstName"]
+
+
+def test_other_users_entries_survive(client, register_user):
+    _, headers = register_user()
+    _, other_headers = register_user()
+    _, me = _cached_me(client, headers)
+    other_token, _ = _cached_me(client, other_headers)
+
+    _change(User, me["id"], phone="3111111111")
+
+    assert other_token in USER_CONTEXT_CACHE._entries
+
+
+def test_put_from_a_stale_generation_is_skipped():
+    cache = UserContextCache()
+    generation = cache.generation
+    cache.invalidate_users({1})
+
+    cache.put("token", None, {"id_user": 1}, generation)
+    assert cache.get("token") is None
+
+    cache.put("token", None, {"id_user": 1}, cache.generation)
+    assert cache.get("token") == {"id_user": 1}
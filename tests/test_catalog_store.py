@@ -0,0 +1,173 @@
+"""
+CatalogStore: índice de offsets del NDJSON (``.idx``), archivo de campos calientes (``.hot``)
+y su reconstrucción cuando el NDJSON cambia por fuera de ``to_ndjson``.
+"""
+import json
+import os
+import threading
+
+import pytest
+
+from benchmarks.catalog_generator import generate_games
+from app.modules.expert_system.services.catalog_store import HOT_FIELDS, CatalogStore, _NdjsonIndex, hot_projection
+
+
+@pytest.fixture
+def games():
+    return generate_games(300, seed=5)
+
+
+@pytest.fixture
+def store(tmp_path, games):
+    store = CatalogStore(str(tmp_path / "catalog_games.json"))
+    store.save(games)
+    return store
+
+
+@pytest.fixture
+def ndjson_path(store):
+    path = store.default_ndjson_path()
+    store.to_ndjson(path)
+    return path
+
+
+def _append(path, item):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+
+def test_get_round_trips_every_record(store, games, ndjson_path):
+    assert os.path.exists(store.index_path(ndjson_path))
+    for game in games:
+        assert store.get(game["id"], ndjson_path) == json.loads(json.dumps(game, ensure_ascii=False))
+    assert store.get(10 ** 9, ndjson_path) is None
+
+
+def test_duplicate_ids_resolve_to_the_last_line(tmp_path):
+    store = CatalogStore(str(tmp_path / "catalog_games.json"))
+    store.save([{"id": 1, "name": "primero"}, {"id": 2, "name": "otro"}, {"id": 1, "name": "último"}])
+    path = store.default_ndjson_path()
+
+    assert store.to_ndjson(path) == 3
+    assert store.get(1, path)["name"] == "último"
+
+
+def test_index_header_is_bound_to_the_indexed_file(store, ndjson_path):
+    with open(ndjson_path, "rb") as f:
+        assert _NdjsonIndex.load(store.index_path(ndjson_path), f) is not None
+    _append(ndjson_path, {"id": 999999, "name": "añadido"})
+    with open(ndjson_path, "rb") as f:
+        assert _NdjsonIndex.load(store.index_path(ndjson_path), f) is None
+
+
+def test_index_is_rebuilt_after_the_ndjson_changes(store, games, ndjson_path):
+    assert store.get(games[0]["id"], ndjson_path) is not None
+    _append(ndjson_path, {"id": 999999, "name": "añadido"})
+    _append(ndjson_path, {"id": games[0]["id"], "name": "reemplazado"})
+
+    assert store.get(999999, ndjson_path) == {"id": 999999, "name": "añadido"}
+    assert store.get(games[0]["id"], ndjson_path)["name"] == "reemplazado"
+    with open(ndjson_path, "rb") as f:
+        assert _NdjsonIndex.load(store.index_path(ndjson_path), f) is not None
+
+
+def test_rebuild_index_skips_blank_and_invalid_lines(tmp_path):
+    store = CatalogStore(str(tmp_path / "catalog_games.json"))
+    path = str(tmp_path / "manual.ndjson")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"id": 1, "name": "a"}\n\nno es json\n[1, 2]\r\n{"id": 2, "name": "b"}\r\n')
+
+    assert store.rebuild_index(path) == 2
+    assert store.get(1, path) == {"id": 1, "name": "a"}
+    assert store.get(2, path) == {"id": 2, "name": "b"}
+
+
+def test_prepare_creates_the_ndjson_and_its_index(store, games):
+    path = store.default_ndjson_path()
+    assert store.prepared_version(path) is None
+
+    version = store.prepare(path)
+
+    assert store.prepared_version(path) == version
+    assert store.get(games[-1]["id"], path)["id"] == games[-1]["id"]
+    _append(path, {"id": 999999})
+    assert store.prepared_version(path) is None
+
+
+def test_concurrent_writers_leave_consistent_derived_files(store, games, ndjson_path):
+    errors = []
+
+    def write():
+        try:
+            for _ in range(5):
+                store.to_ndjson(ndjson_path)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert [name for name in os.listdir(os.path.dirname(ndjson_path)) if name.endswith(".tmp")] == []
+    fresh = CatalogStore(store.file_path)
+    with open(ndjson_path, "rb") as f:
+        assert _NdjsonIndex.load(fresh.index_path(ndjson_path), f) is not None
+    assert fresh.get(games[7]["id"], ndjson_path)["id"] == games[7]["id"]
+    stat = os.stat(ndjson_path)
+    assert _hot_header(fresh, ndjson_path)["source"] == [stat.st_size, stat.st_mtime_ns]
+    assert sum(1 for _ in fresh.iter_projected(ndjson_path)) == len(games)
+
+
+def _hot_header(store, path):
+    with open(store.hot_path(path), "rb") as f:
+        return json.loads(f.readline())
+
+
+def test_hot_rows_are_the_projection_of_each_record(store, games, ndjson_path):
+    stat = os.stat(ndjson_path)
+    header = _hot_header(store, ndjson_path)
+    assert header == {"source": [stat.st_size, stat.st_mtime_ns], "fields": list(HOT_FIELDS)}
+
+    rows = list(store.iter_projected(ndjson_path))
+
+    assert rows == [json.loads(json.dumps(hot_projection(game), ensure_ascii=False)) for game in games]
+    assert all(set(row) <= set(HOT_FIELDS) for row in rows)
+    # Los anidados llevan solo las claves que se filtran
+    assert all(set(genre) <= {"name", "slug"} for row in rows for genre in row.get("genres") or [])
+
+
+def test_hot_file_is_regenerated_after_the_ndjson_changes(store, games, ndjson_path):
+    assert sum(1 for _ in store.iter_projected(ndjson_path)) == len(games)
+    _append(ndjson_path, {"id": 999999, "name": "añadido", "stores": [{"id": 1}]})
+
+    rows = list(store.iter_projected(ndjson_path))
+
+    assert rows[-1] == {"id": 999999, "name": "añadido"}
+    assert len(rows) == len(games) + 1
+    assert _hot_header(store, ndjson_path)["source"][0] == os.path.getsize(ndjson_path)
+
+
+def test_missing_hot_file_is_regenerated(store, games, ndjson_path):
+    os.remove(store.hot_path(ndjson_path))
+    fresh = CatalogStore(store.file_path)
+
+    assert sum(1 for _ in fresh.iter_projected(ndjson_path)) == len(games)
+    assert os.path.exists(store.hot_path(ndjson_path))
+
+
+def test_fields_outside_the_hot_set_read_the_full_records(store, games, ndjson_path):
+    rows = list(store.iter_projected(ndjson_path, fields=("id", "short_screenshots")))
+
+    assert rows[0] == json.loads(json.dumps(games[0], ensure_ascii=False))
+
+
+def test_hydrate_returns_full_records_for_projected_rows(store, games, ndjson_path):
+    ids = [row["id"] for row in store.iter_projected(ndjson_path)][:5]
+
+    hydrated = store.hydrate(ids + [10 ** 9], ndjson_path)
+
+    assert list(hydrated) == ids
+    assert hydrated[ids[0]]["short_screenshots"] == games[0]["short_screenshots"]
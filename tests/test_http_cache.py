@@ -0,0 +1,124 @@
+"""
+ETag/304 atados a la versión del catálogo: If-None-Match con la versión vigente devuelve 304
+sin cuerpo, un catálogo distinto cambia el ETag y POST /diagnose nunca responde 304. La
+versión es el hash del contenido calculado al escribir (sidecar ``.version``).
+"""
+import hashlib
+import json
+
+import pytest
+
+from benchmarks.catalog_generator import generate_games
+from app.modules.expert_system.routers import expert_system_router as es
+from app.modules.expert_system.services.catalog_store import CatalogStore
+
+NDJSON_PATH = "app_data/catalog_games.ndjson"
+
+
+@pytest.fixture
+def games(workdir):
+    games = generate_games(120, seed=3)
+    es._store.save(games)
+    return games
+
+
+def _revalidate(client, url, etag):
+    return client.get(url, headers={"If-None-Match": etag})
+
+
+def test_game_is_not_modified_for_the_current_etag(client, games):
+    url = f"/expert-system/games/{games[4]['id']}"
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.json()["id"] == games[4]["id"]
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"].startswith("public")
+
+    revalidated = _revalidate(client, url, etag)
+
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    # Comparación débil y listas de ETags
+    assert _revalidate(client, url, f'"otro", W/{etag}').status_code == 304
+    assert _revalidate(client, url, '"otro"').status_code == 200
+
+
+def test_search_etag_depends_on_the_query_and_the_catalog(client, games):
+    url = "/expert-system/search-ndjson?page_size=5&genre=Action"
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    assert _revalidate(client, url, etag).status_code == 304
+    # Mismos parámetros en otro orden: misma consulta, mismo ETag
+    assert _revalidate(client, "/expert-system/search-ndjson?genre=Action&page_size=5", etag).status_code == 304
+    assert client.get("/expert-system/search-ndjson?page_size=6&genre=Action").headers["etag"] != etag
+
+    es._store.save(games[:-1])
+    es._store.to_ndjson(NDJSON_PATH)
+
+    changed = _revalidate(client, url, etag)
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_catalog_size_is_not_modified_for_the_current_etag(client, games):
+    first = client.get("/expert-system/catalog-size")
+    assert first.json() == {"catalog_size": len(games)}
+
+    assert _revalidate(client, "/expert-system/catalog-size", first.headers["etag"]).status_code == 304
+
+
+def test_diagnose_never_answers_not_modified(client, games):
+    first = client.post("/expert-system/diagnose", json={})
+    assert first.status_code == 200
+    assert "etag" not in first.headers
+
+    again = client.post("/expert-system/diagnose", json={}, headers={"If-None-Match": "*"})
+    assert again.status_code == 200
+    assert again.json()["items"] == first.json()["items"]
+
+
+def test_versions_are_written_with_the_data(tmp_path, games):
+    store = CatalogStore(str(tmp_path / "catalog_games.json"))
+    store.save(games)
+    ndjson_path = store.default_ndjson_path()
+    store.to_ndjson(ndjson_path)
+
+    for path in (store.file_path, ndjson_path):
+        with open(path, "rb") as f:
+            content_hash = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        with open(store.version_path(path), encoding="utf-8") as f:
+            assert json.load(f)["version"] == content_hash
+        # Otra instancia (otro worker) la lee del sidecar sin hashear el archivo
+        assert CatalogStore(store.file_path).cached_version(path) == content_hash
+
+
+def test_identical_content_keeps_its_version(tmp_path, games):
+    store = CatalogStore(str(tmp_path / "catalog_games.json"))
+    store.save(games)
+    version = store.version()
+
+    store.save(json.loads(json.dumps(games)))
+
+    assert store.version() == version
+
+
+def test_edited_file_falls_back_to_hashing_and_refreshes_the_sidecar(tmp_path, games):
+    store = CatalogStore(str(tmp_path / "catalog_games.json"))
+    store.save(games)
+    with open(store.file_path, "a", encoding="utf-8") as f:
+        f.write(" ")
+
+    assert store.cached_version() is None
+    with open(store.file_path, "rb") as f:
+        assert store.version() == hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    assert CatalogStore(store.file_path).cached_version() == store.version()
+
+
+def test_missing_file_has_the_empty_version(tmp_path):
+    store = CatalogStore(str(tmp_path / "catalog_games.json"))
+
+    assert store.cached_version() == "empty"
+    assert store.version() == "empty"
@@ -0,0 +1,67 @@
+"""
+Registro en una transacción: las violaciones de unicidad las detecta la base y se traducen a
+un 400 con el mensaje de la restricción, sin dejar filas a medias.
+"""
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import SessionLocal
+from app.modules.auth.models.credentials import Credentials
+from app.modules.auth.models.user import User
+from app.modules.register.services.register_service import conflict_message
+
+
+def _counts():
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(User)), db.scalar(select(func.count()).select_from(Credentials))
+
+
+def test_register_creates_user_credentials_and_role(client, user_payload):
+    payload = user_payload()
+
+    response = client.post("/register/", json=payload)
+
+    assert response.status_code == 201
+    assert response.json()["message"] == "Usuario registrado exitosamente"
+    login = client.post("/auth/login", json={"email": payload["email"], "password": payload["password"]})
+    assert login.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "field, message",
+    [("email", "El email ya está registrado"), ("username", "El username ya está registrado")],
+)
+def test_duplicate_is_reported_from_the_integrity_error(client, user_payload, field, message):
+    first = user_payload()
+    assert client.post("/register/", json=first).status_code == 201
+    before = _counts()
+
+    duplicate = user_payload(**{field: first[field]})
+    response = client.post("/register/", json=duplicate)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == message
+    # La transacción se deshizo entera: ni user ni credentials sueltos
+    assert _counts() == before
+
+
+class _DriverError(Exception):
+    pass
+
+
+@pytest.mark.parametrize(
+    "driver_message, expected",
+    [
+        ('duplicate key value violates unique constraint "credentials_email_key"', "El email ya está registrado"),
+        ('duplicate key value violates unique constraint "ix_user_username"', "El username ya está registrado"),
+        ('insert or update on table "user_role" violates foreign key constraint "user_role_id_role_fkey"', "El rol indicado no existe"),
+        ("UNIQUE constraint failed: credentials.email", "El email ya está registrado"),
+        ("UNIQUE constraint failed: user.username", "El username ya está registrado"),
+        ("NOT NULL constraint failed: user.firstName", None),
+    ],
+)
+def test_conflict_message_recognises_postgres_and_sqlite_errors(driver_message, expected):
+    error = IntegrityError("INSERT ...", {}, _DriverError(driver_message))
+
+    assert conflict_message(error) == expected
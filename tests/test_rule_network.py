@@ -0,0 +1,271 @@
+"""
+La red de reglas (recommend/diagnose) debe dar exactamente lo mismo que los bucles en línea
+a los que reemplazó: mismos ítems, en el mismo orden, mismas descripciones de reglas y el
+mismo ``examined``. Las referencias de abajo son esos bucles tal cual estaban.
+"""
+from typing import Any, Dict, List
+
+import pytest
+
+from benchmarks.catalog_generator import generate_games
+from app.modules.expert_system.schemas.constraints_request_dto import DiagnoseRequest
+from app.modules.expert_system.schemas.recommendation_request_dto import PreferenceRequest
+from app.modules.expert_system.schemas.recommendation_response_dto import RecommendationItem
+from app.modules.expert_system.services.catalog_store import CatalogStore
+from app.modules.expert_system.services.diagnose_engine import DiagnoseEngine
+from app.modules.expert_system.services.expert_engine import ExpertEngine
+
+SENSITIVE_TAGS = {"nsfw", "nudity", "sexual content", "sexual-content", "hentai", "porn", "erotic", "mature", "violence", "violent", "gore"}
+AGE_MAP = {"Everyone": 6, "Everyone 10+": 10, "Teen": 13, "Mature": 17, "Adults Only": 21}
+
+
+def baseline_recommend(catalog: List[Dict[str, Any]], preferences: PreferenceRequest, limit: int):
+    rules_applied: List[str] = []
+    candidates = list(catalog)
+    if preferences.exclude_genres:
+        before = len(candidates)
+        candidates = [g for g in candidates if not any(eg.lower() in [x.lower() for x in g["genres"]] for eg in preferences.exclude_genres)]
+        rules_applied.append(f"Excluidos géneros {preferences.exclude_genres} ({before}->{len(candidates)})")
+    if preferences.exclude_platforms:
+        before = len(candidates)
+        candidates = [g for g in candidates if not any(ep.lower() in [x.lower() for x in g["platforms"]] for ep in preferences.exclude_platforms)]
+        rules_applied.append(f"Excluidas plataformas {preferences.exclude_platforms} ({before}->{len(candidates)})")
+    if preferences.max_price is not None:
+        before = len(candidates)
+        candidates = [g for g in candidates if g["price"] <= preferences.max_price]
+        rules_applied.append(f"Precio <= {preferences.max_price} ({before}->{len(candidates)})")
+    if preferences.age_rating_max is not None:
+        before = len(candidates)
+        candidates = [g for g in candidates if g["age_rating"] <= preferences.age_rating_max]
+        rules_applied.append(f"Edad <= {preferences.age_rating_max} ({before}->{len(candidates)})")
+    if preferences.allow_multiplayer is not None:
+        before = len(candidates)
+        if preferences.allow_multiplayer:
+            candidates = [g for g in candidates if g["multiplayer"]]
+            rules_applied.append(f"Solo multijugador ({before}->{len(candidates)})")
+        else:
+            candidates = [g for g in candidates if not g["multiplayer"]]
+            rules_applied.append(f"Solo single-player ({before}->{len(candidates)})")
+    if preferences.min_playtime_hours is not None:
+        before = len(candidates)
+        candidates = [g for g in candidates if g["playtime_hours"] >= preferences.min_playtime_hours]
+        rules_applied.append(f"Horas >= {preferences.min_playtime_hours} ({before}->{len(candidates)})")
+
+    def score(game: dict) -> float:
+        score_value = 0.0
+        if preferences.genres:
+            score_value += len({g.lower() for g in game["genres"]} & {g.lower() for g in preferences.genres}) * 3.0
+        if preferences.platforms:
+            score_value += len({p.lower() for p in game["platforms"]} & {p.lower() for p in preferences.platforms}) * 1.5
+        if preferences.difficulty and preferences.difficulty.lower() == game["difficulty"].lower():
+            score_value += 2.0
+        score_value += max(0.0, 5.0 - (game["price"] / 20.0))
+        score_value += min(5.0, game["playtime_hours"] / 20.0)
+        score_value += (game.get("rating") or 0.0)
+        score_value += (game.get("metacritic") or 0) / 20.0
+        return score_value
+
+    ranked = sorted(candidates, key=score, reverse=True)
+    items = [
+        RecommendationItem(
+            id=g["id"], title=g["title"], genres=g["genres"], platforms=g["platforms"], price=g["price"],
+            age_rating=g["age_rating"], playtime_hours=g["playtime_hours"], difficulty=g["difficulty"],
+            multiplayer=g["multiplayer"], score=score(g),
+        )
+        for g in ranked[:limit]
+    ]
+    return items, rules_applied
+
+
+def baseline_diagnose(catalog: List[Dict[str, Any]], req: DiagnoseRequest) -> Dict[str, Any]:
+    matches: List[Dict[str, Any]] = []
+    examined = 0
+    page_size = req.page_size or 12
+    if req.limit is not None:
+        page_size = req.limit
+    page = req.page or 1
+    start = (page - 1) * page_size
+    end = start + page_size
+
+    passed = 0
+    for item in catalog:
+        examined += 1
+        keep = True
+        genres = [g.get("name") if isinstance(g, dict) else g for g in (item.get("genres") or [])]
+        platforms = [(p.get("platform") or {}).get("name") if isinstance(p, dict) else p for p in (item.get("platforms") or [])]
+        tags = [t.get("name", "").lower() for t in (item.get("tags") or []) if isinstance(t, dict)]
+        playtime_hours = int(item.get("playtime") or 0)
+        rating_val = float(item.get("rating") or 0.0)
+        metacritic_val = int(item.get("metacritic") or 0) if item.get("metacritic") is not None else 0
+        esrb = (item.get("esrb_rating") or {}).get("name") if item.get("esrb_rating") else None
+        age_rating = AGE_MAP.get(esrb, 12 if esrb else 12)
+        is_multiplayer = any("multiplayer" in t for t in tags)
+        is_singleplayer = any("singleplayer" in t or "single-player" in t or "single player" in t for t in tags)
+        is_coop = any("co-op" in t or "coop" in t or "cooperative" in t for t in tags)
+        is_pvp = any("pvp" in t or "competitive" in t for t in tags)
+
+        if keep and req.content.age_max is not None and req.content.age_max < 18:
+            if any(any(s in t for s in SENSITIVE_TAGS) for t in tags):
+                keep = False
+        if keep and req.content.allow_violence is False:
+            if any(any(s in t for s in SENSITIVE_TAGS) for t in tags):
+                keep = False
+        if keep and req.content.age_max is not None and age_rating > req.content.age_max:
+            keep = False
+        if keep and req.content.multiplayer_required is not None:
+            if req.content.multiplayer_required and not is_multiplayer:
+                keep = False
+            if not req.content.multiplayer_required and is_multiplayer:
+                keep = False
+        if keep and req.content.singleplayer_required is not None:
+            if req.content.singleplayer_required and not is_singleplayer:
+                keep = False
+        if keep and req.content.coop_required is not None:
+            if req.content.coop_required and not is_coop:
+                keep = False
+        if keep and req.content.pvp_required is not None:
+            if req.content.pvp_required and not is_pvp:
+                keep = False
+        if keep and req.preferences.exclude_genres:
+            if any(eg.lower() in [g.lower() for g in genres] for eg in req.preferences.exclude_genres):
+                keep = False
+        if keep and req.preferences.include_genres:
+            if not any(ig.lower() in [g.lower() for g in genres] for ig in req.preferences.include_genres):
+                keep = False
+        if keep and req.hardware.platform:
+            if req.hardware.platform.lower() not in [p.lower() for p in platforms]:
+                keep = False
+        if keep and req.time.min_playtime_hours is not None and playtime_hours < req.time.min_playtime_hours:
+            keep = False
+        if keep and req.time.max_playtime_hours is not None and playtime_hours > req.time.max_playtime_hours:
+            keep = False
+        if keep and req.preferences.min_rating is not None and rating_val < req.preferences.min_rating:
+            keep = False
+        if keep and req.preferences.min_metacritic is not None and metacritic_val < req.preferences.min_metacritic:
+            keep = False
+        if keep and req.preferences.include_tags:
+            if not any(tag.lower() in tags for tag in req.preferences.include_tags):
+                keep = False
+        if keep and req.preferences.exclude_tags:
+            if any(tag.lower() in tags for tag in req.preferences.exclude_tags):
+                keep = False
+        if keep and req.content.offline_required:
+            if any("online" in t for t in tags):
+                keep = False
+        if not keep:
+            continue
+
+        if start <= passed < end:
+            matches.append({
+                "id": item.get("id"),
+                "title": item.get("name") or item.get("title") or "",
+                "released": item.get("released"),
+                "rating": rating_val,
+                "metacritic": metacritic_val,
+                "genres": genres,
+                "platforms": platforms,
+                "age_rating": age_rating,
+                "esrb_rating": esrb,
+                "playtime_hours": playtime_hours,
+                "multiplayer": is_multiplayer,
+                "singleplayer": is_singleplayer,
+                "coop": is_coop,
+                "pvp": is_pvp,
+                "tags": [t.get("name") for t in (item.get("tags") or []) if isinstance(t, dict)][:10],
+                "background_image": item.get("background_image"),
+                "slug": item.get("slug"),
+            })
+            if len(matches) >= page_size:
+                break
+        passed += 1
+
+    return {"page": page, "page_size": page_size, "matched": len(matches), "examined": examined, "items": matches}
+
+
+@pytest.fixture(scope="module")
+def games():
+    return generate_games(600, seed=11)
+
+
+RECOMMEND_CASES = [
+    {},
+    {"genres": ["RPG", "Action"], "platforms": ["PC"], "difficulty": "normal"},
+    {"exclude_genres": ["Indie", "casual"], "exclude_platforms": ["Web"]},
+    {"max_price": 0, "age_rating_max": 13},
+    {"allow_multiplayer": True, "min_playtime_hours": 10},
+    {"allow_multiplayer": False, "genres": ["Strategy"], "age_rating_max": 17},
+    {"exclude_genres": ["Action"], "allow_multiplayer": True, "max_price": 10},
+]
+
+
+@pytest.mark.parametrize("prefs", RECOMMEND_CASES)
+def test_recommend_matches_baseline(games, prefs):
+    engine = ExpertEngine()
+    engine.reload_from_cache(games)
+    preferences = PreferenceRequest(**prefs)
+
+    items, rules_applied, rule_stats = engine.recommend(preferences, 25)
+    expected_items, expected_rules = baseline_recommend(engine._catalog, preferences, 25)
+
+    assert [item.model_dump() for item in items] == [item.model_dump() for item in expected_items]
+    assert rules_applied == expected_rules
+    assert len(rule_stats) == len(expected_rules)
+
+
+def test_recommend_matches_baseline_on_builtin_catalog():
+    engine = ExpertEngine()
+    preferences = PreferenceRequest(genres=["RPG"], exclude_platforms=["Xbox"], allow_multiplayer=True)
+
+    items, rules_applied, _ = engine.recommend(preferences, 5)
+    expected_items, expected_rules = baseline_recommend(engine._catalog, preferences, 5)
+
+    assert [item.model_dump() for item in items] == [item.model_dump() for item in expected_items]
+    assert rules_applied == expected_rules
+
+
+DIAGNOSE_CASES = [
+    {},
+    {"page": 3, "page_size": 7},
+    {"limit": 5, "page": 2},
+    {"content": {"age_max": 13}},
+    {"content": {"allow_violence": False, "multiplayer_required": True}},
+    {"content": {"multiplayer_required": False, "singleplayer_required": True}},
+    {"content": {"coop_required": True, "pvp_required": True}},
+    {"content": {"offline_required": True}, "preferences": {"exclude_tags": ["Gore", "horror"]}},
+    {"preferences": {"include_genres": ["RPG", "strategy"], "exclude_genres": ["Indie"], "min_rating": 3.5}},
+    {"preferences": {"include_tags": ["Open World"], "min_metacritic": 60}},
+    {"hardware": {"platform": "pc"}, "time": {"min_playtime_hours": 5, "max_playtime_hours": 40}},
+    # Sin coincidencias suficientes para llenar la página: examined es el catálogo entero
+    {"hardware": {"platform": "Web"}, "preferences": {"min_rating": 4.5}, "page_size": 50},
+    {"page": 500},
+]
+
+
+@pytest.fixture(scope="module")
+def diagnose_engine(games, tmp_path_factory):
+    directory = tmp_path_factory.mktemp("diagnose")
+    store = CatalogStore(str(directory / "catalog_games.json"))
+    store.save(games)
+    ndjson_path = str(directory / "catalog_games.ndjson")
+    store.to_ndjson(ndjson_path)
+    return DiagnoseEngine(store, ndjson_path)
+
+
+@pytest.mark.parametrize("body", DIAGNOSE_CASES)
+def test_diagnose_matches_baseline(games, diagnose_engine, body):
+    req = DiagnoseRequest(**body)
+
+    result = diagnose_engine.diagnose(req)
+    expected = baseline_diagnose(games, req)
+
+    assert {key: result[key] for key in expected} == expected
+    assert len(result["rule_stats"]) == len(result["rules_applied"])
+
+
+def test_diagnose_examined_counts_rows_up_to_the_filled_page(games, diagnose_engine):
+    req = DiagnoseRequest(page_size=3)
+
+    result = diagnose_engine.diagnose(req)
+
+    assert result["matched"] == 3
+    assert result["examined"] == baseline_diagnose(games, req)["examined"] < len(games)
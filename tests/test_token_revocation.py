@@ -0,0 +1,66 @@
+"""
+Logout revoca el jti del token: verify_jwt_auth lo rechaza tanto por el camino con caché de
+contexto (claims sin verificar firma) como por el camino sin caché (verify_token + base).
+"""
+from jose import jwt
+
+from app.core.auth_cache import USER_CONTEXT_CACHE
+from app.core.token_revocation import BloomFilter
+
+
+def _token(headers):
+    return headers["Authorization"].split(" ", 1)[1]
+
+
+def test_revoked_token_is_rejected_without_cached_context(client, register_user):
+    _, headers = register_user()
+    assert client.get("/auth/me", headers=headers).status_code == 200
+
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    # Logout descarta el contexto: la siguiente petición va por verify_token
+    assert _token(headers) not in USER_CONTEXT_CACHE._entries
+
+    response = client.get("/auth/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token revocado"
+
+
+def test_revoked_token_is_rejected_with_cached_context(client, register_user):
+    _, headers = register_user()
+    token = _token(headers)
+    context = client.get("/auth/me", headers=headers)
+    assert context.status_code == 200
+    cached = USER_CONTEXT_CACHE.get(token)
+    assert cached is not None
+
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    # Contexto cacheado antes del logout (p. ej. en otro worker): el camino con caché también
+    # consulta la revocación y descarta la entrada
+    USER_CONTEXT_CACHE.put(token, jwt.get_unverified_claims(token)["exp"], cached)
+
+    response = client.get("/auth/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token revocado"
+    assert token not in USER_CONTEXT_CACHE._entries
+
+
+def test_logout_only_revokes_its_own_token(client, register_user):
+    payload, headers = register_user()
+    other = client.post("/auth/login", json={"email": payload["email"], "password": payload["password"]})
+    other_headers = {"Authorization": f"Bearer {other.json()['access_token']}"}
+    assert client.get("/auth/me", headers=other_headers).status_code == 200
+
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    assert client.get("/auth/me", headers=other_headers).status_code == 200
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [f"jti-{n}" for n in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    assert sum(f"otro-{n}" in bloom for n in range(5000)) < 5000 * 0.05
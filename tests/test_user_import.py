@@ -0,0 +1,111 @@
+"""
+POST /users/import: las filas inválidas van al informe con su número de fila del archivo
+(cabecera = fila 1, contando líneas en blanco) y no bloquean el resto.
+"""
+import io
+
+from openpyxl import Workbook
+
+from app.core.database import AsyncSessionLocal
+from app.modules.register.schemas.create_user_dto import CreateUserDto
+from app.modules.register.services.user_import_service import UserImportService, read_chunks
+
+HEADER = "firstName,lastName,username,phone,email,password,id_role"
+
+
+def _row(name, email=None, password="secret123", role=1, username=None):
+    return f"N,A,{username or name},3000000000,{email or name + '@example.com'},{password},{role}"
+
+
+def _import(client, headers, filename, content):
+    response = client.post("/users/import", headers=headers, files={"file": (filename, content, "application/octet-stream")})
+    assert response.status_code == 200, response.text
+    report = response.json()
+    return report, {error["row"]: error["errors"] for error in report["errors"]}
+
+
+def test_csv_errors_report_file_row_numbers(client, register_user):
+    existing, admin = register_user(role=2)
+    lines = [
+        HEADER,                                     # 1
+        _row("csvok1"),                             # 2
+        "",                                         # 3
+        _row("csvshort", password="123"),           # 4
+        "",                                         # 5
+        _row("csvok1", email="csvother@example.com"),  # 6 username repetido en el archivo
+        _row("csvtaken", email=existing["email"]),  # 7 email ya registrado
+        _row("csvrole", role=99),                   # 8
+        _row("csvok2"),                             # 9
+    ]
+
+    report, errors = _import(client, admin, "users.csv", ("\n".join(lines) + "\n").encode())
+
+    assert (report["total"], report["created"], report["failed"]) == (6, 2, 4)
+    assert sorted(errors) == [4, 6, 7, 8]
+    assert errors[6] == ["username duplicado en el archivo (fila 2)"]
+    assert errors[7] == ["El email ya está registrado"]
+    assert errors[8] == ["id_role: el rol 99 no existe"]
+    assert client.post("/auth/login", json={"email": "csvok2@example.com", "password": "secret123"}).status_code == 200
+
+
+def test_rejected_row_does_not_block_a_later_duplicate(client, register_user):
+    _, admin = register_user(role=2)
+    lines = [HEADER, _row("csvdupbad", role=99), _row("csvdupbad")]
+
+    report, errors = _import(client, admin, "users.csv", ("\n".join(lines) + "\n").encode())
+
+    assert report["created"] == 1
+    assert list(errors) == [2]
+
+
+def test_xlsx_errors_report_sheet_row_numbers(client, register_user):
+    _, admin = register_user(role=2)
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(HEADER.split(","))
+    sheet.append(["X", "Y", "xlsok", 3001112222, "xlsok@example.com", "secret123", 1])
+    sheet.append([None] * 7)
+    sheet.append(["X", "Y", "xlsbad", None, "xlsbad@example.com", "secret123", 1])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    report, errors = _import(client, admin, "users.xlsx", buffer.getvalue())
+
+    assert (report["total"], report["created"]) == (2, 1)
+    assert list(errors) == [4]
+    assert errors[4] == ["phone: Field required"]
+
+
+def test_row_numbers_continue_across_chunks():
+    content = "\n".join([HEADER, _row("a"), "", _row("b"), _row("c"), "", "", _row("d")]) + "\n"
+
+    chunks = list(read_chunks(io.BytesIO(content.encode()), "users.csv", chunk_size=2))
+
+    assert [[row for row, _ in chunk] for chunk in chunks] == [[2], [4, 5], [8]]
+
+
+def test_conflicting_chunk_is_retried_row_by_row(client, register_user):
+    existing, _ = register_user()
+
+    async def insert_after_concurrent_signup():
+        # Filas ya validadas; una choca en el INSERT como si alguien se registrara entre medias
+        rows = [
+            (2, CreateUserDto(**dict(zip(HEADER.split(","), _row("retryok1").split(","))))),
+            (3, CreateUserDto(**dict(zip(HEADER.split(","), _row("retrytaken", email=existing["email"]).split(","))))),
+            (4, CreateUserDto(**dict(zip(HEADER.split(","), _row("retryok2").split(","))))),
+        ]
+        async with AsyncSessionLocal() as db:
+            return await UserImportService(db)._insert(rows)
+
+    created, errors = client.portal.call(insert_after_concurrent_signup)
+
+    assert created == 2
+    assert [(error.row, error.errors) for error in errors] == [(3, ["El email ya está registrado"])]
+
+
+def test_import_requires_the_import_permission(client, register_user):
+    _, user = register_user(role=1)
+
+    response = client.post("/users/import", headers=user, files={"file": ("users.csv", HEADER.encode(), "text/csv")})
+
+    assert response.status_code == 403